@@ -0,0 +1,35 @@
+"""Composite indexes for keyset pagination of calls and analyses.
+
+Revision ID: 003
+Revises: 002
+Create Date: 2026-10-17 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = "003"
+down_revision: Union[str, None] = "002"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    if op.get_bind().dialect.name == "postgresql":
+        # Match ORDER BY started_at DESC NULLS LAST, id DESC exactly
+        op.create_index(
+            "idx_calls_started_id",
+            "calls",
+            [sa.text("started_at DESC NULLS LAST"), sa.text("id DESC")],
+            unique=False,
+        )
+    else:
+        op.create_index("idx_calls_started_id", "calls", ["started_at", "id"], unique=False)
+    op.create_index("idx_analyses_created_id", "call_analyses", ["created_at", "id"], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index("idx_analyses_created_id", table_name="call_analyses")
+    op.drop_index("idx_calls_started_id", table_name="calls")
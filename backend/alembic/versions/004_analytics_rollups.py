@@ -0,0 +1,48 @@
+"""Analytics rollup table.
+
+Existing analyses are not backfilled here; run `python -m app.db.rollups rebuild`.
+
+Revision ID: 004
+Revises: 003
+Create Date: 2026-10-17 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = "004"
+down_revision: Union[str, None] = "003"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+METRICS = (
+    "call_count",
+    "score_sum",
+    "score_count",
+    "answered_count",
+    "answered_known",
+    "resolved_count",
+    "partial_count",
+    "unresolved_count",
+)
+
+
+def upgrade() -> None:
+    op.create_table(
+        "analytics_rollups",
+        sa.Column("day", sa.Date(), nullable=False),
+        sa.Column("dimension", sa.String(20), nullable=False),
+        sa.Column("value", sa.String(100), nullable=False),
+        *(sa.Column(m, sa.Integer(), server_default="0", nullable=False) for m in METRICS),
+        sa.PrimaryKeyConstraint("day", "dimension", "value"),
+    )
+    op.create_index(
+        "idx_rollups_dimension_day", "analytics_rollups", ["dimension", "day"], unique=False
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("idx_rollups_dimension_day", table_name="analytics_rollups")
+    op.drop_table("analytics_rollups")
@@ -0,0 +1,65 @@
+"""Full-text search index over transcript segments.
+
+SQLite: external-content FTS5 table maintained by triggers.
+PostgreSQL: generated tsvector column with a GIN index.
+
+Revision ID: 005
+Revises: 004
+Create Date: 2026-10-17 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+revision: str = "005"
+down_revision: Union[str, None] = "004"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    if op.get_bind().dialect.name == "postgresql":
+        op.execute(
+            """ALTER TABLE transcript_segments ADD COLUMN text_tsv tsvector
+            GENERATED ALWAYS AS (to_tsvector('english', coalesce(text, ''))) STORED"""
+        )
+        op.execute("CREATE INDEX idx_segments_text_tsv ON transcript_segments USING gin (text_tsv)")
+        return
+
+    op.execute(
+        """CREATE VIRTUAL TABLE transcript_segments_fts USING fts5(
+            text, content='transcript_segments', content_rowid='rowid',
+            tokenize='porter unicode61'
+        )"""
+    )
+    op.execute(
+        """CREATE TRIGGER transcript_segments_fts_ai AFTER INSERT ON transcript_segments BEGIN
+            INSERT INTO transcript_segments_fts(rowid, text) VALUES (new.rowid, new.text);
+        END"""
+    )
+    op.execute(
+        """CREATE TRIGGER transcript_segments_fts_ad AFTER DELETE ON transcript_segments BEGIN
+            INSERT INTO transcript_segments_fts(transcript_segments_fts, rowid, text)
+            VALUES ('delete', old.rowid, old.text);
+        END"""
+    )
+    op.execute(
+        """CREATE TRIGGER transcript_segments_fts_au AFTER UPDATE OF text ON transcript_segments BEGIN
+            INSERT INTO transcript_segments_fts(transcript_segments_fts, rowid, text)
+            VALUES ('delete', old.rowid, old.text);
+            INSERT INTO transcript_segments_fts(rowid, text) VALUES (new.rowid, new.text);
+        END"""
+    )
+    op.execute("INSERT INTO transcript_segments_fts(transcript_segments_fts) VALUES ('rebuild')")
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name == "postgresql":
+        op.execute("DROP INDEX IF EXISTS idx_segments_text_tsv")
+        op.execute("ALTER TABLE transcript_segments DROP COLUMN IF EXISTS text_tsv")
+        return
+    op.execute("DROP TRIGGER IF EXISTS transcript_segments_fts_au")
+    op.execute("DROP TRIGGER IF EXISTS transcript_segments_fts_ad")
+    op.execute("DROP TRIGGER IF EXISTS transcript_segments_fts_ai")
+    op.execute("DROP TABLE IF EXISTS transcript_segments_fts")
@@ -0,0 +1,38 @@
+"""Index transcript segments by call and start time.
+
+Revision ID: 006
+Revises: 005
+Create Date: 2026-10-17 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = "006"
+down_revision: Union[str, None] = "005"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    if op.get_bind().dialect.name == "postgresql":
+        # Match ORDER BY start_time_ms NULLS FIRST, id (SQLite sorts NULLs first already)
+        op.create_index(
+            "idx_segments_call_start",
+            "transcript_segments",
+            ["call_id", sa.text("start_time_ms NULLS FIRST"), "id"],
+            unique=False,
+        )
+    else:
+        op.create_index(
+            "idx_segments_call_start",
+            "transcript_segments",
+            ["call_id", "start_time_ms", "id"],
+            unique=False,
+        )
+
+
+def downgrade() -> None:
+    op.drop_index("idx_segments_call_start", table_name="transcript_segments")
@@ -0,0 +1,35 @@
+"""Processing status on calls.
+
+Existing calls were written in one transaction at the end of processing, so
+they are marked completed.
+
+Revision ID: 007
+Revises: 006
+Create Date: 2026-10-17 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = "007"
+down_revision: Union[str, None] = "006"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    with op.batch_alter_table("calls") as batch:
+        batch.add_column(
+            sa.Column("status", sa.String(20), nullable=False, server_default="completed")
+        )
+        batch.add_column(sa.Column("error", sa.Text(), nullable=True))
+    op.create_index("idx_calls_status", "calls", ["status"], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index("idx_calls_status", table_name="calls")
+    with op.batch_alter_table("calls") as batch:
+        batch.drop_column("error")
+        batch.drop_column("status")
@@ -0,0 +1,35 @@
+"""Tag analyses with the model and prompt version that produced them.
+
+Revision ID: 008
+Revises: 007
+Create Date: 2026-10-17 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = "008"
+down_revision: Union[str, None] = "007"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    with op.batch_alter_table("call_analyses") as batch:
+        batch.add_column(sa.Column("model", sa.String(120), nullable=True))
+        batch.add_column(sa.Column("prompt_version", sa.String(16), nullable=True))
+    op.create_index(
+        "idx_analyses_call_version",
+        "call_analyses",
+        ["call_id", "prompt_version", "model"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("idx_analyses_call_version", table_name="call_analyses")
+    with op.batch_alter_table("call_analyses") as batch:
+        batch.drop_column("prompt_version")
+        batch.drop_column("model")
@@ -0,0 +1,101 @@
+"""Key the SQLite full-text index on a stable integer column.
+
+transcript_segments has a CHAR(36) primary key, so its rowid is implicit and
+VACUUM may renumber it, leaving the FTS5 index pointing at the wrong rows.
+Segments get a search_rowid column (unique, assigned on insert by the
+trigger) and the FTS5 table is recreated with content_rowid='search_rowid'.
+PostgreSQL (tsvector column) is unaffected.
+
+Revision ID: 009
+Revises: 008
+Create Date: 2026-10-17 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+revision: str = "009"
+down_revision: Union[str, None] = "008"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _drop_fts() -> None:
+    op.execute("DROP TRIGGER IF EXISTS transcript_segments_fts_au")
+    op.execute("DROP TRIGGER IF EXISTS transcript_segments_fts_ad")
+    op.execute("DROP TRIGGER IF EXISTS transcript_segments_fts_ai")
+    op.execute("DROP TABLE IF EXISTS transcript_segments_fts")
+
+
+def upgrade() -> None:
+    if op.get_bind().dialect.name != "sqlite":
+        return
+    _drop_fts()
+    op.execute("ALTER TABLE transcript_segments ADD COLUMN search_rowid INTEGER")
+    op.execute("UPDATE transcript_segments SET search_rowid = rowid")
+    op.execute(
+        "CREATE UNIQUE INDEX idx_segments_search_rowid ON transcript_segments (search_rowid)"
+    )
+    op.execute(
+        """CREATE VIRTUAL TABLE transcript_segments_fts USING fts5(
+            text, content='transcript_segments', content_rowid='search_rowid',
+            tokenize='porter unicode61'
+        )"""
+    )
+    op.execute(
+        """CREATE TRIGGER transcript_segments_fts_ai AFTER INSERT ON transcript_segments BEGIN
+            UPDATE transcript_segments
+            SET search_rowid = (SELECT coalesce(max(search_rowid), 0) + 1 FROM transcript_segments)
+            WHERE rowid = new.rowid AND new.search_rowid IS NULL;
+            INSERT INTO transcript_segments_fts(rowid, text)
+            VALUES ((SELECT search_rowid FROM transcript_segments WHERE rowid = new.rowid), new.text);
+        END"""
+    )
+    op.execute(
+        """CREATE TRIGGER transcript_segments_fts_ad AFTER DELETE ON transcript_segments BEGIN
+            INSERT INTO transcript_segments_fts(transcript_segments_fts, rowid, text)
+            VALUES ('delete', old.search_rowid, old.text);
+        END"""
+    )
+    op.execute(
+        """CREATE TRIGGER transcript_segments_fts_au AFTER UPDATE OF text ON transcript_segments BEGIN
+            INSERT INTO transcript_segments_fts(transcript_segments_fts, rowid, text)
+            VALUES ('delete', old.search_rowid, old.text);
+            INSERT INTO transcript_segments_fts(rowid, text) VALUES (new.search_rowid, new.text);
+        END"""
+    )
+    op.execute("INSERT INTO transcript_segments_fts(transcript_segments_fts) VALUES ('rebuild')")
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name != "sqlite":
+        return
+    _drop_fts()
+    op.execute("DROP INDEX IF EXISTS idx_segments_search_rowid")
+    op.execute("ALTER TABLE transcript_segments DROP COLUMN search_rowid")
+    op.execute(
+        """CREATE VIRTUAL TABLE transcript_segments_fts USING fts5(
+            text, content='transcript_segments', content_rowid='rowid',
+            tokenize='porter unicode61'
+        )"""
+    )
+    op.execute(
+        """CREATE TRIGGER transcript_segments_fts_ai AFTER INSERT ON transcript_segments BEGIN
+            INSERT INTO transcript_segments_fts(rowid, text) VALUES (new.rowid, new.text);
+        END"""
+    )
+    op.execute(
+        """CREATE TRIGGER transcript_segments_fts_ad AFTER DELETE ON transcript_segments BEGIN
+            INSERT INTO transcript_segments_fts(transcript_segments_fts, rowid, text)
+            VALUES ('delete', old.rowid, old.text);
+        END"""
+    )
+    op.execute(
+        """CREATE TRIGGER transcript_segments_fts_au AFTER UPDATE OF text ON transcript_segments BEGIN
+            INSERT INTO transcript_segments_fts(transcript_segments_fts, rowid, text)
+            VALUES ('delete', old.rowid, old.text);
+            INSERT INTO transcript_segments_fts(rowid, text) VALUES (new.rowid, new.text);
+        END"""
+    )
+    op.execute("INSERT INTO transcript_segments_fts(transcript_segments_fts) VALUES ('rebuild')")
@@ -0,0 +1,29 @@
+"""Index calls by the content hash stored in their metadata.
+
+Batch ingest looks up each file's sha256 among stored uploads; the expression
+must match app.db.models.call_sha256 for the index to be used.
+
+Revision ID: 010
+Revises: 009
+Create Date: 2026-10-17 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+revision: str = "010"
+down_revision: Union[str, None] = "009"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    if op.get_bind().dialect.name == "postgresql":
+        op.execute("CREATE INDEX idx_calls_sha256 ON calls ((metadata ->> 'sha256'))")
+    else:
+        op.execute("CREATE INDEX idx_calls_sha256 ON calls (json_extract(metadata, '$.sha256'))")
+
+
+def downgrade() -> None:
+    op.drop_index("idx_calls_sha256", table_name="calls")
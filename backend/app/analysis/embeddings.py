@@ -0,0 +1,347 @@
+"""Local call embeddings and similarity search - no network, no model download.
+
+Each call's summary, topics and transcript are turned into a fixed-size
+float32 vector with a signed hashing vectorizer (unigrams + bigrams, log term
+frequency, L2-normalized). Vectors are appended to a flat file that is
+memory-mapped for search, so a top-k query is one matrix-vector product.
+
+Rebuild the index from the database:
+    python -m app.analysis.embeddings rebuild
+"""
+
+import asyncio
+import logging
+import math
+import os
+import re
+import sys
+import threading
+import zlib
+from collections import Counter
+from contextlib import contextmanager
+from pathlib import Path
+from uuid import UUID
+
+import numpy as np
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+_TOKEN = re.compile(r"[a-z0-9']+")
+_STOPWORDS = frozenset(
+    "a an and are as at be but by for from had has have i if in is it its me my "
+    "of on or so that the their them then there they this to was we were what "
+    "when which who will with you your yes no ok okay um uh".split()
+)
+
+
+def embed_text(text: str, dims: int) -> np.ndarray:
+    """Signed feature-hashing embedding of unigrams and bigrams."""
+    words = [w for w in _TOKEN.findall(text.lower()) if w not in _STOPWORDS]
+    features = Counter(words)
+    features.update(f"{a} {b}" for a, b in zip(words, words[1:]))
+    vector = np.zeros(dims, dtype=np.float32)
+    for feature, count in features.items():
+        h = zlib.crc32(feature.encode("utf-8"))
+        vector[h % dims] += (1.0 if h & 0x80000000 else -1.0) * (1.0 + math.log(count))
+    norm = float(np.linalg.norm(vector))
+    return vector / norm if norm else vector
+
+
+def call_document(transcript_text: str, payload: dict | None = None) -> str:
+    """Text embedded for a call; the summary and topics are repeated to weigh more."""
+    payload = payload or {}
+    topics = " ".join(str(t) for t in payload.get("key_topics") or [] if str(t).strip())
+    head = f"{payload.get('summary') or ''} {topics}"
+    return f"{head} {head} {transcript_text}"
+
+
+if sys.platform == "win32":
+    import msvcrt
+
+    def _lock_file(f) -> None:
+        f.seek(0)
+        msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+
+    def _unlock_file(f) -> None:
+        f.seek(0)
+        msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+else:
+    import fcntl
+
+    def _lock_file(f) -> None:
+        fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+
+    def _unlock_file(f) -> None:
+        fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+
+
+class VectorIndex:
+    """
+    Append-only store of (call id, vector) rows in two flat files:
+    ids.bin (16 bytes per row) and vectors.f32 (dims float32 per row).
+    Re-embedding a call overwrites its row in place, so the files hold one
+    row per call (indexes written by older versions may still contain
+    superseded rows; the latest row per id wins).
+    Writers in any process (API, batch ingest, re-analysis) serialize on
+    index.lock, and readers reload whenever the files change on disk.
+    """
+
+    def __init__(self, directory: str | Path, dims: int):
+        self.directory = Path(directory)
+        self.dims = dims
+        self._lock = threading.Lock()
+        self._ids: list[UUID] = []
+        self._latest: dict[UUID, int] = {}
+        self._matrix: np.ndarray | None = None
+        self._stamp: tuple | None = None  # file identity/size/mtime when last loaded
+
+    @property
+    def _ids_path(self) -> Path:
+        return self.directory / "ids.bin"
+
+    @property
+    def _vectors_path(self) -> Path:
+        return self.directory / "vectors.f32"
+
+    @property
+    def _rebuild_vectors_path(self) -> Path:
+        return self._vectors_path.with_suffix(".f32.rebuild")
+
+    @property
+    def _row_bytes(self) -> int:
+        return 4 * self.dims
+
+    def __len__(self) -> int:
+        self._ensure_current()
+        return len(self._latest)
+
+    @contextmanager
+    def _locked(self):
+        """Exclusive across threads of this process and every process sharing the directory."""
+        with self._lock:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            with open(self.directory / "index.lock", "a+b") as f:
+                _lock_file(f)
+                try:
+                    yield
+                finally:
+                    _unlock_file(f)
+
+    def _stat(self) -> tuple | None:
+        try:
+            ids, vectors = self._ids_path.stat(), self._vectors_path.stat()
+        except FileNotFoundError:
+            return None
+        return (
+            ids.st_ino, ids.st_size, ids.st_mtime_ns,
+            vectors.st_ino, vectors.st_size, vectors.st_mtime_ns,
+        )
+
+    def _file_rows(self) -> int:
+        """Complete rows on disk; a torn append leaves an id-less vector, which is ignored."""
+        stamp = self._stat()
+        if stamp is None:
+            return 0
+        return min(stamp[1] // 16, stamp[4] // self._row_bytes)
+
+    def _ensure_current(self) -> None:
+        if self._stat() != self._stamp:
+            with self._locked():
+                self._refresh()
+
+    def _refresh(self) -> None:
+        """Load rows written since the last look, or everything after a rebuild (lock held)."""
+        stamp = self._stat()
+        if stamp == self._stamp:
+            return
+        rows = self._file_rows()
+        grown = (
+            self._stamp is not None
+            and stamp is not None
+            and (stamp[0], stamp[3]) == (self._stamp[0], self._stamp[3])
+            and rows >= len(self._ids)
+        )
+        if not grown:
+            self._ids, self._latest = [], {}
+        if rows > len(self._ids):
+            with open(self._ids_path, "rb") as f:
+                f.seek(len(self._ids) * 16)
+                raw = f.read((rows - len(self._ids)) * 16)
+            for offset in range(0, len(raw), 16):
+                self._latest[UUID(bytes=raw[offset:offset + 16])] = len(self._ids)
+                self._ids.append(UUID(bytes=raw[offset:offset + 16]))
+        self._matrix = None
+        self._stamp = stamp
+
+    def _map(self) -> np.ndarray:
+        """Memory-map all rows loaded so far (remapped after changes)."""
+        rows = len(self._ids)
+        if self._matrix is None or self._matrix.shape[0] != rows:
+            if rows == 0:
+                self._matrix = np.zeros((0, self.dims), dtype=np.float32)
+            else:
+                self._matrix = np.memmap(
+                    self._vectors_path, dtype=np.float32, mode="r", shape=(rows, self.dims)
+                )
+        return self._matrix
+
+    def add(self, call_id: UUID, vector: np.ndarray) -> None:
+        vector = np.asarray(vector, dtype=np.float32).reshape(self.dims)
+        with self._locked():
+            self._refresh()
+            row = self._latest.get(call_id)
+            # While a rebuild runs, append instead: it only carries over new rows
+            if row is not None and not self._rebuild_vectors_path.exists():
+                with open(self._vectors_path, "r+b") as f:
+                    f.seek(row * self._row_bytes)
+                    f.write(vector.tobytes())
+                self._refresh()
+                return
+            rows = len(self._ids)
+            # Drop the tail of a torn append so the new id and vector line up
+            for path, size in ((self._vectors_path, rows * self._row_bytes), (self._ids_path, rows * 16)):
+                if path.exists() and path.stat().st_size > size:
+                    os.truncate(path, size)
+            # Vector first: a torn write leaves an id-less vector, which _refresh ignores
+            with open(self._vectors_path, "ab") as f:
+                f.write(vector.tobytes())
+            with open(self._ids_path, "ab") as f:
+                f.write(call_id.bytes)
+            self._refresh()
+
+    def vector(self, call_id: UUID) -> np.ndarray | None:
+        self._ensure_current()
+        row = self._latest.get(call_id)
+        if row is None:
+            return None
+        return np.array(self._map()[row])
+
+    def search(self, query: np.ndarray, k: int, exclude: UUID | None = None) -> list[tuple[UUID, float]]:
+        """Top-k (call id, cosine similarity), best first."""
+        self._ensure_current()
+        ids, latest, matrix = self._ids, self._latest, self._map()
+        if not matrix.shape[0]:
+            return []
+        scores = matrix @ np.asarray(query, dtype=np.float32)
+        # k + 1 leaves room for the excluded call; fetch more only if superseded
+        # rows (left by older versions) crowd out live ones
+        n = min(matrix.shape[0], k + 1)
+        while True:
+            top = np.argpartition(scores, -n)[-n:]
+            top = top[np.argsort(-scores[top])]
+            results = []
+            for row in top:
+                call_id = ids[row]
+                if latest.get(call_id) != row or call_id == exclude:
+                    continue
+                results.append((call_id, float(scores[row])))
+                if len(results) == k:
+                    return results
+            if n == matrix.shape[0]:
+                return results
+            n = min(matrix.shape[0], n * 2)
+
+    def start_rebuild(self) -> "IndexRebuild":
+        """Begin writing a replacement index next to the live one."""
+        with self._locked():
+            start = self._file_rows()
+        return IndexRebuild(self, start)
+
+
+class IndexRebuild:
+    """
+    Replacement index written to side files and swapped in by commit().
+    Rows other processes append to the live index in the meantime are carried
+    over, so embeddings written during a rebuild are not lost.
+    """
+
+    def __init__(self, index: VectorIndex, start_rows: int):
+        self.index = index
+        self.start_rows = start_rows
+        self.rows = 0
+        index.directory.mkdir(parents=True, exist_ok=True)
+        self._ids_tmp = index._ids_path.with_suffix(".bin.rebuild")
+        self._vectors_tmp = index._rebuild_vectors_path
+        self._ids = open(self._ids_tmp, "wb")
+        self._vectors = open(self._vectors_tmp, "wb")
+
+    def add(self, call_id: UUID, vector: np.ndarray) -> None:
+        self._vectors.write(np.asarray(vector, dtype=np.float32).reshape(self.index.dims).tobytes())
+        self._ids.write(call_id.bytes)
+        self.rows += 1
+
+    def commit(self) -> None:
+        index = self.index
+        with index._locked():
+            end = index._file_rows()
+            if end > self.start_rows:
+                with open(index._ids_path, "rb") as f:
+                    f.seek(self.start_rows * 16)
+                    self._ids.write(f.read((end - self.start_rows) * 16))
+                with open(index._vectors_path, "rb") as f:
+                    f.seek(self.start_rows * index._row_bytes)
+                    self._vectors.write(f.read((end - self.start_rows) * index._row_bytes))
+            self._ids.close()
+            self._vectors.close()
+            os.replace(self._vectors_tmp, index._vectors_path)
+            os.replace(self._ids_tmp, index._ids_path)
+            index._refresh()
+
+    def abort(self) -> None:
+        self._ids.close()
+        self._vectors.close()
+        self._ids_tmp.unlink(missing_ok=True)
+        self._vectors_tmp.unlink(missing_ok=True)
+
+
+vector_index = VectorIndex(settings.vector_index_dir, settings.embedding_dims)
+
+
+async def embed_call(call_id: UUID, transcript_text: str, payload: dict | None = None) -> None:
+    """
+    Embed a call and add it to the vector index (off the event loop).
+    Best-effort: the call is already analyzed when this runs, so failures are
+    logged and never propagate to the caller.
+    """
+    if not settings.embeddings_enabled or not transcript_text.strip():
+        return
+
+    def _run() -> None:
+        document = call_document(transcript_text, payload)
+        vector_index.add(call_id, embed_text(document, vector_index.dims))
+
+    try:
+        await asyncio.to_thread(_run)
+    except Exception:
+        logger.exception("Could not store embedding for call %s", call_id)
+
+
+async def _rebuild() -> None:
+    from app.db.repository import iter_call_batches
+    from app.db.session import async_session, engine
+
+    rebuild = vector_index.start_rebuild()
+    try:
+        async with async_session() as db:
+            async for batch in iter_call_batches(db):
+                for call, segments, analyses in batch:
+                    post_call = [a for a in analyses if a.analysis_type == "post_call"]
+                    text = " ".join(s.text for s in segments)
+                    if post_call and text.strip():
+                        # Analyses come oldest first; the latest one wins
+                        document = call_document(text, post_call[-1].payload)
+                        rebuild.add(call.id, embed_text(document, vector_index.dims))
+        rebuild.commit()
+    except BaseException:
+        rebuild.abort()
+        raise
+    await engine.dispose()
+    print(f"Embedded {rebuild.rows} calls into {vector_index.directory}")
+
+
+if __name__ == "__main__":
+    if sys.argv[1:] != ["rebuild"]:
+        sys.exit("usage: python -m app.analysis.embeddings rebuild")
+    asyncio.run(_rebuild())
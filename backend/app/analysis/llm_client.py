@@ -1,78 +1,294 @@
 """LLM client - Gemini (primary) or Ollama (fallback)."""
 
+import copy
+import hashlib
 import json
+import logging
+import time
 from abc import ABC, abstractmethod
+from collections import OrderedDict
+from datetime import datetime, timedelta
+
+import httpx
+from sqlalchemy import delete, select
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.config import settings
+from app.db.models import LLMCacheEntry
+from app.db.session import async_session, run_write
+
+logger = logging.getLogger(__name__)
+
+# Application-scoped HTTP client shared by all LLM calls (pooled, keep-alive)
+_http_client: httpx.AsyncClient | None = None
+
+
+def _build_http_client() -> httpx.AsyncClient:
+    http2 = settings.llm_http2
+    if http2:
+        try:
+            import h2  # noqa: F401
+        except ImportError:
+            logger.warning("LLM_HTTP2 is set but the h2 package is missing; using HTTP/1.1")
+            http2 = False
+    return httpx.AsyncClient(
+        http2=http2,
+        timeout=httpx.Timeout(settings.llm_timeout_seconds, connect=settings.llm_connect_timeout_seconds),
+        limits=httpx.Limits(
+            max_connections=settings.llm_max_connections,
+            max_keepalive_connections=settings.llm_max_keepalive_connections,
+            keepalive_expiry=settings.llm_keepalive_expiry_seconds,
+        ),
+    )
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """Shared HTTP client; created lazily when used outside the app lifecycle."""
+    global _http_client
+    if _http_client is None or _http_client.is_closed:
+        _http_client = _build_http_client()
+    return _http_client
+
+
+async def start_http_client() -> None:
+    """Open the shared HTTP client (FastAPI startup)."""
+    get_http_client()
+
+
+async def close_http_client() -> None:
+    """Close the shared HTTP client and its pooled connections (FastAPI shutdown)."""
+    global _http_client
+    if _http_client is not None:
+        await _http_client.aclose()
+        _http_client = None
 
 
 class LLMClient(ABC):
     """Abstract LLM client interface."""
 
+    provider: str = ""
+
+    @property
+    def model(self) -> str:
+        return ""
+
+    @property
+    def generation_config(self) -> dict:
+        return {}
+
     @abstractmethod
     async def analyze_transcript(self, transcript: str, system_prompt: str) -> dict:
         """Analyze a transcript and return structured JSON."""
         pass
 
+    def cache_key(self, transcript: str, system_prompt: str) -> str:
+        """Hash of everything that determines the model output."""
+        raw = json.dumps(
+            {
+                "provider": self.provider,
+                "model": self.model,
+                "generation_config": self.generation_config,
+                "system_prompt": system_prompt,
+                "transcript": transcript,
+            },
+            sort_keys=True,
+        )
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
 
 class GeminiLLMClient(LLMClient):
     """Google Gemini API client (free tier available)."""
 
+    provider = "gemini"
+
+    @property
+    def model(self) -> str:
+        return settings.gemini_model
+
+    @property
+    def generation_config(self) -> dict:
+        return {
+            "temperature": 0.2,
+            "topP": 0.9,
+            "maxOutputTokens": 2048,
+        }
+
     async def analyze_transcript(self, transcript: str, system_prompt: str) -> dict:
         """Analyze transcript using Gemini API."""
-        import httpx
-
-        url = f"https://generativelanguage.googleapis.com/v1beta/models/{settings.gemini_model}:generateContent"
-
-        async with httpx.AsyncClient(timeout=60.0) as client:
-            response = await client.post(
-                url,
-                params={"key": settings.gemini_api_key},
-                json={
-                    "contents": [
-                        {
-                            "parts": [
-                                {"text": f"{system_prompt}\n\n---\n\nTranscript:\n{transcript}"}
-                            ]
-                        }
-                    ],
-                    "generationConfig": {
-                        "temperature": 0.2,
-                        "topP": 0.9,
-                        "maxOutputTokens": 2048,
-                    },
-                },
-            )
-            response.raise_for_status()
-            data = response.json()
-            output = data["candidates"][0]["content"]["parts"][0]["text"]
-            return _parse_json_output(output)
+        url = f"https://generativelanguage.googleapis.com/v1beta/models/{self.model}:generateContent"
+
+        response = await get_http_client().post(
+            url,
+            params={"key": settings.gemini_api_key},
+            json={
+                "contents": [
+                    {
+                        "parts": [
+                            {"text": f"{system_prompt}\n\n---\n\nTranscript:\n{transcript}"}
+                        ]
+                    }
+                ],
+                "generationConfig": self.generation_config,
+            },
+        )
+        response.raise_for_status()
+        data = response.json()
+        output = data["candidates"][0]["content"]["parts"][0]["text"]
+        return _parse_json_output(output)
 
 
 class OllamaLLMClient(LLMClient):
     """Ollama client for local Mistral/Llama."""
 
+    provider = "ollama"
+
+    @property
+    def model(self) -> str:
+        return "mistral"
+
+    @property
+    def generation_config(self) -> dict:
+        return {
+            "temperature": 0.2,
+            "max_tokens": 2048,
+        }
+
     async def analyze_transcript(self, transcript: str, system_prompt: str) -> dict:
         """Analyze transcript using Ollama API."""
-        import httpx
-
-        async with httpx.AsyncClient(timeout=60.0) as client:
-            response = await client.post(
-                f"{settings.ollama_base_url.rstrip('/')}/chat/completions",
-                json={
-                    "model": "mistral",
-                    "messages": [
-                        {"role": "system", "content": system_prompt},
-                        {"role": "user", "content": f"Transcript:\n{transcript}"},
-                    ],
-                    "temperature": 0.2,
-                    "max_tokens": 2048,
-                },
+        response = await get_http_client().post(
+            f"{settings.ollama_base_url.rstrip('/')}/chat/completions",
+            json={
+                "model": self.model,
+                "messages": [
+                    {"role": "system", "content": system_prompt},
+                    {"role": "user", "content": f"Transcript:\n{transcript}"},
+                ],
+                **self.generation_config,
+            },
+        )
+        response.raise_for_status()
+        data = response.json()
+        output = data["choices"][0]["message"]["content"]
+        return _parse_json_output(output)
+
+
+class AnalysisCache:
+    """
+    Two-level cache of LLM outputs: an in-memory LRU in front of the llm_cache
+    table. Entries expire after ttl_seconds in both levels.
+    """
+
+    def __init__(self, max_memory_entries: int, ttl_seconds: int):
+        self.max_memory_entries = max_memory_entries
+        self.ttl_seconds = ttl_seconds
+        self.memory_hits = 0
+        self.db_hits = 0
+        self.misses = 0
+        self._memory: OrderedDict[str, tuple[float, dict]] = OrderedDict()
+        self._last_purge = 0.0
+
+    async def get(self, key: str) -> dict | None:
+        entry = self._memory.get(key)
+        if entry is not None:
+            expires, payload = entry
+            if expires > time.monotonic():
+                self._memory.move_to_end(key)
+                self.memory_hits += 1
+                return copy.deepcopy(payload)
+            del self._memory[key]
+
+        try:
+            async with async_session() as db:
+                row = (
+                    await db.execute(
+                        select(LLMCacheEntry.payload, LLMCacheEntry.expires_at).where(
+                            LLMCacheEntry.key == key,
+                            LLMCacheEntry.expires_at > datetime.utcnow(),
+                        )
+                    )
+                ).first()
+        except SQLAlchemyError as e:
+            logger.warning("LLM cache lookup failed: %s", e)
+            row = None
+        if row is None:
+            self.misses += 1
+            return None
+        self.db_hits += 1
+        self._remember(key, row.payload)
+        return copy.deepcopy(row.payload)
+
+    async def set(self, key: str, payload: dict, provider: str, model: str) -> None:
+        self._remember(key, payload)
+
+        now = datetime.utcnow()
+        purge = time.monotonic() - self._last_purge > self.ttl_seconds / 100
+
+        async def _store(db: AsyncSession) -> None:
+            await db.merge(
+                LLMCacheEntry(
+                    key=key,
+                    provider=provider,
+                    model=model,
+                    payload=payload,
+                    created_at=now,
+                    expires_at=now + timedelta(seconds=self.ttl_seconds),
+                )
             )
-            response.raise_for_status()
-            data = response.json()
-            output = data["choices"][0]["message"]["content"]
-            return _parse_json_output(output)
+            # Drop expired rows at most once per TTL/100
+            if purge:
+                await db.execute(delete(LLMCacheEntry).where(LLMCacheEntry.expires_at <= now))
+
+        if purge:
+            self._last_purge = time.monotonic()
+        try:
+            await run_write(_store)
+        except SQLAlchemyError as e:
+            logger.warning("LLM cache write failed: %s", e)
+
+    def stats(self) -> dict:
+        total = self.memory_hits + self.db_hits + self.misses
+        return {
+            "memory_hits": self.memory_hits,
+            "db_hits": self.db_hits,
+            "misses": self.misses,
+            "hit_ratio": round((self.memory_hits + self.db_hits) / total, 4) if total else 0.0,
+            "memory_entries": len(self._memory),
+        }
+
+    def _remember(self, key: str, payload: dict) -> None:
+        if self.max_memory_entries <= 0:
+            return
+        self._memory[key] = (time.monotonic() + self.ttl_seconds, copy.deepcopy(payload))
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_memory_entries:
+            self._memory.popitem(last=False)
+
+
+class CachedLLMClient(LLMClient):
+    """Wraps an LLM client so identical requests are served from the cache."""
+
+    def __init__(self, inner: LLMClient, cache: AnalysisCache):
+        self.inner = inner
+        self.cache = cache
+        self.provider = inner.provider
+
+    @property
+    def model(self) -> str:
+        return self.inner.model
+
+    @property
+    def generation_config(self) -> dict:
+        return self.inner.generation_config
+
+    async def analyze_transcript(self, transcript: str, system_prompt: str) -> dict:
+        key = self.inner.cache_key(transcript, system_prompt)
+        cached = await self.cache.get(key)
+        if cached is not None:
+            return cached
+        result = await self.inner.analyze_transcript(transcript, system_prompt)
+        await self.cache.set(key, result, provider=self.provider, model=self.model)
+        return result
 
 
 def _parse_json_output(text: str) -> dict:
@@ -89,8 +305,24 @@ def _parse_json_output(text: str) -> dict:
     return json.loads(text)
 
 
+analysis_cache = AnalysisCache(
+    max_memory_entries=settings.llm_cache_memory_entries,
+    ttl_seconds=settings.llm_cache_ttl_hours * 3600,
+)
+
+
+_llm_client: LLMClient | None = None
+
+
 def get_llm_client() -> LLMClient:
-    """Get LLM client based on config."""
-    if settings.llm_provider == "ollama":
-        return OllamaLLMClient()
-    return GeminiLLMClient()
+    """Get the shared LLM client based on config."""
+    global _llm_client
+    if _llm_client is None:
+        if settings.llm_provider == "ollama":
+            client: LLMClient = OllamaLLMClient()
+        else:
+            client = GeminiLLMClient()
+        if settings.llm_cache_enabled:
+            client = CachedLLMClient(client, analysis_cache)
+        _llm_client = client
+    return _llm_client
@@ -1,24 +1,167 @@
 """Post-call analysis - full transcript to structured output."""
 
+import asyncio
+import hashlib
+import json
+import logging
+from collections import Counter
 from uuid import UUID
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.analysis.llm_client import get_llm_client
-from app.analysis.prompts import POST_CALL_ANALYSIS_SYSTEM
-from app.db.repository import create_analysis, get_call
+from app.analysis.embeddings import embed_call
+from app.analysis.llm_client import LLMClient, get_llm_client
+from app.analysis.prompts import (
+    POST_CALL_ANALYSIS_SYSTEM,
+    POST_CALL_CHUNK_SYSTEM,
+    POST_CALL_REDUCE_SYSTEM,
+)
+from app.config import settings
+from app.db.repository import create_analysis, get_call, update_call
+from app.db.session import run_write
 
+logger = logging.getLogger(__name__)
 
-async def run_post_call_analysis(
-    db: AsyncSession,
-    call_id: UUID,
+RESOLUTION_STATUSES = ("resolved", "partial", "unresolved")
+
+
+def analysis_version() -> tuple[str, str]:
+    """
+    (model, prompt_version) of analyses produced with the current config.
+    prompt_version hashes the prompts, generation config and chunk size, so
+    editing a prompt or switching model marks existing analyses as stale.
+    """
+    client = get_llm_client()
+    raw = json.dumps(
+        [
+            POST_CALL_ANALYSIS_SYSTEM,
+            POST_CALL_CHUNK_SYSTEM,
+            POST_CALL_REDUCE_SYSTEM,
+            client.generation_config,
+            settings.llm_chunk_tokens,
+        ],
+        sort_keys=True,
+    )
+    return f"{client.provider}:{client.model}", hashlib.sha256(raw.encode()).hexdigest()[:16]
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count (~4 characters per token for English)."""
+    return len(text) // 4 + 1
+
+
+def split_transcript(units: list[str], max_tokens: int) -> list[str]:
+    """
+    Group consecutive transcript units (segment texts) into chunks of at most
+    max_tokens each. A single oversized unit becomes its own chunk.
+    """
+    chunks: list[str] = []
+    current: list[str] = []
+    current_tokens = 0
+    for unit in units:
+        unit = unit.strip()
+        if not unit:
+            continue
+        tokens = estimate_tokens(unit)
+        if current and current_tokens + tokens > max_tokens:
+            chunks.append(" ".join(current))
+            current, current_tokens = [], 0
+        current.append(unit)
+        current_tokens += tokens
+    if current:
+        chunks.append(" ".join(current))
+    return chunks
+
+
+def _strings(value) -> list[str]:
+    """Non-empty strings of an LLM list field; anything else is dropped."""
+    if isinstance(value, str):
+        value = [value]
+    if not isinstance(value, list):
+        return []
+    return [v for v in value if isinstance(v, str) and v.strip()]
+
+
+def _text(value) -> str:
+    """An LLM text field as a string (lists of strings are joined)."""
+    if isinstance(value, str):
+        return value
+    return " ".join(_strings(value))
+
+
+def _normalize(payload: dict) -> dict:
+    """Normalize keys to match schema; list fields become lists of strings."""
+    return {
+        "customer_satisfaction_score": payload.get("customer_satisfaction_score"),
+        "questions_answered_correctly": payload.get("questions_answered_correctly"),
+        "unanswered_questions": _strings(payload.get("unanswered_questions")),
+        "resolution_status": payload.get("resolution_status") or "unknown",
+        "key_topics": _strings(payload.get("key_topics")),
+        "agent_performance_notes": _text(payload.get("agent_performance_notes")),
+        "summary": _text(payload.get("summary")),
+    }
+
+
+def _is_score(value) -> bool:
+    """A 1-5 satisfaction score; bools are ints in Python but not scores."""
+    return isinstance(value, (int, float)) and not isinstance(value, bool) and 1 <= value <= 5
+
+
+def merge_partial_analyses(parts: list[dict]) -> dict:
+    """Deterministic reduce of per-chunk analyses (used if the LLM reduce fails)."""
+    scores = [p["customer_satisfaction_score"] for p in parts if _is_score(p["customer_satisfaction_score"])]
+    answered = [p["questions_answered_correctly"] for p in parts if p["questions_answered_correctly"] is not None]
+    statuses = [p["resolution_status"] for p in parts if p["resolution_status"] in RESOLUTION_STATUSES]
+    topics = Counter(t for p in parts for t in _strings(p["key_topics"]))
+    questions = (q for p in parts for q in _strings(p["unanswered_questions"]))
+    notes = [_text(p["agent_performance_notes"]) for p in parts]
+    summaries = [_text(p["summary"]) for p in parts]
+    return {
+        "customer_satisfaction_score": round(sum(scores) / len(scores)) if scores else None,
+        "questions_answered_correctly": all(answered) if answered else None,
+        "unanswered_questions": list(dict.fromkeys(questions)),
+        # Resolution is decided by how the call ends
+        "resolution_status": statuses[-1] if statuses else "unknown",
+        "key_topics": [t for t, _ in topics.most_common()],
+        "agent_performance_notes": " ".join(n for n in notes if n),
+        "summary": " ".join(s for s in summaries if s),
+    }
+
+
+async def _map_reduce(client: LLMClient, chunks: list[str]) -> dict:
+    """Analyze chunks concurrently (bounded), then merge into one payload."""
+    semaphore = asyncio.Semaphore(settings.llm_max_concurrency)
+
+    async def analyze(index: int, chunk: str) -> dict:
+        async with semaphore:
+            result = await client.analyze_transcript(
+                transcript=f"[Part {index + 1} of {len(chunks)}]\n{chunk}",
+                system_prompt=POST_CALL_CHUNK_SYSTEM,
+            )
+        return _normalize(result)
+
+    parts = await asyncio.gather(*(analyze(i, c) for i, c in enumerate(chunks)))
+    try:
+        merged = await client.analyze_transcript(
+            transcript=json.dumps(parts, ensure_ascii=False),
+            system_prompt=POST_CALL_REDUCE_SYSTEM,
+        )
+        return _normalize(merged)
+    except Exception as e:
+        logger.warning("LLM reduce step failed, merging %d parts locally: %s", len(parts), e)
+        return merge_partial_analyses(parts)
+
+
+async def analyze_transcript_text(
     transcript_text: str,
+    segment_texts: list[str] | None = None,
 ) -> dict:
     """
-    Run full analysis on a transcript and store in DB.
-    Returns the analysis payload.
+    Analyze a transcript and return the normalized payload (no DB writes).
+    Transcripts over LLM_CHUNK_TOKENS are split on segment boundaries and
+    analyzed map-reduce style.
     """
     if not transcript_text.strip():
-        payload = {
+        return {
             "customer_satisfaction_score": None,
             "questions_answered_correctly": None,
             "unanswered_questions": [],
@@ -27,28 +170,45 @@ async def run_post_call_analysis(
             "agent_performance_notes": "No transcript content to analyze.",
             "summary": "Empty transcript.",
         }
-    else:
-        client = get_llm_client()
+
+    client = get_llm_client()
+    if estimate_tokens(transcript_text) <= settings.llm_chunk_tokens:
         payload = await client.analyze_transcript(
             transcript=transcript_text,
             system_prompt=POST_CALL_ANALYSIS_SYSTEM,
         )
-        # Normalize keys to match schema
-        payload = {
-            "customer_satisfaction_score": payload.get("customer_satisfaction_score"),
-            "questions_answered_correctly": payload.get("questions_answered_correctly"),
-            "unanswered_questions": payload.get("unanswered_questions") or [],
-            "resolution_status": payload.get("resolution_status") or "unknown",
-            "key_topics": payload.get("key_topics") or [],
-            "agent_performance_notes": payload.get("agent_performance_notes") or "",
-            "summary": payload.get("summary") or "",
-        }
+        return _normalize(payload)
 
-    analysis = await create_analysis(
-        db=db,
-        call_id=call_id,
-        analysis_type="post_call",
-        payload=payload,
-    )
-    await db.flush()
+    units = segment_texts if segment_texts else transcript_text.split()
+    chunks = split_transcript(units, settings.llm_chunk_tokens)
+    return await _map_reduce(client, chunks)
+
+
+async def run_post_call_analysis(
+    call_id: UUID,
+    transcript_text: str,
+    segment_texts: list[str] | None = None,
+) -> dict:
+    """
+    Run full analysis on a transcript, store it and mark the call completed,
+    then add the call to the local similarity index. No DB connection is
+    held while the LLM runs; the write is its own short transaction.
+    Returns the analysis payload.
+    """
+    model, prompt_version = analysis_version()
+    payload = await analyze_transcript_text(transcript_text, segment_texts)
+
+    async def _store(db: AsyncSession) -> None:
+        await create_analysis(
+            db=db,
+            call_id=call_id,
+            analysis_type="post_call",
+            payload=payload,
+            model=model,
+            prompt_version=prompt_version,
+        )
+        await update_call(db, call_id, status="completed", error=None)
+
+    await run_write(_store)
+    await embed_call(call_id, transcript_text, payload)
     return payload
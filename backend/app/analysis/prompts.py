@@ -22,3 +22,29 @@ Return a JSON object with:
 - notes: string - brief observation (one sentence)
 
 Return ONLY valid JSON, no other text."""
+
+POST_CALL_CHUNK_SYSTEM = """You are an expert at analyzing customer support call transcripts. You are given ONE PART of a longer call transcript; other parts are analyzed separately and merged later.
+
+Analyze only this part and return a JSON object with these exact keys:
+- customer_satisfaction_score: integer 1-5 for the customer's mood in this part, or null if unclear
+- questions_answered_correctly: boolean - were the customer questions in this part properly addressed? null if none were asked
+- unanswered_questions: array of strings - questions asked in this part that were not answered in this part
+- resolution_status: one of "resolved", "partial", "unresolved" as of the end of this part
+- key_topics: array of strings - main topics discussed (e.g. "billing", "technical_issue", "refund")
+- agent_performance_notes: string - brief notes on agent performance in this part
+- summary: string - 1-2 sentence summary of this part
+
+Return ONLY valid JSON, no other text."""
+
+POST_CALL_REDUCE_SYSTEM = """You are an expert at analyzing customer support calls. The input is a JSON array of analyses of consecutive parts of ONE call, in order.
+
+Merge them into a single analysis of the whole call and return a JSON object with these exact keys:
+- customer_satisfaction_score: integer 1-5 for the call overall, weighting how the call ended most heavily
+- questions_answered_correctly: boolean - were all customer questions properly addressed over the whole call?
+- unanswered_questions: array of strings - questions still unanswered by the end of the call (drop ones answered in a later part, merge duplicates)
+- resolution_status: one of "resolved", "partial", "unresolved" for the call as a whole
+- key_topics: array of strings - deduplicated main topics
+- agent_performance_notes: string - brief notes on agent performance across the call
+- summary: string - 2-3 sentence summary of the whole call
+
+Return ONLY valid JSON, no other text."""
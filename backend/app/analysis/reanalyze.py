@@ -0,0 +1,272 @@
+"""Bulk re-analysis of stored transcripts - no audio, no re-transcription.
+
+Selects calls by source, date range and whether they lack a post_call
+analysis, rebuilds the transcript from transcript_segments and runs post-call
+analysis again with bounded concurrency and a start-rate limit. New analyses
+are tagged with the current model and prompt version; a call that already has
+an analysis with that tag is skipped, so an interrupted run simply resumes.
+
+Usage (from backend/):
+    python -m app.analysis.reanalyze                       # every call not at the current version
+    python -m app.analysis.reanalyze --source upload --from 2024-01-01 --to 2024-03-31
+    python -m app.analysis.reanalyze --missing-only        # only calls with no analysis at all
+"""
+
+import argparse
+import asyncio
+import logging
+import time
+import uuid
+from datetime import date, datetime
+from uuid import UUID
+
+from pydantic import BaseModel
+
+from app.analysis.llm_client import close_http_client, start_http_client
+from app.analysis.post_call import analysis_version, run_post_call_analysis
+from app.config import settings
+from app.db.repository import (
+    count_calls_for_reanalysis,
+    get_transcript_segments,
+    list_calls_for_reanalysis,
+)
+from app.db.session import async_session, dispose_engines, init_db, write_queue
+
+logger = logging.getLogger(__name__)
+
+_DONE = None  # queue sentinel
+
+
+class ReanalysisFilter(BaseModel):
+    """Which calls to re-analyze."""
+
+    source: str | None = None
+    date_from: date | None = None
+    date_to: date | None = None
+    missing_only: bool = False
+
+
+class ReanalysisJob(BaseModel):
+    """Progress of a re-analysis run."""
+
+    id: UUID
+    status: str = "running"  # running | completed | cancelled | failed
+    filter: ReanalysisFilter
+    model: str
+    prompt_version: str
+    concurrency: int
+    rate_per_minute: float
+    total: int | None = None
+    analyzed: int = 0
+    failed: int = 0
+    error: str | None = None
+    created_at: datetime
+    finished_at: datetime | None = None
+
+
+class _RateLimiter:
+    """Spaces out starts to at most `per_minute` per minute (0 = unlimited)."""
+
+    def __init__(self, per_minute: float):
+        self.interval = 60.0 / per_minute if per_minute > 0 else 0.0
+        self._next = 0.0
+        self._lock = asyncio.Lock()
+
+    async def wait(self) -> None:
+        if not self.interval:
+            return
+        async with self._lock:
+            now = time.monotonic()
+            if self._next > now:
+                await asyncio.sleep(self._next - now)
+            self._next = max(now, self._next) + self.interval
+
+
+async def reanalyze(job: ReanalysisJob, page_size: int = 200) -> ReanalysisJob:
+    """Re-analyze every call matching job.filter; updates job counters in place."""
+    f = job.filter
+    async with async_session() as db:
+        job.total = await count_calls_for_reanalysis(
+            db, job.model, job.prompt_version, f.source, f.date_from, f.date_to, f.missing_only
+        )
+    queue: asyncio.Queue = asyncio.Queue(maxsize=job.concurrency * 2)
+    limiter = _RateLimiter(job.rate_per_minute)
+
+    async def worker() -> None:
+        while (call_id := await queue.get()) is not _DONE:
+            await limiter.wait()
+            try:
+                async with async_session() as db:
+                    segments = await get_transcript_segments(db, call_id)
+                texts = [s.text for s in segments]
+                await run_post_call_analysis(call_id, " ".join(texts), texts)
+                job.analyzed += 1
+            except Exception:
+                logger.exception("Re-analysis failed for call %s", call_id)
+                job.failed += 1
+
+    workers = [asyncio.create_task(worker()) for _ in range(job.concurrency)]
+    try:
+        after = None
+        while True:
+            async with async_session() as db:
+                page = await list_calls_for_reanalysis(
+                    db,
+                    job.model,
+                    job.prompt_version,
+                    f.source,
+                    f.date_from,
+                    f.date_to,
+                    f.missing_only,
+                    after=after,
+                    limit=page_size,
+                )
+            if not page:
+                break
+            for call_id, _ in page:
+                await queue.put(call_id)
+            after = (page[-1][1], page[-1][0])
+        for _ in workers:
+            await queue.put(_DONE)
+        await asyncio.gather(*workers)
+    finally:
+        for task in workers:
+            task.cancel()
+    return job
+
+
+def new_job(
+    filter: ReanalysisFilter,
+    concurrency: int | None = None,
+    rate_per_minute: float | None = None,
+) -> ReanalysisJob:
+    model, prompt_version = analysis_version()
+    return ReanalysisJob(
+        id=uuid.uuid4(),
+        filter=filter,
+        model=model,
+        prompt_version=prompt_version,
+        concurrency=max(1, concurrency or settings.reanalysis_concurrency),
+        rate_per_minute=(
+            settings.reanalysis_rate_per_minute if rate_per_minute is None else rate_per_minute
+        ),
+        created_at=datetime.utcnow(),
+    )
+
+
+class JobAlreadyRunningError(Exception):
+    """Raised when a re-analysis run is already in progress."""
+
+
+class ReanalysisManager:
+    """Runs at most one re-analysis job in the background and keeps recent ones."""
+
+    def __init__(self, history_size: int = 20):
+        self.history_size = history_size
+        self._jobs: dict[UUID, ReanalysisJob] = {}
+        self._task: asyncio.Task | None = None
+
+    def start(self, job: ReanalysisJob) -> ReanalysisJob:
+        if self._task is not None and not self._task.done():
+            raise JobAlreadyRunningError("A re-analysis job is already running")
+        self._jobs[job.id] = job
+        while len(self._jobs) > self.history_size:
+            del self._jobs[next(iter(self._jobs))]
+        self._task = asyncio.create_task(self._run(job), name=f"reanalysis-{job.id}")
+        return job
+
+    def get(self, job_id: UUID) -> ReanalysisJob | None:
+        return self._jobs.get(job_id)
+
+    async def cancel(self, job_id: UUID) -> ReanalysisJob | None:
+        job = self._jobs.get(job_id)
+        if job is not None and job.status == "running" and self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+        return job
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    async def _run(self, job: ReanalysisJob) -> None:
+        try:
+            await reanalyze(job)
+            job.status = "completed"
+        except asyncio.CancelledError:
+            job.status = "cancelled"
+            raise
+        except Exception as e:
+            logger.exception("Re-analysis job %s failed", job.id)
+            job.status = "failed"
+            job.error = str(e)
+        finally:
+            job.finished_at = datetime.utcnow()
+
+
+reanalysis_jobs = ReanalysisManager()
+
+
+async def _report(job: ReanalysisJob, interval: float) -> None:
+    started = time.monotonic()
+    while True:
+        await asyncio.sleep(interval)
+        rate = job.analyzed / max(time.monotonic() - started, 1e-9) * 60
+        logger.info(
+            "Re-analyzed %d/%s, failed %d | %.1f calls/min",
+            job.analyzed, job.total, job.failed, rate,
+        )
+
+
+async def _main(args: argparse.Namespace) -> ReanalysisJob:
+    await init_db()
+    await start_http_client()
+    try:
+        job = new_job(
+            ReanalysisFilter(
+                source=args.source,
+                date_from=args.date_from,
+                date_to=args.date_to,
+                missing_only=args.missing_only,
+            ),
+            concurrency=args.concurrency,
+            rate_per_minute=args.rate,
+        )
+        logger.info("Re-analyzing with %s, prompt version %s", job.model, job.prompt_version)
+        reporter = asyncio.create_task(_report(job, args.progress_interval))
+        try:
+            await reanalyze(job)
+        finally:
+            reporter.cancel()
+        return job
+    finally:
+        await close_http_client()
+        await write_queue.stop()
+        await dispose_engines()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Re-run post-call analysis on stored transcripts.")
+    parser.add_argument("--source", default=None, help="Only calls from this source")
+    parser.add_argument("--from", dest="date_from", type=date.fromisoformat, default=None,
+                        help="First call day, inclusive (YYYY-MM-DD)")
+    parser.add_argument("--to", dest="date_to", type=date.fromisoformat, default=None,
+                        help="Last call day, inclusive (YYYY-MM-DD)")
+    parser.add_argument("--missing-only", action="store_true",
+                        help="Only calls without any post-call analysis")
+    parser.add_argument("--concurrency", type=int, default=None,
+                        help="Calls analyzed at once (default: REANALYSIS_CONCURRENCY)")
+    parser.add_argument("--rate", type=float, default=None,
+                        help="Calls started per minute, 0 = unlimited (default: REANALYSIS_RATE_PER_MINUTE)")
+    parser.add_argument("--progress-interval", type=float, default=10.0, help="Seconds between progress logs")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+    job = asyncio.run(_main(args))
+    print(f"Re-analyzed {job.analyzed} of {job.total} calls ({job.failed} failed)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+"""Opaque keyset cursors for list endpoints."""
+
+import base64
+import json
+from datetime import datetime
+from uuid import UUID
+
+from fastapi import HTTPException
+
+
+def _pack(sort_value, row_id: UUID) -> str:
+    raw = json.dumps([sort_value, str(row_id)])
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def _unpack(cursor: str) -> tuple:
+    padded = cursor + "=" * (-len(cursor) % 4)
+    sort_value, row_id = json.loads(base64.urlsafe_b64decode(padded))
+    if not isinstance(row_id, str):
+        raise ValueError(row_id)
+    return sort_value, UUID(row_id)
+
+
+def encode_cursor(sort_value: datetime | None, row_id: UUID) -> str:
+    """Encode the (timestamp, id) of the last row on a page."""
+    return _pack(sort_value.isoformat() if sort_value else None, row_id)
+
+
+def decode_cursor(cursor: str) -> tuple[datetime | None, UUID]:
+    """Decode a cursor from encode_cursor; 400 if it is malformed."""
+    try:
+        sort_value, row_id = _unpack(cursor)
+        if sort_value is not None and not isinstance(sort_value, str):
+            raise ValueError(sort_value)
+        return datetime.fromisoformat(sort_value) if sort_value else None, row_id
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def encode_position_cursor(position: int | None, row_id: UUID) -> str:
+    """Encode the (integer position, id) of the last row on a page."""
+    return _pack(position, row_id)
+
+
+def decode_position_cursor(cursor: str) -> tuple[int | None, UUID]:
+    """Decode a cursor from encode_position_cursor; 400 if it is malformed."""
+    try:
+        position, row_id = _unpack(cursor)
+        if position is not None and (isinstance(position, bool) or not isinstance(position, int)):
+            raise ValueError(position)
+        return position, row_id
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
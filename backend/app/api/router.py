@@ -2,10 +2,16 @@
 
 from fastapi import APIRouter
 
-from app.api.routes import calls, analyses, upload
+from app.api.routes import calls, analyses, upload, jobs, live, analytics, search, export, reanalysis
 
 router = APIRouter()
 
 router.include_router(calls.router, prefix="/calls", tags=["calls"])
 router.include_router(analyses.router, prefix="/analyses", tags=["analyses"])
 router.include_router(upload.router, prefix="/upload", tags=["upload"])
+router.include_router(jobs.router, prefix="/jobs", tags=["jobs"])
+router.include_router(live.router, prefix="/live", tags=["live"])
+router.include_router(analytics.router, prefix="/analytics", tags=["analytics"])
+router.include_router(search.router, prefix="/search", tags=["search"])
+router.include_router(export.router, prefix="/export", tags=["export"])
+router.include_router(reanalysis.router, prefix="/reanalysis", tags=["reanalysis"])
@@ -4,7 +4,8 @@ from fastapi import APIRouter, Depends, Query
 from sqlalchemy.ext.asyncio import AsyncSession
 from uuid import UUID
 
-from app.db.session import get_db
+from app.db.session import get_read_db
+from app.api.pagination import encode_cursor, decode_cursor
 from app.db.repository import list_analyses as repo_list_analyses
 from app.api.schemas import CallAnalysisListResponse, CallAnalysisResponse
 
@@ -13,19 +14,32 @@ router = APIRouter()
 
 @router.get("", response_model=CallAnalysisListResponse)
 async def list_analyses(
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
     call_id: UUID | None = Query(None, description="Filter by call ID"),
     analysis_type: str | None = Query(None, description="Filter by type: realtime, post_call"),
     limit: int = Query(50, ge=1, le=100),
     offset: int = Query(0, ge=0),
+    cursor: str | None = Query(None, description="next_cursor from the previous page"),
+    include_total: bool = Query(True, description="Include a (cached) total count"),
 ):
-    """List call analyses with optional filters."""
+    """List call analyses with optional filters. Use `cursor` for constant-time deep paging."""
     analyses, total = await repo_list_analyses(
-        db, call_id=call_id, analysis_type=analysis_type, limit=limit, offset=offset
+        db,
+        call_id=call_id,
+        analysis_type=analysis_type,
+        limit=limit + 1,
+        offset=offset,
+        after=decode_cursor(cursor) if cursor else None,
+        with_total=include_total,
     )
+    next_cursor = None
+    if len(analyses) > limit:
+        analyses = analyses[:limit]
+        next_cursor = encode_cursor(analyses[-1].created_at, analyses[-1].id)
     return CallAnalysisListResponse(
         analyses=[CallAnalysisResponse.model_validate(a) for a in analyses],
         total=total,
         limit=limit,
         offset=offset,
+        next_cursor=next_cursor,
     )
@@ -0,0 +1,46 @@
+"""Analytics API routes - aggregates served from rollup tables."""
+
+from datetime import date
+from typing import Literal
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.session import get_read_db
+from app.db.rollups import query_summary
+from app.api.schemas import AnalyticsSummaryResponse, AnalyticsSummaryRow
+
+router = APIRouter()
+
+
+@router.get("/summary", response_model=AnalyticsSummaryResponse, response_model_by_alias=True)
+async def analytics_summary(
+    db: AsyncSession = Depends(get_read_db),
+    group_by: Literal["day", "topic", "resolution_status"] = Query("day"),
+    date_from: date | None = Query(None, alias="from", description="First day (inclusive)"),
+    date_to: date | None = Query(None, alias="to", description="Last day (inclusive)"),
+):
+    """Post-call satisfaction, answer rate and resolution metrics by day, topic or status."""
+    if date_from and date_to and date_from > date_to:
+        raise HTTPException(status_code=400, detail="'from' must not be after 'to'")
+    rows = await query_summary(db, group_by, date_from, date_to)
+    return AnalyticsSummaryResponse(
+        group_by=group_by,
+        date_from=date_from,
+        date_to=date_to,
+        rows=[
+            AnalyticsSummaryRow(
+                key=str(r["key"]),
+                calls=r["call_count"],
+                avg_satisfaction=round(r["score_sum"] / r["score_count"], 2) if r["score_count"] else None,
+                questions_answered_rate=(
+                    round(r["answered_count"] / r["answered_known"], 4) if r["answered_known"] else None
+                ),
+                resolved=r["resolved_count"],
+                partial=r["partial_count"],
+                unresolved=r["unresolved_count"],
+                unknown=r["call_count"] - r["resolved_count"] - r["partial_count"] - r["unresolved_count"],
+            )
+            for r in rows
+        ],
+    )
@@ -1,25 +1,47 @@
 """Calls API routes."""
 
-from fastapi import APIRouter, Depends, Query, HTTPException
+import asyncio
+import hashlib
+import json
+
+from fastapi import APIRouter, Depends, Header, Query, HTTPException, Response
 from sqlalchemy.ext.asyncio import AsyncSession
 from uuid import UUID
 
-from app.db.session import get_db
-from app.db.repository import list_calls as repo_list_calls, get_call as repo_get_call
-from app.api.schemas import CallListResponse, CallDetailResponse, CallResponse, TranscriptSegmentResponse, CallAnalysisResponse
+from app.analysis.embeddings import vector_index
+from app.db.cache import call_detail_cache
+from app.db.session import get_read_db
+from app.api.pagination import encode_cursor, decode_cursor, encode_position_cursor, decode_position_cursor
+from app.db.repository import list_calls as repo_list_calls, get_call as repo_get_call, call_exists, get_call_version, list_segments_window
+from app.api.schemas import CallListResponse, CallDetailResponse, CallResponse, TranscriptSegmentResponse, TranscriptSegmentPageResponse, CallAnalysisResponse, SimilarCall, SimilarCallsResponse
 
 router = APIRouter()
 
 
 @router.get("", response_model=CallListResponse)
 async def list_calls(
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
     source: str | None = Query(None, description="Filter by source: google_meet, twilio, upload"),
+    status: str | None = Query(None, description="Filter by status: live, transcribing, analyzing, completed, failed"),
     limit: int = Query(50, ge=1, le=100),
     offset: int = Query(0, ge=0),
+    cursor: str | None = Query(None, description="next_cursor from the previous page"),
+    include_total: bool = Query(True, description="Include a (cached) total count"),
 ):
-    """List calls with optional filters."""
-    calls, total = await repo_list_calls(db, source=source, limit=limit, offset=offset)
+    """List calls with optional filters. Use `cursor` for constant-time deep paging."""
+    calls, total = await repo_list_calls(
+        db,
+        source=source,
+        status=status,
+        limit=limit + 1,
+        offset=offset,
+        after=decode_cursor(cursor) if cursor else None,
+        with_total=include_total,
+    )
+    next_cursor = None
+    if len(calls) > limit:
+        calls = calls[:limit]
+        next_cursor = encode_cursor(calls[-1].started_at, calls[-1].id)
     return CallListResponse(
         calls=[
             CallResponse(
@@ -29,6 +51,8 @@ async def list_calls(
                 started_at=c.started_at,
                 ended_at=c.ended_at,
                 metadata=c.metadata_ or {},
+                status=c.status,
+                error=c.error,
                 created_at=c.created_at,
             )
             for c in calls
@@ -36,28 +60,126 @@ async def list_calls(
         total=total,
         limit=limit,
         offset=offset,
+        next_cursor=next_cursor,
     )
 
 
+def _etag(variant: str, version: list) -> str:
+    raw = json.dumps([variant, *version], default=str, sort_keys=True)
+    return f'"{hashlib.sha256(raw.encode()).hexdigest()[:32]}"'
+
+
+def _etag_matches(if_none_match: str | None, etag: str) -> bool:
+    if not if_none_match:
+        return False
+    tags = [t.strip() for t in if_none_match.split(",")]
+    return "*" in tags or etag in tags or f"W/{etag}" in tags
+
+
+def _detail_response(etag: str, body: bytes | None, if_none_match: str | None) -> Response:
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if body is None or _etag_matches(if_none_match, etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
 @router.get("/{call_id}", response_model=CallDetailResponse)
 async def get_call(
     call_id: UUID,
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
+    include_segments: bool = Query(
+        True, description="Embed the full transcript; use /segments to page long calls instead"
+    ),
+    if_none_match: str | None = Header(None),
 ):
-    """Get a single call with transcript and analyses."""
-    call = await repo_get_call(db, call_id)
+    """
+    Get a single call with transcript and analyses. Responses carry a strong
+    ETag; send it back in If-None-Match to get 304 while the call is unchanged.
+    """
+    variant = "full" if include_segments else "no_segments"
+    cached = call_detail_cache.get(call_id, variant)
+    if cached is not None:
+        return _detail_response(*cached, if_none_match)
+
+    version = await get_call_version(db, call_id)
+    if version is None:
+        raise HTTPException(status_code=404, detail="Call not found")
+    etag = _etag(variant, version)
+    if _etag_matches(if_none_match, etag):
+        return _detail_response(etag, None, if_none_match)
+
+    call = await repo_get_call(db, call_id, with_segments=include_segments)
     if not call:
         raise HTTPException(status_code=404, detail="Call not found")
-    return CallDetailResponse(
+    body = CallDetailResponse(
         id=call.id,
         source=call.source,
         external_id=call.external_id,
         started_at=call.started_at,
         ended_at=call.ended_at,
         metadata=call.metadata_ or {},
+        status=call.status,
+        error=call.error,
         created_at=call.created_at,
-        segments=[TranscriptSegmentResponse.model_validate(s) for s in call.segments],
+        segments=(
+            [TranscriptSegmentResponse.model_validate(s) for s in call.segments]
+            if include_segments
+            else []
+        ),
         analyses=[CallAnalysisResponse.model_validate(a) for a in call.analyses],
+    ).model_dump_json().encode()
+    if await get_call_version(db, call_id) != version:
+        # Changed while loading: the body may not match the ETag, so send neither
+        return Response(content=body, media_type="application/json")
+    call_detail_cache.put(call_id, variant, etag, body)
+    return _detail_response(etag, body, if_none_match)
+
+
+@router.get("/{call_id}/segments", response_model=TranscriptSegmentPageResponse)
+async def list_call_segments(
+    call_id: UUID,
+    db: AsyncSession = Depends(get_read_db),
+    from_ms: int | None = Query(None, ge=0, description="Only segments ending at or after this offset"),
+    to_ms: int | None = Query(None, ge=0, description="Only segments starting at or before this offset"),
+    limit: int = Query(200, ge=1, le=1000),
+    cursor: str | None = Query(None, description="next_cursor from the previous page"),
+):
+    """Page through a call's transcript in time order, optionally within a time range."""
+    if from_ms is not None and to_ms is not None and from_ms > to_ms:
+        raise HTTPException(status_code=400, detail="from_ms must not be greater than to_ms")
+    segments = await list_segments_window(
+        db,
+        call_id,
+        from_ms=from_ms,
+        to_ms=to_ms,
+        limit=limit + 1,
+        after=decode_position_cursor(cursor) if cursor else None,
+    )
+    if not segments and not await call_exists(db, call_id):
+        raise HTTPException(status_code=404, detail="Call not found")
+    next_cursor = None
+    if len(segments) > limit:
+        segments = segments[:limit]
+        next_cursor = encode_position_cursor(segments[-1].start_time_ms, segments[-1].id)
+    return TranscriptSegmentPageResponse(
+        call_id=call_id,
+        segments=[TranscriptSegmentResponse.model_validate(s) for s in segments],
+        limit=limit,
+        next_cursor=next_cursor,
     )
 
 
+@router.get("/{call_id}/similar", response_model=SimilarCallsResponse)
+async def similar_calls(
+    call_id: UUID,
+    k: int = Query(10, ge=1, le=100),
+):
+    """Calls most similar to this one (cosine similarity of local embeddings)."""
+    vector = await asyncio.to_thread(vector_index.vector, call_id)
+    if vector is None:
+        raise HTTPException(status_code=404, detail="Call has no embedding yet")
+    hits = await asyncio.to_thread(vector_index.search, vector, k, call_id)
+    return SimilarCallsResponse(
+        call_id=call_id,
+        results=[SimilarCall(call_id=c, score=round(score, 4)) for c, score in hits],
+    )
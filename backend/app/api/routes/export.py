@@ -0,0 +1,68 @@
+"""Export API routes - bulk NDJSON streams for warehouse loads."""
+
+from datetime import datetime
+from uuid import UUID
+
+from fastapi import APIRouter, HTTPException, Query
+from fastapi.responses import StreamingResponse
+
+from app.config import settings
+from app.db.session import read_session
+from app.db.repository import get_call_created_at, iter_call_batches
+from app.api.schemas import CallAnalysisResponse, CallDetailResponse, TranscriptSegmentResponse
+
+router = APIRouter()
+
+
+@router.get("/calls", response_class=StreamingResponse)
+async def export_calls(
+    source: str | None = Query(None, description="Filter by source: google_meet, twilio, upload"),
+    created_from: datetime | None = Query(None, alias="from", description="created_at >= from"),
+    created_to: datetime | None = Query(None, alias="to", description="created_at < to"),
+    after_id: UUID | None = Query(None, description="id of the last call received, to resume"),
+):
+    """
+    Stream every matching call with its segments and analyses as NDJSON
+    (one call detail object per line), oldest first.
+    """
+    if created_from and created_to and created_from >= created_to:
+        raise HTTPException(status_code=400, detail="'from' must be before 'to'")
+    after = None
+    if after_id is not None:
+        async with read_session() as db:
+            created_at = await get_call_created_at(db, after_id)
+        if created_at is None:
+            raise HTTPException(status_code=400, detail="Unknown after_id")
+        after = (created_at, after_id)
+
+    async def lines():
+        # The stream outlives the request handler, so it owns its session
+        async with read_session() as db:
+            batches = iter_call_batches(
+                db,
+                source=source,
+                created_from=created_from,
+                created_to=created_to,
+                after=after,
+                batch_size=settings.export_batch_size,
+            )
+            async for batch in batches:
+                yield "".join(
+                    CallDetailResponse(
+                        id=call.id,
+                        source=call.source,
+                        external_id=call.external_id,
+                        started_at=call.started_at,
+                        ended_at=call.ended_at,
+                        metadata=call.metadata_ or {},
+                        status=call.status,
+                        error=call.error,
+                        created_at=call.created_at,
+                        segments=[TranscriptSegmentResponse.model_validate(s) for s in segments],
+                        analyses=[CallAnalysisResponse.model_validate(a) for a in analyses],
+                    ).model_dump_json()
+                    + "\n"
+                    for call, segments, analyses in batch
+                )
+
+    return StreamingResponse(lines(), media_type="application/x-ndjson")
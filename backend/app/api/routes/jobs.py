@@ -0,0 +1,18 @@
+"""Background upload job status API."""
+
+from fastapi import APIRouter, HTTPException
+from uuid import UUID
+
+from app.ingest.jobs import job_queue
+from app.api.schemas import JobResponse
+
+router = APIRouter()
+
+
+@router.get("/{job_id}", response_model=JobResponse)
+async def get_job(job_id: UUID):
+    """Get the status of a background upload job."""
+    job = job_queue.get(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return JobResponse.model_validate(job)
@@ -0,0 +1,168 @@
+"""Live streaming transcription over WebSocket."""
+
+import asyncio
+import json
+import logging
+from datetime import datetime
+from uuid import UUID
+
+from fastapi import APIRouter, Query, WebSocket, WebSocketDisconnect, status
+
+from app.analysis.post_call import run_post_call_analysis
+from app.config import settings
+from app.db.repository import add_transcript_segments, create_call, update_call
+from app.db.session import run_write
+from app.ingest.live import ENCODINGS, new_decoder, new_segmenter
+from app.ingest.upload import mark_call_failed
+from app.transcription.whisper_client import transcribe_samples_async
+
+router = APIRouter()
+logger = logging.getLogger(__name__)
+
+
+class _Client:
+    """Sends to the socket until the peer goes away, then silently drops messages."""
+
+    def __init__(self, websocket: WebSocket):
+        self.websocket = websocket
+        self.connected = True
+
+    async def send(self, message: dict) -> None:
+        if not self.connected:
+            return
+        try:
+            await self.websocket.send_json(message)
+        except (WebSocketDisconnect, RuntimeError):
+            self.connected = False
+
+
+async def _transcribe_windows(
+    client: _Client,
+    call_id: UUID,
+    windows: asyncio.Queue,
+    texts: list[str],
+) -> None:
+    """Transcribe windows in stream order, persist and push each segment."""
+    while (item := await windows.get()) is not None:
+        samples, offset_ms = item
+        try:
+            transcript = await transcribe_samples_async(samples, offset_ms)
+        except Exception:
+            logger.exception("Live transcription failed for call %s", call_id)
+            await client.send({"type": "error", "detail": "Transcription failed for a window"})
+            continue
+        if not transcript.segments:
+            continue
+        rows = [s.model_dump() for s in transcript.segments]
+        ids = await run_write(lambda db: add_transcript_segments(db, call_id, rows))
+        texts.append(transcript.full_text)
+        for segment_id, row in zip(ids, rows):
+            await client.send(
+                {"type": "segment", "segment": {"id": str(segment_id), "call_id": str(call_id), **row}}
+            )
+
+
+async def _enqueue(windows: asyncio.Queue, worker: asyncio.Task, item) -> None:
+    """Queue a window for the worker; raises the worker's error if it has died."""
+    if worker.done():
+        worker.result()
+    put = asyncio.ensure_future(windows.put(item))
+    await asyncio.wait({put, worker}, return_when=asyncio.FIRST_COMPLETED)
+    if not put.done():
+        put.cancel()
+        worker.result()  # the worker only stops early by raising
+
+
+@router.websocket("")
+async def live_transcription(
+    websocket: WebSocket,
+    encoding: str = Query("pcm_s16le", description="pcm_s16le (mono) or opus (one packet per message)"),
+    sample_rate: int = Query(16000, ge=8000, le=48000),
+    source: str = Query("live", max_length=20, description="google_meet, twilio, live"),
+    external_id: str | None = Query(None, max_length=255),
+):
+    """
+    Stream call audio as binary messages; finalized transcript segments are
+    pushed back as they are produced. Send {"event": "stop"} (or close the
+    socket) to end the call and run post-call analysis.
+    """
+    if encoding not in ENCODINGS:
+        await websocket.close(code=status.WS_1003_UNSUPPORTED_DATA, reason="Unsupported encoding")
+        return
+    try:
+        decoder = new_decoder(encoding, sample_rate)
+    except Exception:
+        logger.exception("Could not create %s decoder", encoding)
+        await websocket.close(code=status.WS_1011_INTERNAL_ERROR, reason="Decoder unavailable")
+        return
+    await websocket.accept()
+    client = _Client(websocket)
+
+    call = await run_write(
+        lambda db: create_call(
+            db, source=source, external_id=external_id, started_at=datetime.utcnow(), status="live"
+        )
+    )
+    await client.send({"type": "started", "call_id": str(call.id)})
+
+    segmenter = new_segmenter()
+    windows: asyncio.Queue = asyncio.Queue(maxsize=settings.live_max_pending_windows)
+    texts: list[str] = []
+    worker = asyncio.create_task(_transcribe_windows(client, call.id, windows, texts))
+
+    try:
+        try:
+            while True:
+                message = await websocket.receive()
+                if message["type"] == "websocket.disconnect":
+                    client.connected = False
+                    break
+                if message.get("bytes"):
+                    try:
+                        samples = decoder.decode(message["bytes"])
+                    except Exception as e:
+                        logger.warning("Dropping undecodable packet for call %s: %s", call.id, e)
+                        await client.send({"type": "error", "detail": "Could not decode audio packet"})
+                        continue
+                    # A full queue blocks here, pushing back on the sender
+                    for window in segmenter.feed(samples):
+                        await _enqueue(windows, worker, window)
+                elif message.get("text"):
+                    try:
+                        event = json.loads(message["text"]).get("event")
+                    except (ValueError, AttributeError):
+                        event = None
+                    if event == "stop":
+                        break
+        finally:
+            if not worker.done():
+                tail = segmenter.flush()
+                if tail is not None:
+                    await _enqueue(windows, worker, tail)
+                await _enqueue(windows, worker, None)
+        await worker
+        await run_write(
+            lambda db: update_call(db, call.id, ended_at=datetime.utcnow(), status="analyzing")
+        )
+    except (Exception, asyncio.CancelledError) as e:
+        logger.exception("Live stream failed for call %s", call.id)
+        worker.cancel()
+        await mark_call_failed(call.id, e, ended_at=datetime.utcnow())
+        if isinstance(e, asyncio.CancelledError):
+            raise
+        await client.send({"type": "error", "detail": "Live transcription failed"})
+        if client.connected:
+            await websocket.close(code=status.WS_1011_INTERNAL_ERROR)
+        return
+
+    full_text = " ".join(texts)
+    try:
+        analysis = await run_post_call_analysis(call.id, full_text, texts)
+    except Exception as e:
+        logger.exception("Post-call analysis failed for call %s", call.id)
+        await mark_call_failed(call.id, e)
+        await client.send({"type": "error", "detail": "Post-call analysis failed"})
+    else:
+        await client.send({"type": "completed", "call_id": str(call.id), "analysis": analysis})
+    if client.connected:
+        await websocket.close()
@@ -0,0 +1,66 @@
+"""Bulk re-analysis API - re-run post-call analysis on stored transcripts."""
+
+from fastapi import APIRouter, HTTPException
+from uuid import UUID
+
+from app.analysis.reanalyze import (
+    JobAlreadyRunningError,
+    ReanalysisFilter,
+    ReanalysisJob,
+    new_job,
+    reanalysis_jobs,
+)
+from app.api.schemas import ReanalysisJobResponse, ReanalysisRequest
+
+router = APIRouter()
+
+
+def _response(job: ReanalysisJob) -> ReanalysisJobResponse:
+    return ReanalysisJobResponse(
+        **job.model_dump(exclude={"filter"}),
+        **job.filter.model_dump(),
+    )
+
+
+@router.post("", response_model=ReanalysisJobResponse, response_model_by_alias=True, status_code=202)
+async def start_reanalysis(request: ReanalysisRequest):
+    """
+    Start a background job that re-analyzes matching calls from their stored
+    transcripts with the current model and prompts. Calls already analyzed at
+    this version are skipped, so starting again after a restart resumes.
+    """
+    if request.date_from and request.date_to and request.date_from > request.date_to:
+        raise HTTPException(status_code=400, detail="'from' must not be after 'to'")
+    job = new_job(
+        ReanalysisFilter(
+            source=request.source,
+            date_from=request.date_from,
+            date_to=request.date_to,
+            missing_only=request.missing_only,
+        ),
+        concurrency=request.concurrency,
+        rate_per_minute=request.rate_per_minute,
+    )
+    try:
+        reanalysis_jobs.start(job)
+    except JobAlreadyRunningError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    return _response(job)
+
+
+@router.get("/{job_id}", response_model=ReanalysisJobResponse, response_model_by_alias=True)
+async def get_reanalysis(job_id: UUID):
+    """Progress of a re-analysis job."""
+    job = reanalysis_jobs.get(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return _response(job)
+
+
+@router.delete("/{job_id}", response_model=ReanalysisJobResponse, response_model_by_alias=True)
+async def cancel_reanalysis(job_id: UUID):
+    """Cancel a running re-analysis job; analyses already written are kept."""
+    job = await reanalysis_jobs.cancel(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return _response(job)
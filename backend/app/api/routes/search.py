@@ -0,0 +1,40 @@
+"""Transcript search API routes."""
+
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+from uuid import UUID
+
+from app.db.session import get_read_db
+from app.db.search import search_segments
+from app.api.schemas import SearchHit, SearchResponse
+
+router = APIRouter()
+
+
+@router.get("", response_model=SearchResponse)
+async def search_transcripts(
+    q: str = Query(..., min_length=1, max_length=500, description="Words to find, e.g. chargeback"),
+    db: AsyncSession = Depends(get_read_db),
+    call_id: UUID | None = Query(None, description="Restrict to one call"),
+    limit: int = Query(20, ge=1, le=100),
+    offset: int = Query(0, ge=0, le=10000),
+):
+    """Full-text search over transcript segments, best matches first."""
+    hits = await search_segments(db, q, call_id=call_id, limit=limit, offset=offset)
+    return SearchResponse(
+        query=q,
+        results=[
+            SearchHit(
+                segment_id=h["id"],
+                call_id=h["call_id"],
+                speaker=h["speaker"],
+                start_time_ms=h["start_time_ms"],
+                end_time_ms=h["end_time_ms"],
+                snippet=h["snippet"],
+                rank=h["rank"],
+            )
+            for h in hits
+        ],
+        limit=limit,
+        offset=offset,
+    )
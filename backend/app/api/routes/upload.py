@@ -2,20 +2,34 @@
 
 import logging
 
-from fastapi import APIRouter, UploadFile, File, Depends, HTTPException
-from sqlalchemy.ext.asyncio import AsyncSession
+from fastapi import APIRouter, UploadFile, File, HTTPException, Query
+from fastapi.responses import JSONResponse
 
-from app.db.session import get_db
-from app.ingest.upload import process_upload, ALLOWED_EXTENSIONS
+from app.config import settings
+from app.ingest.jobs import job_queue, QueueFullError
+from app.ingest.upload import (
+    process_upload,
+    save_upload,
+    ALLOWED_EXTENSIONS,
+    UploadTooLargeError,
+)
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
 
 
+def _queue_full() -> HTTPException:
+    return HTTPException(
+        status_code=429,
+        detail="Upload queue is full, retry later",
+        headers={"Retry-After": str(settings.upload_retry_after_seconds)},
+    )
+
+
 @router.post("")
 async def upload_audio(
     file: UploadFile = File(..., description="Audio file (mp3, wav, m4a, ogg, flac, webm, mp4)"),
-    db: AsyncSession = Depends(get_db),
+    background: bool = Query(False, description="Queue for processing and return 202 immediately"),
 ):
     """Upload an audio file for transcription and analysis."""
     if not file.filename:
@@ -29,9 +43,33 @@ async def upload_audio(
             detail=f"Unsupported format. Allowed: {', '.join(sorted(ALLOWED_EXTENSIONS))}",
         )
 
+    if background:
+        if job_queue.full():
+            raise _queue_full()
+        try:
+            saved = await save_upload(file)
+        except UploadTooLargeError as e:
+            raise HTTPException(status_code=413, detail=str(e))
+        try:
+            job = job_queue.submit(saved, file.filename)
+        except QueueFullError:
+            saved.path.unlink(missing_ok=True)
+            raise _queue_full()
+        return JSONResponse(
+            status_code=202,
+            content={
+                "message": "Upload queued",
+                "job_id": str(job.id),
+                "status_url": f"/api/v1/jobs/{job.id}",
+                "filename": file.filename,
+            },
+        )
+
     try:
-        call_id, _ = await process_upload(db, file)
+        call_id, _ = await process_upload(file)
         return {"message": "Upload processed", "call_id": call_id, "filename": file.filename}
+    except UploadTooLargeError as e:
+        raise HTTPException(status_code=413, detail=str(e))
     except Exception as e:
         logger.exception("Upload failed")
         raise HTTPException(status_code=500, detail=str(e))
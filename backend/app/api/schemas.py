@@ -1,6 +1,6 @@
 """Pydantic schemas for API request/response."""
 
-from datetime import datetime
+from datetime import date, datetime
 from uuid import UUID
 from pydantic import BaseModel, Field
 
@@ -20,6 +20,8 @@ class CallCreate(CallBase):
 
 class CallResponse(CallBase):
     id: UUID
+    status: str = "completed"  # live | transcribing | analyzing | completed | failed
+    error: str | None = None
     created_at: datetime
 
     model_config = {"from_attributes": True}
@@ -27,9 +29,10 @@ class CallResponse(CallBase):
 
 class CallListResponse(BaseModel):
     calls: list[CallResponse]
-    total: int
+    total: int | None = None
     limit: int
     offset: int
+    next_cursor: str | None = None
 
 
 # --- Transcript Segment ---
@@ -47,6 +50,13 @@ class TranscriptSegmentResponse(TranscriptSegmentBase):
     model_config = {"from_attributes": True}
 
 
+class TranscriptSegmentPageResponse(BaseModel):
+    call_id: UUID
+    segments: list[TranscriptSegmentResponse]
+    limit: int
+    next_cursor: str | None = None
+
+
 # --- Call Analysis ---
 class CallAnalysisPayload(BaseModel):
     customer_satisfaction_score: int | None = None
@@ -63,6 +73,8 @@ class CallAnalysisResponse(BaseModel):
     call_id: UUID
     analysis_type: str
     payload: dict
+    model: str | None = None
+    prompt_version: str | None = None
     created_at: datetime
 
     model_config = {"from_attributes": True}
@@ -70,12 +82,106 @@ class CallAnalysisResponse(BaseModel):
 
 class CallAnalysisListResponse(BaseModel):
     analyses: list[CallAnalysisResponse]
-    total: int
+    total: int | None = None
     limit: int
     offset: int
+    next_cursor: str | None = None
 
 
 # --- Call detail (with transcript and analyses) ---
 class CallDetailResponse(CallResponse):
     segments: list[TranscriptSegmentResponse] = []
     analyses: list[CallAnalysisResponse] = []
+
+
+# --- Upload jobs ---
+class JobResponse(BaseModel):
+    id: UUID
+    status: str
+    filename: str | None = None
+    call_id: UUID | None = None
+    error: str | None = None
+    created_at: datetime
+    started_at: datetime | None = None
+    finished_at: datetime | None = None
+
+    model_config = {"from_attributes": True}
+
+
+# --- Re-analysis ---
+class ReanalysisRequest(BaseModel):
+    source: str | None = None
+    date_from: date | None = Field(None, alias="from")
+    date_to: date | None = Field(None, alias="to")
+    missing_only: bool = False
+    concurrency: int | None = Field(None, ge=1, le=64)
+    rate_per_minute: float | None = Field(None, ge=0)
+
+    model_config = {"populate_by_name": True}
+
+
+class ReanalysisJobResponse(BaseModel):
+    id: UUID
+    status: str
+    source: str | None = None
+    date_from: date | None = Field(None, serialization_alias="from")
+    date_to: date | None = Field(None, serialization_alias="to")
+    missing_only: bool
+    model: str
+    prompt_version: str
+    concurrency: int
+    rate_per_minute: float
+    total: int | None = None
+    analyzed: int
+    failed: int
+    error: str | None = None
+    created_at: datetime
+    finished_at: datetime | None = None
+
+
+# --- Analytics ---
+class AnalyticsSummaryRow(BaseModel):
+    key: str
+    calls: int
+    avg_satisfaction: float | None = None
+    questions_answered_rate: float | None = None
+    resolved: int = 0
+    partial: int = 0
+    unresolved: int = 0
+    unknown: int = 0
+
+
+class AnalyticsSummaryResponse(BaseModel):
+    group_by: str
+    date_from: date | None = Field(None, serialization_alias="from")
+    date_to: date | None = Field(None, serialization_alias="to")
+    rows: list[AnalyticsSummaryRow]
+
+
+# --- Search ---
+class SearchHit(BaseModel):
+    segment_id: UUID
+    call_id: UUID
+    speaker: str
+    start_time_ms: int | None = None
+    end_time_ms: int | None = None
+    snippet: str
+    rank: float
+
+
+class SearchResponse(BaseModel):
+    query: str
+    results: list[SearchHit]
+    limit: int
+    offset: int
+
+
+# --- Similar calls ---
+class SimilarCall(BaseModel):
+    call_id: UUID
+    score: float
+
+
+class SimilarCallsResponse(BaseModel):
+    call_id: UUID
+    results: list[SimilarCall]
@@ -20,6 +20,29 @@ class Settings(BaseSettings):
     # Database – SQLite for local dev, PostgreSQL (Supabase) for production
     database_url: str = "sqlite+aiosqlite:///./resonance.db"
 
+    # Optional read-only replica for GET endpoints (PostgreSQL); writes stay on database_url.
+    # Replicas lag, so a call may 404 there for a moment right after it is created.
+    database_read_url: str = ""
+
+    # PostgreSQL connection pool (per engine; the replica gets its own pool)
+    db_pool_size: int = 10
+    db_max_overflow: int = 10
+    db_pool_timeout_seconds: float = 30.0
+    db_pool_recycle_seconds: int = 1800
+    db_pool_pre_ping: bool = True
+
+    # SQLite profile: WAL journal with synchronous=NORMAL, page cache and mmap
+    # sizes, and how long a connection waits on a lock before failing
+    sqlite_wal: bool = True
+    sqlite_cache_size_mb: int = 64
+    sqlite_mmap_size_mb: int = 256
+    sqlite_busy_timeout_ms: int = 5000
+    # SQLite writes run on one writer connection; units queued together share a commit
+    sqlite_write_batch: int = 64
+
+    # List endpoint totals are cached this long per filter set (0 = always count)
+    count_cache_ttl_seconds: int = 30
+
     # Gemini
     gemini_api_key: str = ""
     gemini_model: str = "gemini-2.0-flash"
@@ -28,8 +51,83 @@ class Settings(BaseSettings):
     llm_provider: str = "gemini"
     ollama_base_url: str = "http://localhost:11434/v1"
 
+    # Transcripts above this many (estimated) tokens are analyzed map-reduce style
+    llm_chunk_tokens: int = 6000
+    # Concurrent LLM requests per analysis
+    llm_max_concurrency: int = 4
+
+    # Shared HTTP client for LLM providers
+    llm_http2: bool = False
+    llm_timeout_seconds: float = 60.0
+    llm_connect_timeout_seconds: float = 10.0
+    llm_max_connections: int = 20
+    llm_max_keepalive_connections: int = 10
+    llm_keepalive_expiry_seconds: float = 30.0
+
+    # LLM analysis cache: in-memory LRU in front of the llm_cache table
+    llm_cache_enabled: bool = True
+    llm_cache_memory_entries: int = 1024
+    llm_cache_ttl_hours: int = 720
+
+    # Bulk re-analysis (POST /reanalysis, python -m app.analysis.reanalyze):
+    # calls analyzed at once and LLM-bound calls started per minute (0 = unlimited)
+    reanalysis_concurrency: int = 4
+    reanalysis_rate_per_minute: float = 60.0
+
     # Whisper
     whisper_model_size: str = "base"
+    # Worker processes with a preloaded model each (0 = in-process thread executor)
+    whisper_processes: int = 0
+    # CTranslate2 threads per model (0 = cores / whisper_processes, or library default)
+    whisper_cpu_threads: int = 0
+    # Concurrent transcriptions one model instance can serve
+    whisper_num_workers: int = 1
+    # Dual-channel recordings: transcribe each channel separately as agent/customer;
+    # agent channel: left | right
+    whisper_split_channels: bool = True
+    whisper_agent_channel: str = "left"
+    # Silero VAD before Whisper: only speech (plus padding) is transcribed; a pause
+    # must last min_silence_ms to split speech regions
+    whisper_vad_enabled: bool = True
+    whisper_vad_threshold: float = 0.5
+    whisper_vad_min_silence_ms: int = 1000
+    whisper_vad_speech_pad_ms: int = 400
+    # Tracks longer than 1.5x chunk_seconds are cut at silences and the chunks
+    # transcribed in parallel across the pool (0 = never split)
+    whisper_chunk_seconds: float = 300.0
+    whisper_chunk_overlap_seconds: float = 1.0
+
+    # Live streams (WebSocket /live): energy VAD bounds the windows sent to Whisper
+    live_vad_threshold: float = 0.01
+    live_min_silence_ms: int = 500
+    live_max_window_seconds: float = 15.0
+    live_max_pending_windows: int = 8
+
+    # Local call embeddings for similarity search (hashing vectorizer, no network)
+    embeddings_enabled: bool = True
+    embedding_dims: int = 256
+    vector_index_dir: str = "./cache/vectors"
+
+    # Transcript cache keyed on audio hash + model + options (0 disables)
+    transcript_cache_dir: str = "./cache/transcripts"
+    transcript_cache_max_mb: int = 512
+
+    # Uploads are streamed to disk in chunks; larger files are rejected with 413
+    upload_chunk_bytes: int = 1024 * 1024
+    upload_max_bytes: int = 1024 * 1024 * 1024
+
+    # Background uploads (POST /upload?background=true)
+    upload_queue_size: int = 16
+    upload_workers: int = 2
+    upload_job_history: int = 1000
+    upload_retry_after_seconds: int = 30
+
+    # In-process cache of call detail responses (0 disables; single API worker only,
+    # and off when a read replica is configured)
+    call_cache_max_mb: int = 0
+
+    # Streaming exports: calls fetched per server-side cursor batch
+    export_batch_size: int = 500
 
     # CORS (use "*" or comma-separated origins)
     cors_origins: str = "*"
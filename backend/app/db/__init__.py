@@ -1,7 +1,7 @@
 """Database module."""
 
 from app.db.session import get_db, init_db, async_session
-from app.db.models import Base, Call, TranscriptSegment, CallAnalysis
+from app.db.models import Base, Call, TranscriptSegment, CallAnalysis, LLMCacheEntry, AnalyticsRollup
 
 __all__ = [
     "get_db",
@@ -11,4 +11,6 @@ __all__ = [
     "Call",
     "TranscriptSegment",
     "CallAnalysis",
+    "LLMCacheEntry",
+    "AnalyticsRollup",
 ]
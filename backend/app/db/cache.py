@@ -0,0 +1,97 @@
+"""In-process cache of serialized call detail responses.
+
+Entries are keyed on (call id, variant) and hold the response's ETag and JSON
+bytes. Repository writes mark the call as changed on the session; the entry
+is dropped immediately and again once the transaction commits, so a read
+racing the write cannot re-cache the old body. Invalidation is local to this
+process - only enable it when the API runs as a single worker.
+"""
+
+from collections import OrderedDict
+from uuid import UUID
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.config import settings
+
+_CHANGED = "changed_call_ids"
+
+
+class CallDetailCache:
+    """Byte-bounded LRU of (etag, body) per call detail variant."""
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._size = 0
+        self._entries: OrderedDict[tuple[UUID, str], tuple[str, bytes]] = OrderedDict()
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_bytes > 0
+
+    def get(self, call_id: UUID, variant: str) -> tuple[str, bytes] | None:
+        if not self.enabled:
+            return None
+        entry = self._entries.get((call_id, variant))
+        if entry is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end((call_id, variant))
+        self.hits += 1
+        return entry
+
+    def put(self, call_id: UUID, variant: str, etag: str, body: bytes) -> None:
+        if not self.enabled or len(body) > self.max_bytes // 4:
+            return
+        key = (call_id, variant)
+        old = self._entries.pop(key, None)
+        if old is not None:
+            self._size -= len(old[1])
+        self._entries[key] = (etag, body)
+        self._size += len(body)
+        while self._size > self.max_bytes:
+            _, (_, evicted) = self._entries.popitem(last=False)
+            self._size -= len(evicted)
+
+    def invalidate(self, call_id: UUID) -> None:
+        for key in [k for k in self._entries if k[0] == call_id]:
+            self._size -= len(self._entries.pop(key)[1])
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            "enabled": self.enabled,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / total, 4) if total else 0.0,
+            "entries": len(self._entries),
+            "size_bytes": self._size,
+            "max_bytes": self.max_bytes,
+        }
+
+
+# Reads from a lagging replica could re-cache a body the primary has already replaced
+call_detail_cache = CallDetailCache(
+    0 if settings.database_read_url else settings.call_cache_max_mb * 1024 * 1024
+)
+
+
+def mark_call_changed(db: AsyncSession, call_id: UUID) -> None:
+    """Drop cached responses for a call now and after the session commits."""
+    call_detail_cache.invalidate(call_id)
+    db.sync_session.info.setdefault(_CHANGED, set()).add(call_id)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_committed(session: Session) -> None:
+    for call_id in session.info.pop(_CHANGED, ()):
+        call_detail_cache.invalidate(call_id)
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _forget_rolled_back(session: Session, previous_transaction) -> None:
+    session.info.pop(_CHANGED, None)
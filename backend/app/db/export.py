@@ -0,0 +1,291 @@
+"""Columnar export - incremental, day-partitioned Parquet for DuckDB / Spark.
+
+Writes two Hive-partitioned datasets under the output directory:
+    segments/day=YYYY-MM-DD/part-*.parquet   transcript_segments
+    analyses/day=YYYY-MM-DD/part-*.parquet   call_analyses, payload flattened
+
+The day is the row's created_at date (UTC). Each run appends new files for
+rows created after the previous run's watermark, stored as (created_at, id)
+per dataset in _watermark.json next to the data. Rows newer than --lag-seconds
+are left for the next run so transactions still in flight are not skipped.
+Files are written under a temporary name and renamed into place before the
+watermark advances, so an interrupted run exports nothing and can be re-run.
+
+Usage (from backend/):
+    python -m app.db.export /warehouse/resonance
+    python -m app.db.export /warehouse/resonance --full     # re-export, replacing all files
+
+Read back with e.g. DuckDB:
+    SELECT * FROM read_parquet('/warehouse/resonance/analyses/*/*.parquet', hive_partitioning = true)
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from uuid import UUID, uuid4
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+from sqlalchemy import and_, or_, select
+
+from app.db.models import Call, CallAnalysis, TranscriptSegment, as_utc
+
+ROW_GROUP_ROWS = 50_000
+WATERMARK_FILE = "_watermark.json"
+
+SEGMENT_SCHEMA = pa.schema([
+    ("id", pa.string()),
+    ("call_id", pa.string()),
+    ("speaker", pa.string()),
+    ("text", pa.string()),
+    ("start_time_ms", pa.int32()),
+    ("end_time_ms", pa.int32()),
+    ("created_at", pa.timestamp("us", tz="UTC")),
+])
+
+ANALYSIS_SCHEMA = pa.schema([
+    ("id", pa.string()),
+    ("call_id", pa.string()),
+    ("source", pa.string()),
+    ("call_started_at", pa.timestamp("us", tz="UTC")),
+    ("analysis_type", pa.string()),
+    ("model", pa.string()),
+    ("prompt_version", pa.string()),
+    ("created_at", pa.timestamp("us", tz="UTC")),
+    ("customer_satisfaction_score", pa.int8()),
+    ("questions_answered_correctly", pa.bool_()),
+    ("unanswered_questions", pa.list_(pa.string())),
+    ("resolution_status", pa.string()),
+    ("key_topics", pa.list_(pa.string())),
+    ("agent_performance_notes", pa.string()),
+    ("summary", pa.string()),
+])
+
+
+def _int(value) -> int | None:
+    if isinstance(value, bool) or not isinstance(value, int) or not -128 <= value <= 127:
+        return None
+    return value
+
+
+def _str(value) -> str | None:
+    return value if isinstance(value, str) else None
+
+
+def _strings(value) -> list[str] | None:
+    if not isinstance(value, list):
+        return None
+    return [str(v) for v in value]
+
+
+def _segment_row(seg: TranscriptSegment) -> dict:
+    return {
+        "id": str(seg.id),
+        "call_id": str(seg.call_id),
+        "speaker": seg.speaker,
+        "text": seg.text,
+        "start_time_ms": seg.start_time_ms,
+        "end_time_ms": seg.end_time_ms,
+        "created_at": as_utc(seg.created_at),
+    }
+
+
+def _analysis_row(analysis: CallAnalysis, source: str, started_at: datetime | None) -> dict:
+    payload = analysis.payload if isinstance(analysis.payload, dict) else {}
+    answered = payload.get("questions_answered_correctly")
+    return {
+        "id": str(analysis.id),
+        "call_id": str(analysis.call_id),
+        "source": source,
+        "call_started_at": as_utc(started_at),
+        "analysis_type": analysis.analysis_type,
+        "model": analysis.model,
+        "prompt_version": analysis.prompt_version,
+        "created_at": as_utc(analysis.created_at),
+        "customer_satisfaction_score": _int(payload.get("customer_satisfaction_score")),
+        "questions_answered_correctly": answered if isinstance(answered, bool) else None,
+        "unanswered_questions": _strings(payload.get("unanswered_questions")),
+        "resolution_status": _str(payload.get("resolution_status")),
+        "key_topics": _strings(payload.get("key_topics")),
+        "agent_performance_notes": _str(payload.get("agent_performance_notes")),
+        "summary": _str(payload.get("summary")),
+    }
+
+
+class _PartitionWriter:
+    """
+    Writes rows arriving in created_at order to one file per day partition.
+    Only the current day's file is open; files keep a .tmp suffix until commit().
+    """
+
+    def __init__(self, root: Path, schema: pa.Schema, run_id: str):
+        self.root = root
+        self.schema = schema
+        self.run_id = run_id
+        self.rows = 0
+        self._day: str | None = None
+        self._writer: pq.ParquetWriter | None = None
+        self._buffer: list[dict] = []
+        self._pending: list[Path] = []
+
+    def write(self, day: str, row: dict) -> None:
+        if day != self._day:
+            self._close()
+            self._day = day
+        self._buffer.append(row)
+        if len(self._buffer) >= ROW_GROUP_ROWS:
+            self._flush()
+
+    def _flush(self) -> None:
+        if not self._buffer:
+            return
+        if self._writer is None:
+            directory = self.root / f"day={self._day}"
+            directory.mkdir(parents=True, exist_ok=True)
+            path = directory / f"part-{self.run_id}.parquet.tmp"
+            self._writer = pq.ParquetWriter(path, self.schema, compression="zstd")
+            self._pending.append(path)
+        self._writer.write_table(pa.Table.from_pylist(self._buffer, schema=self.schema))
+        self.rows += len(self._buffer)
+        self._buffer = []
+
+    def _close(self) -> None:
+        self._flush()
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+
+    def commit(self, replace: bool = False) -> None:
+        """Move this run's files into place; with replace, drop all earlier files."""
+        self._close()
+        if replace:
+            for old in self.root.glob("day=*/*.parquet"):
+                old.unlink()
+        for path in self._pending:
+            os.replace(path, path.with_suffix(""))
+        self._pending = []
+
+    def abort(self) -> None:
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+        for path in self._pending:
+            path.unlink(missing_ok=True)
+        self._pending = []
+
+
+def _load_watermark(out_dir: Path) -> dict[str, tuple[datetime, UUID]]:
+    path = out_dir / WATERMARK_FILE
+    if not path.exists():
+        return {}
+    raw = json.loads(path.read_text(encoding="utf-8"))
+    return {name: (datetime.fromisoformat(ts), UUID(row_id)) for name, (ts, row_id) in raw.items()}
+
+
+def _save_watermark(out_dir: Path, marks: dict[str, tuple[datetime, UUID]]) -> None:
+    path = out_dir / WATERMARK_FILE
+    tmp = path.with_suffix(".tmp")
+    tmp.write_text(
+        json.dumps({name: [ts.isoformat(), str(row_id)] for name, (ts, row_id) in marks.items()}),
+        encoding="utf-8",
+    )
+    os.replace(tmp, path)
+
+
+def _window(model, after: tuple[datetime, UUID] | None, until: datetime):
+    """(created_at, id) > after and created_at < until, compared as stored (naive on SQLite)."""
+    clause = model.created_at < until
+    if after is not None:
+        ts, row_id = after
+        clause = and_(
+            clause,
+            or_(model.created_at > ts, and_(model.created_at == ts, model.id > row_id)),
+        )
+    return clause
+
+
+async def export_parquet(
+    out_dir: Path,
+    full: bool = False,
+    lag_seconds: float = 60.0,
+    batch_size: int = 5000,
+) -> dict[str, int]:
+    """Export segments and analyses created since the watermark; returns rows written."""
+    from app.db.session import async_session, engine
+
+    out_dir.mkdir(parents=True, exist_ok=True)
+    for stale in out_dir.glob("*/day=*/*.parquet.tmp"):
+        stale.unlink()
+    marks = {} if full else _load_watermark(out_dir)
+    until = datetime.now(timezone.utc) - timedelta(seconds=lag_seconds)
+    if engine.dialect.name == "sqlite":
+        until = until.replace(tzinfo=None)
+        marks = {name: (ts.replace(tzinfo=None), row_id) for name, (ts, row_id) in marks.items()}
+    # Unique per run: runs within the same second must not replace each other's files
+    run_id = time.strftime("%Y%m%dT%H%M%S", time.gmtime()) + f"-{uuid4().hex[:8]}"
+
+    writers = {
+        "segments": _PartitionWriter(out_dir / "segments", SEGMENT_SCHEMA, run_id),
+        "analyses": _PartitionWriter(out_dir / "analyses", ANALYSIS_SCHEMA, run_id),
+    }
+    new_marks = dict(marks)
+    try:
+        async with async_session() as db:
+            result = await db.stream(
+                select(TranscriptSegment)
+                .where(_window(TranscriptSegment, marks.get("segments"), until))
+                .order_by(TranscriptSegment.created_at, TranscriptSegment.id)
+                .execution_options(yield_per=batch_size)
+            )
+            async for seg in result.scalars():
+                row = _segment_row(seg)
+                writers["segments"].write(row["created_at"].date().isoformat(), row)
+                new_marks["segments"] = (seg.created_at, seg.id)
+
+            result = await db.stream(
+                select(CallAnalysis, Call.source, Call.started_at)
+                .join(Call, Call.id == CallAnalysis.call_id)
+                .where(_window(CallAnalysis, marks.get("analyses"), until))
+                .order_by(CallAnalysis.created_at, CallAnalysis.id)
+                .execution_options(yield_per=batch_size)
+            )
+            async for analysis, source, started_at in result:
+                row = _analysis_row(analysis, source, started_at)
+                writers["analyses"].write(row["created_at"].date().isoformat(), row)
+                new_marks["analyses"] = (analysis.created_at, analysis.id)
+        for writer in writers.values():
+            writer.commit(replace=full)
+    except BaseException:
+        for writer in writers.values():
+            writer.abort()
+        raise
+    _save_watermark(out_dir, new_marks)
+    return {name: writer.rows for name, writer in writers.items()}
+
+
+async def _run(args: argparse.Namespace) -> dict[str, int]:
+    from app.db.session import engine
+
+    try:
+        return await export_parquet(args.out_dir, full=args.full, lag_seconds=args.lag_seconds)
+    finally:
+        await engine.dispose()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Export segments and analyses to partitioned Parquet.")
+    parser.add_argument("out_dir", type=Path, help="Dataset root (holds segments/, analyses/ and the watermark)")
+    parser.add_argument("--full", action="store_true", help="Re-export everything, replacing existing files")
+    parser.add_argument("--lag-seconds", type=float, default=60.0,
+                        help="Leave rows younger than this for the next run (default 60)")
+    args = parser.parse_args()
+    counts = asyncio.run(_run(args))
+    print(f"Exported {counts['segments']} segments and {counts['analyses']} analyses to {args.out_dir}")
+
+
+if __name__ == "__main__":
+    main()
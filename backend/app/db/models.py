@@ -1,11 +1,11 @@
 """SQLAlchemy models – works with both PostgreSQL and SQLite."""
 
 import uuid
-from datetime import datetime
+from datetime import datetime, timezone
 
 from sqlalchemy import (
-    Column, String, Text, Integer, DateTime, ForeignKey, Index, JSON,
-    TypeDecorator, CHAR,
+    Column, String, Text, Integer, Date, DateTime, ForeignKey, Index, JSON,
+    TypeDecorator, CHAR, func, literal_column,
 )
 from sqlalchemy.orm import DeclarativeBase, relationship
 
@@ -40,6 +40,18 @@ class PortableUUID(TypeDecorator):
         return dialect.type_descriptor(CHAR(36))
 
 
+def as_utc(value: datetime | None) -> datetime | None:
+    """
+    As an aware UTC datetime. SQLite hands back naive datetimes, which are
+    stored as UTC; PostgreSQL timestamptz arrives in the session time zone.
+    """
+    if value is None:
+        return None
+    if value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc)
+
+
 class Call(Base):
     """Call record from any source."""
 
@@ -51,9 +63,17 @@ class Call(Base):
     started_at = Column(DateTime(timezone=True), nullable=True)
     ended_at = Column(DateTime(timezone=True), nullable=True)
     metadata_ = Column("metadata", JSON, nullable=True, default=dict)
+    # live | transcribing | analyzing | completed | failed
+    status = Column(String(20), nullable=False, default="completed", server_default="completed")
+    error = Column(Text, nullable=True)
     created_at = Column(DateTime(timezone=True), default=datetime.utcnow)
 
-    segments = relationship("TranscriptSegment", back_populates="call", cascade="all, delete-orphan")
+    segments = relationship(
+        "TranscriptSegment",
+        back_populates="call",
+        cascade="all, delete-orphan",
+        order_by="(TranscriptSegment.start_time_ms, TranscriptSegment.id)",
+    )
     analyses = relationship("CallAnalysis", back_populates="call", cascade="all, delete-orphan")
 
 
@@ -82,11 +102,65 @@ class CallAnalysis(Base):
     call_id = Column(PortableUUID(), ForeignKey("calls.id", ondelete="CASCADE"), nullable=False)
     analysis_type = Column(String(20), nullable=False)  # realtime | post_call
     payload = Column(JSON, nullable=False, default=dict)
+    model = Column(String(120), nullable=True)  # provider:model that produced it
+    prompt_version = Column(String(16), nullable=True)  # hash of prompts + generation config
     created_at = Column(DateTime(timezone=True), default=datetime.utcnow)
 
     call = relationship("Call", back_populates="analyses")
 
 
+class LLMCacheEntry(Base):
+    """Cached LLM analysis keyed on provider, model, config, prompt and transcript."""
+
+    __tablename__ = "llm_cache"
+
+    key = Column(String(64), primary_key=True)  # sha256 hex
+    provider = Column(String(20), nullable=False)
+    model = Column(String(100), nullable=False)
+    payload = Column(JSON, nullable=False)
+    created_at = Column(DateTime(timezone=True), default=datetime.utcnow)
+    expires_at = Column(DateTime(timezone=True), nullable=False)
+
+
+class AnalyticsRollup(Base):
+    """Daily post-call metrics per dimension, maintained as analyses are written."""
+
+    __tablename__ = "analytics_rollups"
+
+    day = Column(Date, primary_key=True)
+    dimension = Column(String(20), primary_key=True)  # all | topic | resolution_status
+    value = Column(String(100), primary_key=True)  # "" for all
+    call_count = Column(Integer, nullable=False, default=0)
+    score_sum = Column(Integer, nullable=False, default=0)
+    score_count = Column(Integer, nullable=False, default=0)
+    answered_count = Column(Integer, nullable=False, default=0)
+    answered_known = Column(Integer, nullable=False, default=0)
+    resolved_count = Column(Integer, nullable=False, default=0)
+    partial_count = Column(Integer, nullable=False, default=0)
+    unresolved_count = Column(Integer, nullable=False, default=0)
+
+
+def call_sha256(dialect_name: str):
+    """
+    metadata.sha256 as text, spelled exactly like the idx_calls_sha256
+    expression (literal path, no bound parameter) so lookups can use it.
+    """
+    if dialect_name == "postgresql":
+        return Call.metadata_.op("->>", return_type=Text)(literal_column("'sha256'"))
+    return func.json_extract(Call.metadata_, literal_column("'$.sha256'"), type_=Text)
+
+
 Index("idx_calls_source", Call.source)
 Index("idx_calls_started", Call.started_at)
+Index("idx_calls_status", Call.status)
 Index("idx_analyses_call", CallAnalysis.call_id)
+Index("idx_analyses_call_version", CallAnalysis.call_id, CallAnalysis.prompt_version, CallAnalysis.model)
+Index("idx_segments_call_start", TranscriptSegment.call_id, TranscriptSegment.start_time_ms, TranscriptSegment.id)
+# Keyset pagination over (started_at, id) / (created_at, id)
+Index("idx_calls_started_id", Call.started_at, Call.id)
+Index("idx_analyses_created_id", CallAnalysis.created_at, CallAnalysis.id)
+Index("idx_llm_cache_expires", LLMCacheEntry.expires_at)
+Index("idx_rollups_dimension_day", AnalyticsRollup.dimension, AnalyticsRollup.day)
+# Batch ingest looks uploads up by content hash
+Index("idx_calls_sha256", call_sha256("postgresql")).ddl_if(dialect="postgresql")
+Index("idx_calls_sha256", call_sha256("sqlite")).ddl_if(dialect="sqlite")
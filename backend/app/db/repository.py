@@ -1,12 +1,21 @@
 """Database repository - CRUD operations."""
 
+import time
+import uuid
+from typing import AsyncIterator, Iterable
 from uuid import UUID
-from datetime import datetime
-from sqlalchemy import select, func
+from datetime import date, datetime, timedelta
+from sqlalchemy import and_, insert, or_, select, func, update
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 
-from app.db.models import Call, TranscriptSegment, CallAnalysis
+from app.config import settings
+from app.db.cache import mark_call_changed
+from app.db.models import Call, TranscriptSegment, CallAnalysis, call_sha256
+from app.db.rollups import apply_post_call_analysis
+
+# (filters) -> (expires_at monotonic, count); keeps list totals off the hot path
+_count_cache: dict[tuple, tuple[float, int]] = {}
 
 
 async def create_call(
@@ -16,6 +25,7 @@ async def create_call(
     started_at: datetime | None = None,
     ended_at: datetime | None = None,
     metadata_: dict | None = None,
+    status: str = "completed",
 ) -> Call:
     """Create a new call record."""
     call = Call(
@@ -24,20 +34,294 @@ async def create_call(
         started_at=started_at,
         ended_at=ended_at,
         metadata_=metadata_ or {},
+        status=status,
     )
     db.add(call)
     await db.flush()
     return call
 
 
-async def get_call(db: AsyncSession, call_id: UUID) -> Call | None:
-    """Get a call by ID with segments and analyses."""
+async def update_call(db: AsyncSession, call_id: UUID, **values) -> None:
+    """Update columns of a call."""
+    await db.execute(update(Call).where(Call.id == call_id).values(**values))
+    mark_call_changed(db, call_id)
+
+
+async def get_call(db: AsyncSession, call_id: UUID, with_segments: bool = True) -> Call | None:
+    """Get a call by ID with analyses and (optionally) segments."""
+    options = [selectinload(Call.analyses)]
+    if with_segments:
+        options.append(selectinload(Call.segments))
+    result = await db.execute(select(Call).where(Call.id == call_id).options(*options))
+    return result.scalar_one_or_none()
+
+
+async def get_call_version(db: AsyncSession, call_id: UUID) -> list | None:
+    """
+    Everything call detail responses depend on, without loading segments:
+    the call's columns plus count and latest created_at of its segments and
+    analyses. None if the call does not exist.
+    """
+    segments = select(TranscriptSegment).where(TranscriptSegment.call_id == call_id).subquery()
+    analyses = select(CallAnalysis).where(CallAnalysis.call_id == call_id).subquery()
+    row = (
+        await db.execute(
+            select(
+                Call.__table__,
+                select(func.count()).select_from(segments).scalar_subquery(),
+                select(func.max(segments.c.created_at)).scalar_subquery(),
+                select(func.count()).select_from(analyses).scalar_subquery(),
+                select(func.max(analyses.c.created_at)).scalar_subquery(),
+            ).where(Call.id == call_id)
+        )
+    ).first()
+    return list(row) if row is not None else None
+
+
+async def call_exists(db: AsyncSession, call_id: UUID) -> bool:
+    """Check whether a call exists without loading it."""
+    result = await db.execute(select(Call.id).where(Call.id == call_id))
+    return result.first() is not None
+
+
+async def get_call_created_at(db: AsyncSession, call_id: UUID) -> datetime | None:
+    """created_at of a call, or None if it does not exist."""
+    return await db.scalar(select(Call.created_at).where(Call.id == call_id))
+
+
+async def get_call_metadata(db: AsyncSession, call_id: UUID) -> dict:
+    """metadata of a call ({} if it has none or does not exist)."""
+    return await db.scalar(select(Call.metadata_).where(Call.id == call_id)) or {}
+
+
+async def _count(db: AsyncSession, count_query, cache_key: tuple) -> int:
+    """Run a count query, reusing a recent result for the same filters."""
+    ttl = settings.count_cache_ttl_seconds
+    now = time.monotonic()
+    if ttl > 0:
+        hit = _count_cache.get(cache_key)
+        if hit is not None and hit[0] > now:
+            return hit[1]
+    total = (await db.execute(count_query)).scalar() or 0
+    if ttl > 0:
+        if len(_count_cache) >= 1024:
+            _count_cache.clear()
+        _count_cache[cache_key] = (now + ttl, total)
+    return total
+
+
+async def get_transcript_segments(db: AsyncSession, call_id: UUID) -> list[TranscriptSegment]:
+    """Get a call's transcript segments in time order."""
     result = await db.execute(
-        select(Call)
-        .where(Call.id == call_id)
-        .options(selectinload(Call.segments), selectinload(Call.analyses))
+        select(TranscriptSegment)
+        .where(TranscriptSegment.call_id == call_id)
+        .order_by(TranscriptSegment.start_time_ms.nullsfirst(), TranscriptSegment.id)
     )
-    return result.scalar_one_or_none()
+    return list(result.scalars().all())
+
+
+async def list_segments_window(
+    db: AsyncSession,
+    call_id: UUID,
+    from_ms: int | None = None,
+    to_ms: int | None = None,
+    limit: int = 200,
+    after: tuple[int | None, UUID] | None = None,
+) -> list[TranscriptSegment]:
+    """
+    Segments of a call overlapping [from_ms, to_ms], in time order.
+    Pass `after` = (start_time_ms, id) of the last row seen for keyset paging.
+    """
+    start = TranscriptSegment.start_time_ms
+    query = select(TranscriptSegment).where(TranscriptSegment.call_id == call_id)
+    # Untimed segments cannot fall inside a window, so a range excludes them
+    if from_ms is not None:
+        query = query.where(func.coalesce(TranscriptSegment.end_time_ms, start) >= from_ms)
+    if to_ms is not None:
+        query = query.where(start <= to_ms)
+    if after is not None:
+        after_start, after_id = after
+        if after_start is None:
+            query = query.where(
+                or_(and_(start.is_(None), TranscriptSegment.id > after_id), start.is_not(None))
+            )
+        else:
+            query = query.where(
+                or_(start > after_start, and_(start == after_start, TranscriptSegment.id > after_id))
+            )
+    query = query.order_by(start.nullsfirst(), TranscriptSegment.id).limit(limit)
+    result = await db.execute(query)
+    return list(result.scalars().all())
+
+
+async def iter_call_batches(
+    db: AsyncSession,
+    source: str | None = None,
+    created_from: datetime | None = None,
+    created_to: datetime | None = None,
+    after: tuple[datetime, UUID] | None = None,
+    batch_size: int = 500,
+) -> AsyncIterator[list[tuple[Call, list[TranscriptSegment], list[CallAnalysis]]]]:
+    """
+    Stream calls in (created_at, id) order over a server-side cursor, with
+    their segments and analyses, `batch_size` calls at a time. Pass `after` =
+    (created_at, id) of the last call received to resume. Each batch
+    costs two extra IN queries, and the session's identity map only holds
+    weak references, so memory stays flat however many calls match.
+    """
+    query = select(Call)
+    if source:
+        query = query.where(Call.source == source)
+    if created_from is not None:
+        query = query.where(Call.created_at >= created_from)
+    if created_to is not None:
+        query = query.where(Call.created_at < created_to)
+    if after is not None:
+        after_created, after_id = after
+        query = query.where(
+            or_(
+                Call.created_at > after_created,
+                and_(Call.created_at == after_created, Call.id > after_id),
+            )
+        )
+    query = query.order_by(Call.created_at, Call.id)
+    result = await db.stream(query.execution_options(yield_per=batch_size))
+    async for partition in result.scalars().partitions():
+        ids = [c.id for c in partition]
+        segments: dict[UUID, list[TranscriptSegment]] = {i: [] for i in ids}
+        analyses: dict[UUID, list[CallAnalysis]] = {i: [] for i in ids}
+        rows = await db.execute(
+            select(TranscriptSegment)
+            .where(TranscriptSegment.call_id.in_(ids))
+            .order_by(
+                TranscriptSegment.call_id,
+                TranscriptSegment.start_time_ms.nullsfirst(),
+                TranscriptSegment.id,
+            )
+        )
+        for seg in rows.scalars():
+            segments[seg.call_id].append(seg)
+        rows = await db.execute(
+            select(CallAnalysis)
+            .where(CallAnalysis.call_id.in_(ids))
+            .order_by(CallAnalysis.call_id, CallAnalysis.created_at)
+        )
+        for analysis in rows.scalars():
+            analyses[analysis.call_id].append(analysis)
+        yield [(c, segments[c.id], analyses[c.id]) for c in partition]
+
+
+def _reanalysis_filter(
+    model: str,
+    prompt_version: str,
+    source: str | None,
+    date_from: date | None,
+    date_to: date | None,
+    missing_only: bool,
+) -> list:
+    post_call = and_(CallAnalysis.call_id == Call.id, CallAnalysis.analysis_type == "post_call")
+    clauses = [
+        # Calls still being ingested get their analysis from the ingest path
+        Call.status.not_in(("live", "transcribing", "analyzing")),
+        select(TranscriptSegment.id).where(TranscriptSegment.call_id == Call.id).exists(),
+    ]
+    if missing_only:
+        clauses.append(~select(CallAnalysis.id).where(post_call).exists())
+    else:
+        clauses.append(
+            ~select(CallAnalysis.id)
+            .where(
+                post_call,
+                CallAnalysis.model == model,
+                CallAnalysis.prompt_version == prompt_version,
+            )
+            .exists()
+        )
+    if source:
+        clauses.append(Call.source == source)
+    day = func.coalesce(Call.started_at, Call.created_at)
+    if date_from is not None:
+        clauses.append(day >= datetime.combine(date_from, datetime.min.time()))
+    if date_to is not None:
+        clauses.append(day < datetime.combine(date_to + timedelta(days=1), datetime.min.time()))
+    return clauses
+
+
+async def count_calls_for_reanalysis(
+    db: AsyncSession,
+    model: str,
+    prompt_version: str,
+    source: str | None = None,
+    date_from: date | None = None,
+    date_to: date | None = None,
+    missing_only: bool = False,
+) -> int:
+    """Number of calls list_calls_for_reanalysis would still return."""
+    clauses = _reanalysis_filter(model, prompt_version, source, date_from, date_to, missing_only)
+    return await db.scalar(select(func.count()).select_from(Call).where(*clauses))
+
+
+async def list_calls_for_reanalysis(
+    db: AsyncSession,
+    model: str,
+    prompt_version: str,
+    source: str | None = None,
+    date_from: date | None = None,
+    date_to: date | None = None,
+    missing_only: bool = False,
+    after: tuple[datetime, UUID] | None = None,
+    limit: int = 200,
+) -> list[tuple[UUID, datetime]]:
+    """
+    (id, created_at) of calls with transcripts whose post_call analysis is
+    missing (missing_only) or was not produced by this model and prompt
+    version, oldest first. Dates filter on started_at, else created_at.
+    Calls drop out as they are re-analyzed, which makes runs resumable;
+    `after` = (created_at, id) of the last call seen pages within a run.
+    """
+    clauses = _reanalysis_filter(model, prompt_version, source, date_from, date_to, missing_only)
+    if after is not None:
+        after_created, after_id = after
+        clauses.append(
+            or_(
+                Call.created_at > after_created,
+                and_(Call.created_at == after_created, Call.id > after_id),
+            )
+        )
+    result = await db.execute(
+        select(Call.id, Call.created_at)
+        .where(*clauses)
+        .order_by(Call.created_at, Call.id)
+        .limit(limit)
+    )
+    return [(row.id, row.created_at) for row in result]
+
+
+async def get_upload_hashes(
+    db: AsyncSession, hashes: Iterable[str]
+) -> dict[str, tuple[UUID, str, bool, bool]]:
+    """
+    Map each given sha256 that is already ingested -> (call_id, status, has
+    segments, has post_call analysis). When several calls share a hash the
+    most complete one wins. Uses idx_calls_sha256.
+    """
+    hashes = list(hashes)
+    if not hashes:
+        return {}
+    sha256 = call_sha256((await db.connection()).dialect.name)
+    has_segments = select(TranscriptSegment.id).where(TranscriptSegment.call_id == Call.id).exists()
+    has_analysis = (
+        select(CallAnalysis.id)
+        .where(CallAnalysis.call_id == Call.id, CallAnalysis.analysis_type == "post_call")
+        .exists()
+    )
+    result = await db.execute(
+        select(sha256, Call.id, Call.status, has_segments, has_analysis).where(
+            sha256.in_(hashes), Call.source == "upload"
+        )
+    )
+    rows = sorted(result.all(), key=lambda row: (row[4], row[3]))
+    return {sha: (call_id, status, segmented, analyzed) for sha, call_id, status, segmented, analyzed in rows}
 
 
 async def list_calls(
@@ -45,41 +329,94 @@ async def list_calls(
     source: str | None = None,
     limit: int = 50,
     offset: int = 0,
-) -> tuple[list[Call], int]:
-    """List calls with optional filter and pagination."""
+    after: tuple[datetime | None, UUID] | None = None,
+    with_total: bool = True,
+    status: str | None = None,
+) -> tuple[list[Call], int | None]:
+    """
+    List calls newest first with optional filters.
+    Pass `after` = (started_at, id) of the last row seen for keyset paging;
+    `offset` is only applied without it. Total is None unless with_total.
+    """
     query = select(Call)
     count_query = select(func.count()).select_from(Call)
 
     if source:
         query = query.where(Call.source == source)
         count_query = count_query.where(Call.source == source)
+    if status:
+        query = query.where(Call.status == status)
+        count_query = count_query.where(Call.status == status)
 
-    total = (await db.execute(count_query)).scalar() or 0
-    query = query.order_by(Call.started_at.desc().nullslast()).limit(limit).offset(offset)
+    if after is not None:
+        started_at, call_id = after
+        if started_at is None:
+            query = query.where(Call.started_at.is_(None), Call.id < call_id)
+        else:
+            query = query.where(
+                or_(
+                    Call.started_at < started_at,
+                    and_(Call.started_at == started_at, Call.id < call_id),
+                    Call.started_at.is_(None),
+                )
+            )
+    elif offset:
+        query = query.offset(offset)
+
+    total = await _count(db, count_query, ("calls", source, status)) if with_total else None
+    query = query.order_by(Call.started_at.desc().nullslast(), Call.id.desc()).limit(limit)
     result = await db.execute(query)
     calls = list(result.scalars().all())
     return calls, total
 
 
+# Batches at least this large go through COPY on PostgreSQL
+COPY_THRESHOLD = 500
+
+_SEGMENT_COLUMNS = ("id", "call_id", "speaker", "text", "start_time_ms", "end_time_ms", "created_at")
+
+
 async def add_transcript_segments(
     db: AsyncSession,
     call_id: UUID,
     segments: list[dict],
-) -> list[TranscriptSegment]:
-    """Add transcript segments to a call."""
-    created = []
-    for seg in segments:
-        segment = TranscriptSegment(
-            call_id=call_id,
-            speaker=seg.get("speaker", "unknown"),
-            text=seg.get("text", ""),
-            start_time_ms=seg.get("start_time_ms"),
-            end_time_ms=seg.get("end_time_ms"),
+) -> list[UUID]:
+    """
+    Bulk-insert transcript segments for a call and return their ids.
+    Uses a Core executemany INSERT (COPY on PostgreSQL for large batches)
+    instead of materializing ORM objects.
+    """
+    if not segments:
+        return []
+    now = datetime.utcnow()
+    rows = [
+        {
+            "id": uuid.uuid4(),
+            "call_id": call_id,
+            "speaker": seg.get("speaker", "unknown"),
+            "text": seg.get("text", ""),
+            "start_time_ms": seg.get("start_time_ms"),
+            "end_time_ms": seg.get("end_time_ms"),
+            "created_at": now,
+        }
+        for seg in segments
+    ]
+    await db.flush()  # parent call row must exist before the segments
+    conn = await db.connection()
+    if conn.dialect.name == "postgresql" and len(rows) >= COPY_THRESHOLD:
+        # The asyncpg adapter only issues BEGIN before its own statements; a
+        # COPY sent first would autocommit outside the unit's transaction
+        await conn.exec_driver_sql("SELECT 1")
+        raw = await conn.get_raw_connection()
+        await raw.driver_connection.copy_records_to_table(
+            TranscriptSegment.__tablename__,
+            records=[tuple(r[c] for c in _SEGMENT_COLUMNS) for r in rows],
+            columns=list(_SEGMENT_COLUMNS),
         )
-        db.add(segment)
-        created.append(segment)
-    await db.flush()
-    return created
+    else:
+        await conn.execute(insert(TranscriptSegment.__table__), rows)
+    mark_call_changed(db, call_id)
+    return [r["id"] for r in rows]
 
 
 async def create_analysis(
@@ -87,15 +424,36 @@ async def create_analysis(
     call_id: UUID,
     analysis_type: str,
     payload: dict,
+    model: str | None = None,
+    prompt_version: str | None = None,
 ) -> CallAnalysis:
-    """Create a call analysis record."""
+    """Create a call analysis record (post_call analyses also update rollups)."""
+    previous = None
+    if analysis_type == "post_call":
+        # Lock the call row (PostgreSQL; SQLite has a single writer) so a
+        # concurrent post_call write for the same call waits and then sees
+        # this one as its previous payload instead of both adding to rollups
+        await db.execute(select(Call.id).where(Call.id == call_id).with_for_update())
+        previous = (
+            await db.execute(
+                select(CallAnalysis.payload)
+                .where(CallAnalysis.call_id == call_id, CallAnalysis.analysis_type == "post_call")
+                .order_by(CallAnalysis.created_at.desc(), CallAnalysis.id.desc())
+                .limit(1)
+            )
+        ).scalar_one_or_none()
     analysis = CallAnalysis(
         call_id=call_id,
         analysis_type=analysis_type,
         payload=payload,
+        model=model,
+        prompt_version=prompt_version,
     )
     db.add(analysis)
     await db.flush()
+    mark_call_changed(db, call_id)
+    if analysis_type == "post_call":
+        await apply_post_call_analysis(db, call_id, payload, previous)
     return analysis
 
 
@@ -105,8 +463,13 @@ async def list_analyses(
     analysis_type: str | None = None,
     limit: int = 50,
     offset: int = 0,
-) -> tuple[list[CallAnalysis], int]:
-    """List analyses with optional filters."""
+    after: tuple[datetime | None, UUID] | None = None,
+    with_total: bool = True,
+) -> tuple[list[CallAnalysis], int | None]:
+    """
+    List analyses newest first with optional filters.
+    Pass `after` = (created_at, id) of the last row seen for keyset paging.
+    """
     query = select(CallAnalysis)
     count_query = select(func.count()).select_from(CallAnalysis)
 
@@ -117,8 +480,23 @@ async def list_analyses(
         query = query.where(CallAnalysis.analysis_type == analysis_type)
         count_query = count_query.where(CallAnalysis.analysis_type == analysis_type)
 
-    total = (await db.execute(count_query)).scalar() or 0
-    query = query.order_by(CallAnalysis.created_at.desc()).limit(limit).offset(offset)
+    if after is not None:
+        created_at, analysis_id = after
+        query = query.where(
+            or_(
+                CallAnalysis.created_at < created_at,
+                and_(CallAnalysis.created_at == created_at, CallAnalysis.id < analysis_id),
+            )
+        )
+    elif offset:
+        query = query.offset(offset)
+
+    total = (
+        await _count(db, count_query, ("analyses", call_id, analysis_type))
+        if with_total
+        else None
+    )
+    query = query.order_by(CallAnalysis.created_at.desc(), CallAnalysis.id.desc()).limit(limit)
     result = await db.execute(query)
     analyses = list(result.scalars().all())
     return analyses, total
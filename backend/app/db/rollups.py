@@ -0,0 +1,177 @@
+"""Analytics rollups - daily post-call metrics maintained incrementally.
+
+Every post_call analysis adds its metrics to one row per (day, dimension,
+value): dimension "all", one "topic" row per key topic and one
+"resolution_status" row. A newer post_call analysis for the same call first
+subtracts the previous one, so rollups always reflect the latest analysis.
+Writers of post_call analyses for the same call are serialized on the call
+row (see repository.create_analysis), so the previous payload is never read
+twice.
+The day is the call's started_at (or created_at) date in UTC.
+
+Rebuild from scratch (e.g. after enabling on an existing database):
+    python -m app.db.rollups rebuild
+"""
+
+import asyncio
+import sys
+from datetime import date
+
+from sqlalchemy import delete, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.models import AnalyticsRollup, Call, CallAnalysis, as_utc
+
+METRICS = (
+    "call_count",
+    "score_sum",
+    "score_count",
+    "answered_count",
+    "answered_known",
+    "resolved_count",
+    "partial_count",
+    "unresolved_count",
+)
+
+GROUP_BY_DIMENSIONS = {"day": "all", "topic": "topic", "resolution_status": "resolution_status"}
+
+
+def _metrics(payload: dict, sign: int) -> dict:
+    score = payload.get("customer_satisfaction_score")
+    answered = payload.get("questions_answered_correctly")
+    status = payload.get("resolution_status")
+    has_score = isinstance(score, int) and not isinstance(score, bool)
+    return {
+        "call_count": sign,
+        "score_sum": sign * score if has_score else 0,
+        "score_count": sign if has_score else 0,
+        "answered_count": sign if answered is True else 0,
+        "answered_known": sign if isinstance(answered, bool) else 0,
+        "resolved_count": sign if status == "resolved" else 0,
+        "partial_count": sign if status == "partial" else 0,
+        "unresolved_count": sign if status == "unresolved" else 0,
+    }
+
+
+def _rows(day: date, payload: dict, sign: int) -> list[dict]:
+    metrics = _metrics(payload, sign)
+    topics = {
+        str(t).strip().lower()[:100]
+        for t in payload.get("key_topics") or []
+        if str(t).strip()
+    }
+    keys = [("all", "")]
+    keys += [("topic", t) for t in sorted(topics)]
+    keys.append(("resolution_status", str(payload.get("resolution_status") or "unknown")[:100]))
+    return [{"day": day, "dimension": d, "value": v, **metrics} for d, v in keys]
+
+
+def _upsert(dialect_name: str, rows: list[dict]):
+    if dialect_name == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    else:
+        from sqlalchemy.dialects.sqlite import insert
+    table = AnalyticsRollup.__table__
+    stmt = insert(table).values(rows)
+    return stmt.on_conflict_do_update(
+        index_elements=[table.c.day, table.c.dimension, table.c.value],
+        set_={m: table.c[m] + stmt.excluded[m] for m in METRICS},
+    )
+
+
+async def _call_day(db: AsyncSession, call_id) -> date:
+    started_at, created_at = (
+        await db.execute(select(Call.started_at, Call.created_at).where(Call.id == call_id))
+    ).one()
+    # The UTC date, whatever time zone the driver returns timestamps in
+    return as_utc(started_at or created_at).date()
+
+
+async def apply_post_call_analysis(
+    db: AsyncSession,
+    call_id,
+    payload: dict,
+    previous_payload: dict | None = None,
+) -> None:
+    """Add a post_call payload to the rollups, replacing previous_payload if given."""
+    day = await _call_day(db, call_id)
+    rows = _rows(day, payload, 1)
+    if previous_payload is not None:
+        rows = _rows(day, previous_payload, -1) + rows
+    # Collapse duplicate keys so one statement never touches a row twice
+    merged: dict[tuple, dict] = {}
+    for row in rows:
+        key = (row["day"], row["dimension"], row["value"])
+        if key in merged:
+            for m in METRICS:
+                merged[key][m] += row[m]
+        else:
+            merged[key] = dict(row)
+    conn = await db.connection()
+    await conn.execute(_upsert(conn.dialect.name, list(merged.values())))
+
+
+async def query_summary(
+    db: AsyncSession,
+    group_by: str,
+    date_from: date | None = None,
+    date_to: date | None = None,
+) -> list[dict]:
+    """Aggregate rollup rows by day, topic or resolution status."""
+    key = AnalyticsRollup.day if group_by == "day" else AnalyticsRollup.value
+    query = select(key.label("key"), *(func.sum(getattr(AnalyticsRollup, m)).label(m) for m in METRICS)).where(
+        AnalyticsRollup.dimension == GROUP_BY_DIMENSIONS[group_by]
+    )
+    if date_from:
+        query = query.where(AnalyticsRollup.day >= date_from)
+    if date_to:
+        query = query.where(AnalyticsRollup.day <= date_to)
+    query = query.group_by(key).having(func.sum(AnalyticsRollup.call_count) > 0)
+    if group_by == "day":
+        query = query.order_by(key)
+    else:
+        query = query.order_by(func.sum(AnalyticsRollup.call_count).desc(), key)
+    result = await db.execute(query)
+    return [dict(r._mapping) for r in result.all()]
+
+
+async def rebuild_rollups(db: AsyncSession) -> int:
+    """Recompute all rollups from the latest post_call analysis of each call."""
+    await db.execute(delete(AnalyticsRollup))
+    # One row per call even when two analyses share a created_at
+    ranked = (
+        select(
+            CallAnalysis.call_id,
+            CallAnalysis.payload,
+            func.row_number()
+            .over(
+                partition_by=CallAnalysis.call_id,
+                order_by=(CallAnalysis.created_at.desc(), CallAnalysis.id.desc()),
+            )
+            .label("rank"),
+        )
+        .where(CallAnalysis.analysis_type == "post_call")
+        .subquery()
+    )
+    result = await db.stream(select(ranked.c.call_id, ranked.c.payload).where(ranked.c.rank == 1))
+    count = 0
+    async for call_id, payload in result:
+        await apply_post_call_analysis(db, call_id, payload)
+        count += 1
+    return count
+
+
+async def _rebuild() -> None:
+    from app.db.session import async_session, engine
+
+    async with async_session() as db:
+        count = await rebuild_rollups(db)
+        await db.commit()
+    await engine.dispose()
+    print(f"Rebuilt rollups from {count} analyses")
+
+
+if __name__ == "__main__":
+    if sys.argv[1:] != ["rebuild"]:
+        sys.exit("usage: python -m app.db.rollups rebuild")
+    asyncio.run(_rebuild())
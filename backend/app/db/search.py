@@ -0,0 +1,178 @@
+"""Full-text search over transcript segments.
+
+SQLite: an external-content FTS5 table kept in sync by triggers. It is keyed
+on transcript_segments.search_rowid, a stable integer assigned on insert -
+the implicit rowid of a table with a CHAR(36) primary key may be renumbered
+by VACUUM.
+PostgreSQL: a generated tsvector column with a GIN index.
+Both are created by migrations 005 and 009 (or init_db in development).
+
+Snippets are HTML-escaped; only the <mark> highlight tags are markup.
+"""
+
+import html
+import re
+from uuid import UUID
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncSession
+
+SQLITE_DDL = [
+    "CREATE UNIQUE INDEX IF NOT EXISTS idx_segments_search_rowid ON transcript_segments (search_rowid)",
+    """CREATE VIRTUAL TABLE IF NOT EXISTS transcript_segments_fts USING fts5(
+        text, content='transcript_segments', content_rowid='search_rowid',
+        tokenize='porter unicode61'
+    )""",
+    """CREATE TRIGGER IF NOT EXISTS transcript_segments_fts_ai AFTER INSERT ON transcript_segments BEGIN
+        UPDATE transcript_segments
+        SET search_rowid = (SELECT coalesce(max(search_rowid), 0) + 1 FROM transcript_segments)
+        WHERE rowid = new.rowid AND new.search_rowid IS NULL;
+        INSERT INTO transcript_segments_fts(rowid, text)
+        VALUES ((SELECT search_rowid FROM transcript_segments WHERE rowid = new.rowid), new.text);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS transcript_segments_fts_ad AFTER DELETE ON transcript_segments BEGIN
+        INSERT INTO transcript_segments_fts(transcript_segments_fts, rowid, text)
+        VALUES ('delete', old.search_rowid, old.text);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS transcript_segments_fts_au AFTER UPDATE OF text ON transcript_segments BEGIN
+        INSERT INTO transcript_segments_fts(transcript_segments_fts, rowid, text)
+        VALUES ('delete', old.search_rowid, old.text);
+        INSERT INTO transcript_segments_fts(rowid, text) VALUES (new.search_rowid, new.text);
+    END""",
+]
+
+# Index created before search_rowid existed (keyed on the implicit rowid)
+_SQLITE_DROP_ROWID_INDEX = [
+    "DROP TRIGGER IF EXISTS transcript_segments_fts_au",
+    "DROP TRIGGER IF EXISTS transcript_segments_fts_ad",
+    "DROP TRIGGER IF EXISTS transcript_segments_fts_ai",
+    "DROP TABLE IF EXISTS transcript_segments_fts",
+]
+
+POSTGRES_DDL = [
+    """ALTER TABLE transcript_segments ADD COLUMN IF NOT EXISTS text_tsv tsvector
+        GENERATED ALWAYS AS (to_tsvector('english', coalesce(text, ''))) STORED""",
+    "CREATE INDEX IF NOT EXISTS idx_segments_text_tsv ON transcript_segments USING gin (text_tsv)",
+]
+
+# Even a no-op ALTER TABLE takes an ACCESS EXCLUSIVE lock, so look first
+_POSTGRES_INDEX_EXISTS = text(
+    """
+    SELECT
+        EXISTS (SELECT 1 FROM information_schema.columns
+                WHERE table_schema = current_schema()
+                  AND table_name = 'transcript_segments' AND column_name = 'text_tsv'),
+        EXISTS (SELECT 1 FROM pg_indexes
+                WHERE schemaname = current_schema() AND indexname = 'idx_segments_text_tsv')
+    """
+)
+
+# Highlight sentinels (private-use characters), swapped for <mark> after escaping
+_START, _STOP = "\ue000", "\ue001"
+
+_SQLITE_SEARCH = text(
+    """
+    SELECT s.id, s.call_id, s.speaker, s.start_time_ms, s.end_time_ms,
+           snippet(transcript_segments_fts, 0, :start_sel, :stop_sel, '…', 16) AS snippet,
+           -bm25(transcript_segments_fts) AS rank
+    FROM transcript_segments_fts
+    JOIN transcript_segments s ON s.search_rowid = transcript_segments_fts.rowid
+    WHERE transcript_segments_fts MATCH :query
+      AND (:call_id IS NULL OR s.call_id = :call_id)
+    ORDER BY bm25(transcript_segments_fts)
+    LIMIT :limit OFFSET :offset
+    """
+)
+
+# Headlines are computed only for the page of hits, not for every match
+_POSTGRES_SEARCH = text(
+    """
+    WITH q AS (SELECT websearch_to_tsquery('english', :query) AS query),
+    hits AS (
+        SELECT s.id, s.call_id, s.speaker, s.start_time_ms, s.end_time_ms, s.text,
+               ts_rank(s.text_tsv, q.query) AS rank
+        FROM transcript_segments s, q
+        WHERE s.text_tsv @@ q.query
+          AND (CAST(:call_id AS uuid) IS NULL OR s.call_id = CAST(:call_id AS uuid))
+        ORDER BY rank DESC, s.id
+        LIMIT :limit OFFSET :offset
+    )
+    SELECT hits.id, hits.call_id, hits.speaker, hits.start_time_ms, hits.end_time_ms,
+           ts_headline('english', hits.text, q.query,
+                       :headline_options) AS snippet,
+           hits.rank
+    FROM hits, q
+    ORDER BY hits.rank DESC, hits.id
+    """
+)
+
+
+async def ensure_search_index(conn: AsyncConnection) -> None:
+    """Create the full-text index if missing (development path; production uses migrations)."""
+    if conn.dialect.name == "postgresql":
+        column, index = (await conn.execute(_POSTGRES_INDEX_EXISTS)).one()
+        for ddl, present in zip(POSTGRES_DDL, (column, index)):
+            if not present:
+                await conn.execute(text(ddl))
+        return
+    columns = (await conn.execute(text("PRAGMA table_info(transcript_segments)"))).all()
+    if not any(column[1] == "search_rowid" for column in columns):
+        for ddl in _SQLITE_DROP_ROWID_INDEX:
+            await conn.execute(text(ddl))
+        await conn.execute(text("ALTER TABLE transcript_segments ADD COLUMN search_rowid INTEGER"))
+        await conn.execute(text("UPDATE transcript_segments SET search_rowid = rowid"))
+    exists = (
+        await conn.execute(
+            text("SELECT 1 FROM sqlite_master WHERE name = 'transcript_segments_fts'")
+        )
+    ).first()
+    for ddl in SQLITE_DDL:
+        await conn.execute(text(ddl))
+    if not exists:
+        await conn.execute(
+            text("INSERT INTO transcript_segments_fts(transcript_segments_fts) VALUES ('rebuild')")
+        )
+
+
+def _fts5_query(query: str) -> str:
+    """Turn free text into a safe FTS5 query: every term quoted, AND-ed; `term*` = prefix."""
+    terms = []
+    for raw in query.split():
+        prefix = raw.endswith("*")
+        word = re.sub(r'["*]', "", raw)
+        if word:
+            terms.append(f'"{word}"' + ("*" if prefix else ""))
+    return " ".join(terms)
+
+
+async def search_segments(
+    db: AsyncSession,
+    query: str,
+    call_id: UUID | None = None,
+    limit: int = 20,
+    offset: int = 0,
+) -> list[dict]:
+    """Ranked transcript segment matches with highlighted, HTML-escaped snippets."""
+    conn = await db.connection()
+    if conn.dialect.name == "postgresql":
+        stmt, params = _POSTGRES_SEARCH, {
+            "query": query,
+            "headline_options": f'StartSel="{_START}", StopSel="{_STOP}", MaxWords=35, MinWords=15',
+        }
+    else:
+        fts_query = _fts5_query(query)
+        if not fts_query:
+            return []
+        stmt, params = _SQLITE_SEARCH, {"query": fts_query, "start_sel": _START, "stop_sel": _STOP}
+    params["call_id"] = str(call_id) if call_id else None
+    result = await conn.execute(stmt, {**params, "limit": limit, "offset": offset})
+    hits = [dict(r._mapping) for r in result.all()]
+    for hit in hits:
+        hit["snippet"] = _highlight(hit["snippet"])
+    return hits
+
+
+def _highlight(snippet: str | None) -> str:
+    """Escape segment text and turn the highlight sentinels into <mark> tags."""
+    escaped = html.escape(snippet or "", quote=False)
+    return escaped.replace(_START, "<mark>").replace(_STOP, "</mark>")
@@ -1,10 +1,19 @@
 """Database session and connection – supports PostgreSQL (Supabase) and SQLite."""
 
-from sqlalchemy import event
+import asyncio
+import logging
+from typing import Awaitable, Callable, TypeVar
+
+from sqlalchemy import event, inspect
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, async_sessionmaker
 
 from app.config import settings
 from app.db.models import Base
+from app.db.search import ensure_search_index
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
 
 _is_sqlite = settings.database_url.startswith("sqlite")
 
@@ -13,8 +22,17 @@ _engine_kwargs: dict = {"echo": settings.debug}
 if _is_sqlite:
     # SQLite needs check_same_thread=False for async usage
     _engine_kwargs["connect_args"] = {"check_same_thread": False}
+    _pool_kwargs: dict = {}
+else:
+    _pool_kwargs = {
+        "pool_size": settings.db_pool_size,
+        "max_overflow": settings.db_max_overflow,
+        "pool_timeout": settings.db_pool_timeout_seconds,
+        "pool_recycle": settings.db_pool_recycle_seconds,
+        "pool_pre_ping": settings.db_pool_pre_ping,
+    }
 
-engine = create_async_engine(settings.database_url, **_engine_kwargs)
+engine = create_async_engine(settings.database_url, **_engine_kwargs, **_pool_kwargs)
 
 async_session = async_sessionmaker(
     engine,
@@ -24,14 +42,172 @@ async_session = async_sessionmaker(
     autoflush=False,
 )
 
+# Read-only replica for GET endpoints; falls back to the primary
+read_engine = (
+    create_async_engine(settings.database_read_url, echo=settings.debug, **_pool_kwargs)
+    if settings.database_read_url
+    else engine
+)
+
+read_session = async_sessionmaker(
+    read_engine,
+    class_=AsyncSession,
+    expire_on_commit=False,
+    autocommit=False,
+    autoflush=False,
+)
+
+
+def _set_sqlite_pragma(dbapi_connection, connection_record):
+    """Foreign keys (off by default) plus the WAL / cache / lock-wait profile."""
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA foreign_keys=ON")
+    cursor.execute(f"PRAGMA busy_timeout={int(settings.sqlite_busy_timeout_ms)}")
+    if settings.sqlite_wal:
+        # WAL lets readers run alongside the writer; NORMAL is durable in WAL
+        # except for the last commits on power loss
+        cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.execute(f"PRAGMA cache_size={-1024 * int(settings.sqlite_cache_size_mb)}")
+    cursor.execute(f"PRAGMA mmap_size={1024 * 1024 * int(settings.sqlite_mmap_size_mb)}")
+    cursor.execute("PRAGMA temp_store=MEMORY")
+    cursor.close()
+
 
-# Enable foreign keys for SQLite (off by default)
 if _is_sqlite:
-    @event.listens_for(engine.sync_engine, "connect")
-    def _set_sqlite_pragma(dbapi_connection, connection_record):
-        cursor = dbapi_connection.cursor()
-        cursor.execute("PRAGMA foreign_keys=ON")
-        cursor.close()
+    event.listen(engine.sync_engine, "connect", _set_sqlite_pragma)
+
+
+class WriteQueue:
+    """
+    Runs write units - async functions taking a session - to completion and
+    commits them. On SQLite every unit goes through one writer task and
+    connection, so writers queue instead of failing with "database is
+    locked"; units that pile up while a commit is in flight run together
+    in the next transaction and share one commit. If any unit in a batch
+    fails, the batch is rolled back and its units are retried one per
+    transaction, so only the failing unit sees the error (units must
+    therefore be idempotent; see run_write). On PostgreSQL each unit simply
+    runs in its own session.
+    """
+
+    def __init__(self, serialize: bool, max_batch: int):
+        self.serialize = serialize
+        self.max_batch = max(1, max_batch)
+        self.commits = 0
+        self.units = 0
+        self._engine = None
+        self._sessions = async_session
+        self._queue: asyncio.Queue | None = None
+        self._task: asyncio.Task | None = None
+        self._loop: asyncio.AbstractEventLoop | None = None
+
+    async def run(self, fn: Callable[[AsyncSession], Awaitable[T]]) -> T:
+        """Run fn(session) in a committed transaction and return its result."""
+        if not self.serialize:
+            async with async_session() as db:
+                result = await fn(db)
+                await db.commit()
+            return result
+        self._ensure_started()
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((fn, future))
+        return await future
+
+    def _ensure_started(self) -> None:
+        loop = asyncio.get_running_loop()
+        if self._task is not None and not self._task.done() and self._loop is loop:
+            return
+        if self._engine is None:
+            # One connection: the pool is the writer lock
+            self._engine = create_async_engine(
+                settings.database_url, pool_size=1, max_overflow=0, **_engine_kwargs
+            )
+            event.listen(self._engine.sync_engine, "connect", _set_sqlite_pragma)
+            self._sessions = async_sessionmaker(
+                self._engine, class_=AsyncSession, expire_on_commit=False, autoflush=False
+            )
+        self._loop = loop
+        self._queue = asyncio.Queue()
+        self._task = loop.create_task(self._worker(), name="sqlite-writer")
+
+    async def stop(self) -> None:
+        """Stop the writer task, failing units still queued, and close its connection."""
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        if self._queue is not None:
+            while not self._queue.empty():
+                _, future = self._queue.get_nowait()
+                if not future.done():
+                    future.set_exception(RuntimeError("Database writer stopped"))
+        if self._engine is not None:
+            await self._engine.dispose()
+            self._engine = None
+
+    def stats(self) -> dict:
+        return {
+            "serialized": self.serialize,
+            "units": self.units,
+            "commits": self.commits,
+            "queued": self._queue.qsize() if self._queue is not None else 0,
+        }
+
+    async def _worker(self) -> None:
+        assert self._queue is not None
+        while True:
+            batch = [await self._queue.get()]
+            while len(batch) < self.max_batch and not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+            # Callers that gave up before their unit ran do not get it applied
+            batch = [item for item in batch if not item[1].done()]
+            if not batch:
+                continue
+            if len(batch) == 1 or not await self._commit(batch):
+                for item in batch:
+                    await self._commit([item])
+
+    async def _commit(self, batch: list) -> bool:
+        """Run units in one transaction; report errors only for a batch of one."""
+        results = []
+        try:
+            async with self._sessions() as db:
+                for fn, _ in batch:
+                    results.append(await fn(db))
+                await db.commit()
+        except Exception as e:
+            if len(batch) > 1:
+                logger.debug("Write batch of %d failed, retrying units singly: %s", len(batch), e)
+                return False
+            if not batch[0][1].done():
+                batch[0][1].set_exception(e)
+            return True
+        self.commits += 1
+        self.units += len(batch)
+        for (_, future), result in zip(batch, results):
+            if not future.done():
+                future.set_result(result)
+        return True
+
+
+# An in-memory database is private to its connection, so it cannot have a separate writer
+write_queue = WriteQueue(
+    serialize=_is_sqlite and ":memory:" not in settings.database_url,
+    max_batch=settings.sqlite_write_batch,
+)
+
+
+async def run_write(fn: Callable[[AsyncSession], Awaitable[T]]) -> T:
+    """
+    Run a write unit fn(session) through the write queue and commit it.
+
+    fn must be idempotent and touch nothing but the session: on SQLite it may
+    run once in a group-committed batch that is rolled back because another
+    unit failed, and then again on its own. Keep side effects (counters,
+    caches, notifications) in the caller, after run_write returns.
+    """
+    return await write_queue.run(fn)
 
 
 async def get_db():
@@ -47,7 +223,56 @@ async def get_db():
             await session.close()
 
 
+async def get_read_db():
+    """Dependency for read-only routes – yields a session on the read replica (or primary)."""
+    async with read_session() as session:
+        try:
+            yield session
+        finally:
+            await session.rollback()
+            await session.close()
+
+
+async def dispose_engines() -> None:
+    """Close pooled connections of the primary and replica engines."""
+    await engine.dispose()
+    if read_engine is not engine:
+        await read_engine.dispose()
+
+
+# Columns (and their indexes) added to tables of the first schema. create_all
+# never alters an existing table, so development databases get them here.
+_ADDED_COLUMNS = {
+    "calls": [
+        "status VARCHAR(20) NOT NULL DEFAULT 'completed'",
+        "error TEXT",
+    ],
+    "call_analyses": [
+        "model VARCHAR(120)",
+        "prompt_version VARCHAR(16)",
+    ],
+}
+_ADDED_INDEXES = [
+    "CREATE INDEX IF NOT EXISTS idx_calls_status ON calls (status)",
+    "CREATE INDEX IF NOT EXISTS idx_analyses_call_version ON call_analyses (call_id, prompt_version, model)",
+]
+
+
+def _add_missing_columns(sync_conn) -> None:
+    """Add columns that later migrations introduced, if missing (development path)."""
+    inspector = inspect(sync_conn)
+    for table, columns in _ADDED_COLUMNS.items():
+        existing = {c["name"] for c in inspector.get_columns(table)}
+        for ddl in columns:
+            if ddl.split()[0] not in existing:
+                sync_conn.exec_driver_sql(f"ALTER TABLE {table} ADD COLUMN {ddl}")
+    for ddl in _ADDED_INDEXES:
+        sync_conn.exec_driver_sql(ddl)
+
+
 async def init_db():
     """Create tables (for development). Use Alembic migrations in production."""
     async with engine.begin() as conn:
         await conn.run_sync(Base.metadata.create_all)
+        await conn.run_sync(_add_missing_columns)
+        await ensure_search_index(conn)
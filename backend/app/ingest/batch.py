@@ -0,0 +1,363 @@
+"""Batch ingest - backfill archives of recordings through a staged pipeline.
+
+Usage (from backend/):
+    python -m app.ingest.batch /archive/2023            # directory (recursive)
+    python -m app.ingest.batch recordings.txt           # manifest, one path per line
+    python -m app.ingest.batch export.zip               # zip archive
+
+Stages run concurrently with their own worker counts and bounded queues in
+between: read/hash -> transcribe -> store -> analyze. Files whose content hash
+is already stored are skipped, and stored calls that are missing their
+analysis are only re-analyzed, so an interrupted run can simply be restarted.
+"""
+
+import argparse
+import asyncio
+import hashlib
+import logging
+import shutil
+import tempfile
+import time
+import zipfile
+from pathlib import Path
+from typing import AsyncIterator
+from uuid import UUID
+
+from pydantic import BaseModel
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.analysis.llm_client import close_http_client, start_http_client
+from app.analysis.post_call import run_post_call_analysis
+from app.config import settings
+from app.db.repository import (
+    add_transcript_segments,
+    create_call,
+    get_call_metadata,
+    get_transcript_segments,
+    get_upload_hashes,
+    update_call,
+)
+from app.db.session import async_session, engine, init_db, run_write, write_queue
+from app.ingest.upload import ALLOWED_EXTENSIONS, mark_call_failed, transcribe_with_cache
+from app.transcription.types import Transcript
+from app.transcription.whisper_client import shutdown_transcription_pool, start_transcription_pool
+
+logger = logging.getLogger(__name__)
+
+_DONE = None  # queue sentinel
+
+# Resume states of a call already stored for a file's hash
+IN_PROGRESS_STATUSES = {"live", "transcribing"}
+TRANSCRIBED_STATUSES = {"analyzing", "completed", "failed"}
+
+
+class BatchItem(BaseModel):
+    """A recording moving through the pipeline."""
+
+    path: Path
+    external_id: str
+    temporary: bool = False  # extracted from a zip; delete when transcribed
+    sha256: str = ""
+    size: int = 0
+    call_id: UUID | None = None
+    transcript: Transcript | None = None
+
+
+class BatchStats(BaseModel):
+    discovered: int = 0
+    skipped: int = 0
+    transcribed: int = 0
+    stored: int = 0
+    analyzed: int = 0
+    failed: int = 0
+    bytes_read: int = 0
+    started: float = 0.0
+
+    def line(self) -> str:
+        elapsed = max(time.monotonic() - self.started, 1e-9)
+        return (
+            f"discovered={self.discovered} skipped={self.skipped} transcribed={self.transcribed} "
+            f"stored={self.stored} analyzed={self.analyzed} failed={self.failed} | "
+            f"{self.analyzed / elapsed * 60:.1f} calls/min, "
+            f"{self.bytes_read / elapsed / 1024 / 1024 * 60:.1f} MB audio/min"
+        )
+
+
+async def discover(source: Path, work_dir: Path) -> AsyncIterator[BatchItem]:
+    """
+    Yield recordings from a directory, a manifest file or a zip archive.
+    Zip members are extracted into work_dir as they are yielded.
+    """
+    if source.is_dir():
+        for path in sorted(source.rglob("*")):
+            if path.is_file() and path.suffix.lower() in ALLOWED_EXTENSIONS:
+                yield BatchItem(path=path, external_id=str(path.relative_to(source)))
+    elif zipfile.is_zipfile(source):
+        with zipfile.ZipFile(source) as archive:
+            for index, info in enumerate(archive.infolist()):
+                name = Path(info.filename)
+                if info.is_dir() or name.suffix.lower() not in ALLOWED_EXTENSIONS:
+                    continue
+                target = work_dir / f"{index}{name.suffix.lower()}"
+                # Extract lazily, one member at a time, so disk use follows the queues
+                await asyncio.to_thread(_extract, archive, info, target)
+                yield BatchItem(path=target, external_id=info.filename, temporary=True)
+    else:
+        base = source.parent
+        for line in source.read_text(encoding="utf-8").splitlines():
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            path = Path(line) if Path(line).is_absolute() else base / line
+            yield BatchItem(path=path, external_id=line)
+
+
+def _extract(archive: zipfile.ZipFile, info: zipfile.ZipInfo, target: Path) -> None:
+    with archive.open(info) as src, open(target, "wb") as dst:
+        shutil.copyfileobj(src, dst, settings.upload_chunk_bytes)
+
+
+def _hash_file(path: Path) -> tuple[str, int]:
+    digest = hashlib.sha256()
+    size = 0
+    with open(path, "rb") as f:
+        while chunk := f.read(settings.upload_chunk_bytes):
+            digest.update(chunk)
+            size += len(chunk)
+    return digest.hexdigest(), size
+
+
+class BatchPipeline:
+    """read/hash -> transcribe -> store -> analyze, each stage with its own workers."""
+
+    def __init__(
+        self,
+        transcribe_workers: int,
+        db_workers: int,
+        analysis_workers: int,
+        queue_size: int,
+    ):
+        self.workers = {
+            "read": 2,
+            "transcribe": transcribe_workers,
+            "store": db_workers,
+            "analyze": analysis_workers,
+        }
+        self.queues = {name: asyncio.Queue(maxsize=queue_size) for name in self.workers}
+        self.stats = BatchStats()
+        self._claimed: set[str] = set()
+
+    async def run(self, source: Path, progress_interval: float) -> BatchStats:
+        self.stats.started = time.monotonic()
+
+        stages = {
+            "read": self._read,
+            "transcribe": self._transcribe,
+            "store": self._store,
+            "analyze": self._analyze,
+        }
+        tasks = {
+            name: [asyncio.create_task(self._stage(name, fn)) for _ in range(self.workers[name])]
+            for name, fn in stages.items()
+        }
+        reporter = asyncio.create_task(self._report(progress_interval))
+        work_dir = Path(tempfile.mkdtemp(prefix="resonance-batch-"))
+        try:
+            async for item in discover(source, work_dir):
+                self.stats.discovered += 1
+                await self.queues["read"].put(item)
+            # Drain stage by stage: once a stage's workers finish, close the next
+            for name in stages:
+                for _ in tasks[name]:
+                    await self.queues[name].put(_DONE)
+                await asyncio.gather(*tasks[name])
+        finally:
+            shutil.rmtree(work_dir, ignore_errors=True)
+            reporter.cancel()
+            for group in tasks.values():
+                for task in group:
+                    task.cancel()
+        logger.info("Batch finished: %s", self.stats.line())
+        return self.stats
+
+    async def _stage(self, name: str, fn) -> None:
+        """Worker loop: each stage function returns the next stage name, or None."""
+        queue = self.queues[name]
+        while (item := await queue.get()) is not _DONE:
+            try:
+                next_stage = await fn(item)
+            except Exception:
+                logger.exception("Batch %s failed for %s", name, item.external_id)
+                self.stats.failed += 1
+                if item.temporary:
+                    item.path.unlink(missing_ok=True)
+                continue
+            if next_stage is not None:
+                await self.queues[next_stage].put(item)
+
+    async def _read(self, item: BatchItem) -> str | None:
+        item.sha256, item.size = await asyncio.to_thread(_hash_file, item.path)
+        self.stats.bytes_read += item.size
+        if item.sha256 in self._claimed:
+            # Duplicate within this run
+            return self._skip(item)
+        self._claimed.add(item.sha256)
+        known = await self._stored(item.sha256)
+        call_id, status, has_segments, analyzed = known or (None, None, False, False)
+        if analyzed:
+            # Already fully ingested
+            return self._skip(item)
+        if known is None:
+            return "transcribe"
+        if status in IN_PROGRESS_STATUSES:
+            logger.warning(
+                "Skipping %s: call %s is still %s", item.external_id, call_id, status
+            )
+            return self._skip(item)
+        item.call_id = call_id
+        if has_segments and status in TRANSCRIBED_STATUSES:
+            # Stored by an earlier run but its analysis is missing
+            if item.temporary:
+                item.path.unlink(missing_ok=True)
+            return "analyze"
+        # Persisted before transcription (e.g. an upload that failed): transcribe into it
+        return "transcribe"
+
+    async def _stored(self, sha256: str) -> tuple[UUID, str, bool, bool] | None:
+        """(call_id, status, has segments, analyzed) of a call already stored for a hash."""
+        async with async_session() as db:
+            return (await get_upload_hashes(db, [sha256])).get(sha256)
+
+    def _skip(self, item: BatchItem) -> None:
+        if item.temporary:
+            item.path.unlink(missing_ok=True)
+        self.stats.skipped += 1
+        return None
+
+    async def _transcribe(self, item: BatchItem) -> str:
+        try:
+            item.transcript, _ = await transcribe_with_cache(item.path, item.sha256)
+        finally:
+            if item.temporary:
+                item.path.unlink(missing_ok=True)
+        self.stats.transcribed += 1
+        return "store"
+
+    async def _store(self, item: BatchItem) -> str:
+        assert item.transcript is not None
+        rows = [s.model_dump() for s in item.transcript.segments]
+        metadata = {
+            "sha256": item.sha256,
+            "size_bytes": item.size,
+            "batch": True,
+            "speech_ratio": item.transcript.speech_ratio,
+        }
+
+        async def _create(db: AsyncSession) -> UUID:
+            if item.call_id is not None:
+                await add_transcript_segments(db, item.call_id, rows)
+                # Merge, so keys stored by the upload route or an earlier run survive
+                stored = await get_call_metadata(db, item.call_id)
+                await update_call(
+                    db, item.call_id, metadata_={**stored, **metadata}, status="analyzing", error=None
+                )
+                return item.call_id
+            call = await create_call(
+                db,
+                source="upload",
+                external_id=item.external_id[:255],
+                metadata_=metadata,
+                status="analyzing",
+            )
+            await add_transcript_segments(db, call.id, rows)
+            return call.id
+
+        item.call_id = await run_write(_create)
+        self.stats.stored += 1
+        return "analyze"
+
+    async def _analyze(self, item: BatchItem) -> None:
+        assert item.call_id is not None
+        if item.transcript is None:
+            async with async_session() as db:
+                segments = await get_transcript_segments(db, item.call_id)
+            item.transcript = Transcript(
+                segments=[{"speaker": s.speaker, "text": s.text} for s in segments]
+            )
+        try:
+            await run_post_call_analysis(
+                item.call_id,
+                item.transcript.full_text,
+                [s.text for s in item.transcript.segments],
+            )
+        except Exception as e:
+            await mark_call_failed(item.call_id, e)
+            raise
+        item.transcript = None  # release memory early
+        self.stats.analyzed += 1
+        return None
+
+    async def _report(self, interval: float) -> None:
+        while True:
+            await asyncio.sleep(interval)
+            depth = " ".join(f"{n}={q.qsize()}" for n, q in self.queues.items())
+            logger.info("%s | queues %s", self.stats.line(), depth)
+
+
+async def run_batch(
+    source: Path,
+    transcribe_workers: int | None = None,
+    db_workers: int = 2,
+    analysis_workers: int | None = None,
+    queue_size: int = 8,
+    progress_interval: float = 10.0,
+) -> BatchStats:
+    """Ingest every recording under `source` (directory, manifest or zip)."""
+    await init_db()
+    await start_http_client()
+    await start_transcription_pool()
+    try:
+        pipeline = BatchPipeline(
+            transcribe_workers=transcribe_workers or max(1, settings.whisper_processes),
+            db_workers=db_workers,
+            analysis_workers=analysis_workers or settings.llm_max_concurrency,
+            queue_size=queue_size,
+        )
+        return await pipeline.run(source, progress_interval)
+    finally:
+        shutdown_transcription_pool()
+        await close_http_client()
+        await write_queue.stop()
+        await engine.dispose()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Batch-ingest call recordings.")
+    parser.add_argument("source", type=Path, help="Directory, manifest (.txt) or .zip archive")
+    parser.add_argument("--transcribe-workers", type=int, default=None,
+                        help="Concurrent transcriptions (default: WHISPER_PROCESSES or 1)")
+    parser.add_argument("--db-workers", type=int, default=2)
+    parser.add_argument("--analysis-workers", type=int, default=None,
+                        help="Concurrent analyses (default: LLM_MAX_CONCURRENCY)")
+    parser.add_argument("--queue-size", type=int, default=8, help="Items buffered between stages")
+    parser.add_argument("--progress-interval", type=float, default=10.0, help="Seconds between progress logs")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+    if not args.source.exists():
+        parser.error(f"{args.source} does not exist")
+    stats = asyncio.run(
+        run_batch(
+            args.source,
+            transcribe_workers=args.transcribe_workers,
+            db_workers=args.db_workers,
+            analysis_workers=args.analysis_workers,
+            queue_size=args.queue_size,
+            progress_interval=args.progress_interval,
+        )
+    )
+    print(stats.line())
+
+
+if __name__ == "__main__":
+    main()
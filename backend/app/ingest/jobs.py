@@ -0,0 +1,151 @@
+"""Background upload jobs - bounded in-process queue drained by worker tasks."""
+
+import asyncio
+import logging
+import uuid
+from collections import OrderedDict
+from datetime import datetime
+from uuid import UUID
+
+from pydantic import BaseModel
+
+from app.config import settings
+from app.ingest.upload import SavedUpload, create_upload_call, process_audio_file, upload_metadata
+
+logger = logging.getLogger(__name__)
+
+
+class Job(BaseModel):
+    """State of a queued upload."""
+
+    id: UUID
+    status: str = "queued"  # queued | processing | completed | failed
+    filename: str | None = None
+    call_id: UUID | None = None
+    error: str | None = None
+    created_at: datetime
+    started_at: datetime | None = None
+    finished_at: datetime | None = None
+
+
+class QueueFullError(Exception):
+    """Raised when the job queue has no free slots."""
+
+
+class JobQueue:
+    """
+    Bounded queue of uploaded files waiting for transcription and analysis.
+
+    Each job commits its call up front and its results in short transactions
+    of their own. Finished jobs are kept in a bounded
+    history so their status can be polled.
+    """
+
+    def __init__(self, maxsize: int, workers: int, history_size: int):
+        self.maxsize = maxsize
+        self.workers = workers
+        self.history_size = history_size
+        self._queue: asyncio.Queue | None = None
+        self._tasks: list[asyncio.Task] = []
+        self._jobs: OrderedDict[UUID, Job] = OrderedDict()
+
+    @property
+    def running(self) -> bool:
+        return bool(self._tasks)
+
+    def full(self) -> bool:
+        return self._queue is None or self._queue.full()
+
+    async def start(self) -> None:
+        """Create the queue and spawn worker tasks."""
+        if self._tasks:
+            return
+        self._queue = asyncio.Queue(maxsize=self.maxsize)
+        self._tasks = [
+            asyncio.create_task(self._worker(), name=f"upload-worker-{i}")
+            for i in range(self.workers)
+        ]
+
+    async def stop(self) -> None:
+        """Cancel worker tasks and drop queued files."""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        if self._queue is not None:
+            while not self._queue.empty():
+                _, saved = self._queue.get_nowait()
+                saved.path.unlink(missing_ok=True)
+
+    def submit(self, saved: SavedUpload, filename: str | None) -> Job:
+        """Enqueue a saved upload. Raises QueueFullError when at capacity."""
+        if self._queue is None or self._queue.full():
+            raise QueueFullError("Upload queue is full")
+        job = Job(id=uuid.uuid4(), filename=filename, created_at=datetime.utcnow())
+        self._queue.put_nowait((job.id, saved))
+        self._remember(job)
+        return job
+
+    def get(self, job_id: UUID) -> Job | None:
+        return self._jobs.get(job_id)
+
+    def _remember(self, job: Job) -> None:
+        self._jobs[job.id] = job
+        # Evict the oldest finished jobs first; never drop pending ones
+        while len(self._jobs) > self.history_size:
+            for old_id, old in self._jobs.items():
+                if old.status in ("completed", "failed"):
+                    del self._jobs[old_id]
+                    break
+            else:
+                break
+
+    async def _worker(self) -> None:
+        assert self._queue is not None
+        while True:
+            job_id, saved = await self._queue.get()
+            job = self._jobs.get(job_id)
+            try:
+                if job is not None:
+                    job.status = "processing"
+                    job.started_at = datetime.utcnow()
+                await self._run(job, saved)
+            finally:
+                self._queue.task_done()
+
+    async def _run(self, job: Job | None, saved: SavedUpload) -> None:
+        filename = job.filename if job else None
+        metadata = upload_metadata(saved)
+        try:
+            call_id = await create_upload_call(filename, metadata)
+        except Exception as e:
+            saved.path.unlink(missing_ok=True)
+            logger.exception("Background upload failed")
+            self._fail(job, e)
+            return
+        if job is not None:
+            # Known before processing, so clients can follow the call's status too
+            job.call_id = call_id
+        try:
+            await process_audio_file(call_id, saved.path, metadata)
+        except Exception as e:
+            logger.exception("Background upload failed")
+            self._fail(job, e)
+            return
+        if job is not None:
+            job.status = "completed"
+            job.finished_at = datetime.utcnow()
+
+    @staticmethod
+    def _fail(job: Job | None, error: Exception) -> None:
+        if job is not None:
+            job.status = "failed"
+            job.error = str(error)
+            job.finished_at = datetime.utcnow()
+
+
+job_queue = JobQueue(
+    maxsize=settings.upload_queue_size,
+    workers=settings.upload_workers,
+    history_size=settings.upload_job_history,
+)
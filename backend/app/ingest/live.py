@@ -0,0 +1,137 @@
+"""Live audio streams - VAD-bounded incremental transcription."""
+
+import numpy as np
+
+from app.config import settings
+from app.transcription.whisper_client import SAMPLE_RATE
+
+ENCODINGS = {"pcm_s16le", "opus"}
+
+
+class StreamSegmenter:
+    """
+    Cuts a live 16 kHz mono stream into windows at pauses in speech.
+
+    Frames are classified as speech by RMS energy. A window is emitted once
+    speech is followed by `min_silence_ms` of silence, or when it reaches
+    `max_window_s`. Leading silence is dropped (keeping a short pre-roll),
+    and every window carries its offset in the stream so segment timestamps
+    stay relative to the start of the call.
+    """
+
+    def __init__(
+        self,
+        threshold: float,
+        min_silence_ms: int,
+        max_window_s: float,
+        frame_ms: int = 30,
+        preroll_ms: int = 200,
+    ):
+        self.threshold = threshold
+        self.frame = SAMPLE_RATE * frame_ms // 1000
+        self.frame_ms = frame_ms
+        self.min_silence_ms = min_silence_ms
+        self.max_window = int(SAMPLE_RATE * max_window_s)
+        self.preroll = SAMPLE_RATE * preroll_ms // 1000
+        self._buffer = np.zeros(0, dtype=np.float32)
+        self._buffer_start = 0  # stream sample index of _buffer[0]
+        self._pos = 0  # samples of _buffer already classified
+        self._has_speech = False
+        self._silence_ms = 0
+
+    def feed(self, samples: np.ndarray) -> list[tuple[np.ndarray, int]]:
+        """Add samples; return finished (window, offset_ms) pairs."""
+        self._buffer = np.concatenate((self._buffer, samples.astype(np.float32, copy=False)))
+        windows = []
+        while self._pos + self.frame <= len(self._buffer):
+            frame = self._buffer[self._pos:self._pos + self.frame]
+            self._pos += self.frame
+            if float(np.sqrt(np.mean(frame * frame))) >= self.threshold:
+                self._has_speech = True
+                self._silence_ms = 0
+            else:
+                self._silence_ms += self.frame_ms
+
+            if self._has_speech and (
+                self._silence_ms >= self.min_silence_ms or self._pos >= self.max_window
+            ):
+                windows.append(self._cut(self._pos))
+            elif not self._has_speech and self._pos > self.preroll:
+                self._drop(self._pos - self.preroll)
+        return windows
+
+    def flush(self) -> tuple[np.ndarray, int] | None:
+        """Return whatever speech is still buffered at end of stream."""
+        if not self._has_speech or not len(self._buffer):
+            return None
+        return self._cut(len(self._buffer))
+
+    def _cut(self, end: int) -> tuple[np.ndarray, int]:
+        window = self._buffer[:end]
+        offset_ms = self._buffer_start * 1000 // SAMPLE_RATE
+        self._drop(end)
+        self._has_speech = False
+        self._silence_ms = 0
+        return window, offset_ms
+
+    def _drop(self, n: int) -> None:
+        self._buffer = self._buffer[n:]
+        self._buffer_start += n
+        self._pos -= n
+
+
+def new_segmenter() -> StreamSegmenter:
+    return StreamSegmenter(
+        threshold=settings.live_vad_threshold,
+        min_silence_ms=settings.live_min_silence_ms,
+        max_window_s=settings.live_max_window_seconds,
+    )
+
+
+class PCMDecoder:
+    """Signed 16-bit little-endian mono PCM at any rate -> 16 kHz float32."""
+
+    def __init__(self, sample_rate: int):
+        self.sample_rate = sample_rate
+        self._odd = b""
+
+    def decode(self, data: bytes) -> np.ndarray:
+        data = self._odd + data
+        if len(data) % 2:
+            data, self._odd = data[:-1], data[-1:]
+        else:
+            self._odd = b""
+        samples = np.frombuffer(data, dtype="<i2").astype(np.float32) / 32768.0
+        if self.sample_rate != SAMPLE_RATE and len(samples):
+            n = int(round(len(samples) * SAMPLE_RATE / self.sample_rate))
+            samples = np.interp(
+                np.linspace(0, len(samples) - 1, n), np.arange(len(samples)), samples
+            ).astype(np.float32)
+        return samples
+
+
+class OpusDecoder:
+    """Raw Opus packets (one per message) -> 16 kHz float32, via PyAV."""
+
+    def __init__(self, sample_rate: int = 48000):
+        import av  # installed with faster-whisper
+
+        self._av = av
+        self._codec = av.CodecContext.create("opus", "r")
+        self._codec.sample_rate = sample_rate
+        self._resampler = av.AudioResampler(format="flt", layout="mono", rate=SAMPLE_RATE)
+
+    def decode(self, data: bytes) -> np.ndarray:
+        chunks = []
+        for frame in self._codec.decode(self._av.Packet(data)):
+            for out in self._resampler.resample(frame):
+                chunks.append(out.to_ndarray().reshape(-1))
+        if not chunks:
+            return np.zeros(0, dtype=np.float32)
+        return np.concatenate(chunks).astype(np.float32, copy=False)
+
+
+def new_decoder(encoding: str, sample_rate: int) -> PCMDecoder | OpusDecoder:
+    if encoding == "opus":
+        return OpusDecoder(sample_rate)
+    return PCMDecoder(sample_rate)
@@ -1,54 +1,192 @@
 """Manual audio upload - save, transcribe, analyze."""
 
+import asyncio
+import hashlib
+import logging
+import os
 import tempfile
 from pathlib import Path
+from uuid import UUID
 
+import aiofiles
 from fastapi import UploadFile
+from pydantic import BaseModel
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.transcription.whisper_client import transcribe_file_async
-from app.db.repository import create_call, add_transcript_segments
+from app.config import settings
+from app.transcription.cache import transcript_cache
+from app.transcription.preprocess import preprocess_options
+from app.transcription.types import Transcript
+from app.transcription.whisper_client import transcribe_file_async, transcription_options
+from app.db.repository import create_call, add_transcript_segments, update_call
+from app.db.session import run_write
 from app.analysis.post_call import run_post_call_analysis
 
+logger = logging.getLogger(__name__)
+
 ALLOWED_EXTENSIONS = {".mp3", ".wav", ".m4a", ".ogg", ".flac", ".webm", ".mp4"}
 
 
-async def process_upload(
-    db: AsyncSession,
-    file: UploadFile,
-) -> tuple[str, str]:
+class UploadTooLargeError(ValueError):
+    """Raised when an upload exceeds UPLOAD_MAX_BYTES."""
+
+
+class SavedUpload(BaseModel):
+    """An upload copied to local disk."""
+
+    path: Path
+    size: int
+    sha256: str
+
+
+async def save_upload(file: UploadFile) -> SavedUpload:
     """
-    Process uploaded audio: transcribe with Whisper, store, run analysis.
-    Returns (call_id, full_text).
+    Stream an uploaded file to a temporary path in fixed-size chunks.
+    Hashes the content on the fly and enforces the configured size limit,
+    so memory use is bounded by the chunk size rather than the file size.
     """
     suffix = Path(file.filename or "audio").suffix.lower()
     if suffix not in ALLOWED_EXTENSIONS:
         suffix = ".mp3"
 
-    with tempfile.NamedTemporaryFile(delete=False, suffix=suffix) as tmp:
-        content = await file.read()
-        tmp.write(content)
-        tmp_path = tmp.name
+    fd, name = tempfile.mkstemp(suffix=suffix)
+    os.close(fd)
+    tmp_path = Path(name)
+    digest = hashlib.sha256()
+    size = 0
+    try:
+        async with aiofiles.open(tmp_path, "wb") as out:
+            while chunk := await file.read(settings.upload_chunk_bytes):
+                size += len(chunk)
+                if size > settings.upload_max_bytes:
+                    raise UploadTooLargeError(
+                        f"File exceeds maximum upload size of {settings.upload_max_bytes} bytes"
+                    )
+                digest.update(chunk)
+                await out.write(chunk)
+    except BaseException:
+        tmp_path.unlink(missing_ok=True)
+        raise
+    return SavedUpload(path=tmp_path, size=size, sha256=digest.hexdigest())
+
+
+def upload_metadata(saved: SavedUpload) -> dict:
+    """Call metadata recorded for an upload."""
+    return {"sha256": saved.sha256, "size_bytes": saved.size}
+
+
+async def transcribe_with_cache(
+    audio_path: str | Path,
+    content_hash: str | None = None,
+) -> tuple[Transcript, bool]:
+    """
+    Transcribe audio, reusing a cached transcript for identical content.
+    Returns (transcript, cache_hit).
+    """
+    if content_hash and transcript_cache.enabled:
+        key = transcript_cache.key(
+            content_hash, {**transcription_options(), **preprocess_options()}
+        )
+        cached = await asyncio.to_thread(transcript_cache.get, key)
+        if cached is not None:
+            return cached, True
+        transcript = await transcribe_file_async(audio_path)
+        await asyncio.to_thread(transcript_cache.put, key, transcript)
+        return transcript, False
+    return await transcribe_file_async(audio_path), False
+
+
+async def create_upload_call(filename: str | None, metadata: dict) -> UUID:
+    """Persist the call for an upload up front, marked as transcribing."""
+
+    async def _create(db: AsyncSession) -> UUID:
+        call = await create_call(
+            db=db,
+            source="upload",
+            external_id=filename,
+            metadata_=metadata,
+            status="transcribing",
+        )
+        return call.id
 
+    return await run_write(_create)
+
+
+async def mark_call_failed(call_id: UUID, error: BaseException, **values) -> None:
+    """Record a processing failure (and any extra column values) on the call, best effort."""
+    try:
+        await run_write(
+            lambda db: update_call(
+                db, call_id, status="failed", error=str(error) or type(error).__name__, **values
+            )
+        )
+    except Exception:
+        logger.exception("Could not mark call %s as failed", call_id)
+
+
+async def process_audio_file(
+    call_id: UUID,
+    audio_path: str | Path,
+    metadata: dict | None = None,
+) -> str:
+    """
+    Transcribe a saved audio file into an existing call and run analysis.
+    Segments and the analysis are written in their own short transactions,
+    so no DB connection is held while Whisper or the LLM runs. The file is
+    deleted once transcribed; on error the call is marked failed. Returns
+    the full transcript text.
+    """
+    metadata = dict(metadata or {})
+    try:
+        try:
+            transcript, cached = await transcribe_with_cache(audio_path, metadata.get("sha256"))
+        finally:
+            Path(audio_path).unlink(missing_ok=True)
+
+        segments_data = [
+            {
+                "speaker": s.speaker,
+                "text": s.text,
+                "start_time_ms": s.start_time_ms,
+                "end_time_ms": s.end_time_ms,
+            }
+            for s in transcript.segments
+        ]
+        values = {"status": "analyzing"}
+        extra = {}
+        if cached:
+            extra["transcript_cached"] = True
+        if transcript.speech_ratio is not None:
+            extra["speech_ratio"] = transcript.speech_ratio
+        if extra:
+            values["metadata_"] = {**metadata, **extra}
+
+        async def _store(db: AsyncSession) -> None:
+            await add_transcript_segments(db, call_id, segments_data)
+            await update_call(db, call_id, **values)
+
+        await run_write(_store)
+
+        await run_post_call_analysis(
+            call_id, transcript.full_text, [s.text for s in transcript.segments]
+        )
+    except (Exception, asyncio.CancelledError) as e:
+        await mark_call_failed(call_id, e)
+        raise
+    return transcript.full_text
+
+
+async def process_upload(file: UploadFile) -> tuple[str, str]:
+    """
+    Process uploaded audio: transcribe with Whisper, store, run analysis.
+    Returns (call_id, full_text).
+    """
+    saved = await save_upload(file)
+    metadata = upload_metadata(saved)
     try:
-        transcript = await transcribe_file_async(tmp_path)
-    finally:
-        Path(tmp_path).unlink(missing_ok=True)
-
-    call = await create_call(
-        db=db,
-        source="upload",
-        external_id=file.filename,
-    )
-    segments_data = [
-        {
-            "speaker": s.speaker,
-            "text": s.text,
-            "start_time_ms": s.start_time_ms,
-            "end_time_ms": s.end_time_ms,
-        }
-        for s in transcript.segments
-    ]
-    await add_transcript_segments(db, call.id, segments_data)
-    await run_post_call_analysis(db, call.id, transcript.full_text)
-    return str(call.id), transcript.full_text
+        call_id = await create_upload_call(file.filename, metadata)
+    except BaseException:
+        saved.path.unlink(missing_ok=True)
+        raise
+    full_text = await process_audio_file(call_id, saved.path, metadata)
+    return str(call_id), full_text
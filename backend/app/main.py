@@ -6,8 +6,14 @@ from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
 from app.config import settings
+from app.analysis.llm_client import analysis_cache, start_http_client, close_http_client
+from app.analysis.reanalyze import reanalysis_jobs
 from app.api.router import router as api_router
-from app.db.session import init_db
+from app.db.cache import call_detail_cache
+from app.db.session import dispose_engines, init_db, write_queue
+from app.ingest.jobs import job_queue
+from app.transcription.cache import transcript_cache
+from app.transcription.whisper_client import start_transcription_pool, shutdown_transcription_pool
 
 logger = logging.getLogger(__name__)
 
@@ -32,15 +38,36 @@ app.include_router(api_router, prefix="/api/v1", tags=["api"])
 
 @app.on_event("startup")
 async def startup():
-    """Create database tables on startup if they don't exist."""
+    """Create database tables if they don't exist and start transcription/upload workers."""
     try:
         await init_db()
         logger.info("Database tables ready")
     except Exception as e:
         logger.warning("Database init failed (run migrations?): %s", e)
+    await start_http_client()
+    await start_transcription_pool()
+    await job_queue.start()
+
+
+@app.on_event("shutdown")
+async def shutdown():
+    """Stop background workers and close pooled connections."""
+    await job_queue.stop()
+    await reanalysis_jobs.stop()
+    shutdown_transcription_pool()
+    await close_http_client()
+    await write_queue.stop()
+    await dispose_engines()
 
 
 @app.get("/health")
 async def health_check():
     """Health check endpoint."""
-    return {"status": "ok", "app": settings.app_name}
+    return {
+        "status": "ok",
+        "app": settings.app_name,
+        "transcript_cache": transcript_cache.stats(),
+        "llm_cache": analysis_cache.stats(),
+        "call_cache": call_detail_cache.stats(),
+        "db_writer": write_queue.stats(),
+    }
@@ -0,0 +1,126 @@
+"""Content-addressed transcript cache - skip Whisper for audio already seen."""
+
+import hashlib
+import json
+import logging
+import os
+import threading
+from pathlib import Path
+
+from app.config import settings
+from app.transcription.types import Transcript
+
+logger = logging.getLogger(__name__)
+
+
+class TranscriptCache:
+    """
+    Transcripts stored as JSON files named by a hash of the audio content and
+    the transcription settings. Least recently used entries are evicted once
+    the directory exceeds max_bytes (0 disables the cache).
+    """
+
+    def __init__(self, directory: str | Path, max_bytes: int):
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._size: int | None = None
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_bytes > 0
+
+    def key(self, content_hash: str, options: dict) -> str:
+        """Cache key for audio content transcribed with the given options."""
+        raw = json.dumps(
+            {"audio": content_hash, "model": settings.whisper_model_size, "options": options},
+            sort_keys=True,
+        )
+        return hashlib.sha256(raw.encode()).hexdigest()
+
+    def get(self, key: str) -> Transcript | None:
+        if not self.enabled:
+            return None
+        path = self._path(key)
+        try:
+            data = path.read_text(encoding="utf-8")
+            os.utime(path)  # mark as recently used
+            transcript = Transcript.model_validate_json(data)
+        except FileNotFoundError:
+            self.misses += 1
+            return None
+        except ValueError:
+            logger.warning("Dropping corrupt transcript cache entry %s", key)
+            path.unlink(missing_ok=True)
+            self.misses += 1
+            return None
+        self.hits += 1
+        return transcript
+
+    def put(self, key: str, transcript: Transcript) -> None:
+        if not self.enabled:
+            return
+        data = transcript.model_dump_json().encode("utf-8")
+        if len(data) > self.max_bytes:
+            return
+        self.directory.mkdir(parents=True, exist_ok=True)
+        path = self._path(key)
+        tmp = path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+        tmp.write_bytes(data)
+        with self._lock:
+            # Size the directory before the new file lands so it is not counted twice
+            size = self._current_size()
+            old = path.stat().st_size if path.exists() else 0
+            os.replace(tmp, path)
+            self._size = size + len(data) - old
+            if self._size > self.max_bytes:
+                self._evict()
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            "enabled": self.enabled,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / total, 4) if total else 0.0,
+            "evictions": self.evictions,
+            "size_bytes": self._size or 0,
+            "max_bytes": self.max_bytes,
+        }
+
+    def _path(self, key: str) -> Path:
+        return self.directory / f"{key}.json"
+
+    def _current_size(self) -> int:
+        if self._size is None:
+            self._size = sum(p.stat().st_size for p in self.directory.glob("*.json"))
+        return self._size
+
+    def _evict(self) -> None:
+        entries = []
+        for p in self.directory.glob("*.json"):
+            try:
+                st = p.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((st.st_mtime, st.st_size, p))
+        entries.sort()
+        size = sum(e[1] for e in entries)
+        # Evict down to 90% so every insert doesn't rescan the directory
+        target = int(self.max_bytes * 0.9)
+        for _, entry_size, p in entries:
+            if size <= target:
+                break
+            p.unlink(missing_ok=True)
+            size -= entry_size
+            self.evictions += 1
+        self._size = size
+
+
+transcript_cache = TranscriptCache(
+    directory=settings.transcript_cache_dir,
+    max_bytes=settings.transcript_cache_max_mb * 1024 * 1024,
+)
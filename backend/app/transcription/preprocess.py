@@ -0,0 +1,242 @@
+"""Audio preprocessing - decode once to 16 kHz mono and drop non-speech.
+
+Recordings are decoded a single time into float32 PCM at Whisper's input
+rate. Telephony recordings that carry the agent and the customer on separate
+stereo channels are split into one track per speaker; any other audio is
+mixed down to mono. Silero VAD (bundled with faster-whisper) then finds the
+speech regions of each track; only those, with a little padding, are
+concatenated and sent to Whisper, so hold music and long silences never reach
+the encoder. A SpeechMap translates times in the trimmed audio back to the
+original recording. Long tracks are cut at silences into chunks that can be
+transcribed in parallel.
+"""
+
+from bisect import bisect_left, bisect_right
+from pathlib import Path
+
+import numpy as np
+from pydantic import BaseModel, ConfigDict
+
+from app.config import settings
+
+SAMPLE_RATE = 16000  # Whisper input rate
+
+
+class SpeechMap:
+    """Maps times in concatenated speech back to the original audio."""
+
+    def __init__(self, chunks: list[tuple[int, int]]):
+        # chunks: (start, end) sample ranges of the original audio that were kept
+        self.chunks = chunks
+        self._offsets: list[int] = []
+        position = 0
+        for start, end in chunks:
+            self._offsets.append(position)
+            position += end - start
+
+    @property
+    def boundaries(self) -> list[int]:
+        """Positions in the trimmed audio where removed non-speech used to be."""
+        return self._offsets[1:]
+
+    def to_original_ms(self, trimmed_ms: int, is_end: bool = False) -> int:
+        """Original-audio time of a position in the trimmed audio."""
+        if not self.chunks:
+            return trimmed_ms
+        sample = trimmed_ms * SAMPLE_RATE // 1000
+        # An end time on a chunk boundary belongs to the chunk it closes
+        find = bisect_left if is_end else bisect_right
+        i = min(max(find(self._offsets, sample) - 1, 0), len(self.chunks) - 1)
+        start, end = self.chunks[i]
+        return (start + min(max(sample - self._offsets[i], 0), end - start)) * 1000 // SAMPLE_RATE
+
+
+class PreparedAudio(BaseModel):
+    """One speaker track's speech samples plus what is needed to report against the original."""
+
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
+    speaker: str = "unknown"
+    samples: np.ndarray
+    duration_ms: int
+    speech_map: SpeechMap | None = None  # None = samples are the untrimmed audio
+    # For chunks of a track: where samples[0] sits in the track, and the
+    # (start, end) track samples whose segments this chunk keeps
+    start_sample: int = 0
+    owned: tuple[int, int] | None = None
+
+
+def preprocess_options() -> dict:
+    """Settings that change what Whisper sees (part of the transcript cache key)."""
+    options = {
+        "split_channels": settings.whisper_split_channels,
+        "agent_channel": settings.whisper_agent_channel,
+        "vad": settings.whisper_vad_enabled,
+    }
+    if settings.whisper_vad_enabled:
+        options.update(
+            threshold=settings.whisper_vad_threshold,
+            min_silence_ms=settings.whisper_vad_min_silence_ms,
+            speech_pad_ms=settings.whisper_vad_speech_pad_ms,
+        )
+    if settings.whisper_chunk_seconds > 0:
+        options.update(
+            chunk_seconds=settings.whisper_chunk_seconds,
+            chunk_overlap_seconds=settings.whisper_chunk_overlap_seconds,
+        )
+    return options
+
+
+def _is_dual_channel(left: np.ndarray, right: np.ndarray) -> bool:
+    """
+    True when each channel carries its own speaker: the channels are barely
+    correlated and mostly take turns, one active while the other is quiet.
+    Mono sources, mixed-down stereo and gain-skewed copies of one signal are
+    strongly correlated and fall back to mono.
+    """
+    frame = SAMPLE_RATE // 10
+    n = min(len(left), len(right)) // frame
+    if n < 2:
+        return False
+    left, right = left[:n * frame], right[:n * frame]
+    if not np.std(left) or not np.std(right):
+        return False
+    if abs(float(np.corrcoef(left, right)[0, 1])) > 0.3:
+        return False
+    # Per-frame RMS; a frame is active above a tenth of the channel's loud level
+    left_rms = np.sqrt(np.mean(left.reshape(n, frame) ** 2, axis=1))
+    right_rms = np.sqrt(np.mean(right.reshape(n, frame) ** 2, axis=1))
+    left_on = left_rms > 0.1 * np.percentile(left_rms, 95)
+    right_on = right_rms > 0.1 * np.percentile(right_rms, 95)
+    only_left = int(np.sum(left_on & ~right_on))
+    only_right = int(np.sum(right_on & ~left_on))
+    if not only_left or not only_right:
+        return False
+    return (only_left + only_right) / int(np.sum(left_on | right_on)) >= 0.5
+
+
+def decode(audio_path: str | Path) -> list[tuple[str, np.ndarray]]:
+    """
+    Decode any container/codec ffmpeg understands to 16 kHz float32 tracks:
+    [("agent", ...), ("customer", ...)] for dual-channel recordings,
+    otherwise [("unknown", mono)].
+    """
+    from faster_whisper.audio import decode_audio
+
+    if not settings.whisper_split_channels:
+        return [("unknown", decode_audio(str(audio_path), sampling_rate=SAMPLE_RATE))]
+    # Mono sources come back with the same samples on both channels
+    left, right = decode_audio(str(audio_path), sampling_rate=SAMPLE_RATE, split_stereo=True)
+    if not _is_dual_channel(left, right):
+        return [("unknown", (left + right) / 2)]
+    if settings.whisper_agent_channel == "right":
+        left, right = right, left
+    return [("agent", left), ("customer", right)]
+
+
+def speech_chunks(samples: np.ndarray) -> list[tuple[int, int]]:
+    """Padded (start, end) sample ranges that contain speech."""
+    from faster_whisper.vad import VadOptions, get_speech_timestamps
+
+    options = VadOptions(
+        threshold=settings.whisper_vad_threshold,
+        min_silence_duration_ms=settings.whisper_vad_min_silence_ms,
+        speech_pad_ms=settings.whisper_vad_speech_pad_ms,
+    )
+    return [(ts["start"], ts["end"]) for ts in get_speech_timestamps(samples, options)]
+
+
+def trim_silence(samples: np.ndarray, speaker: str = "unknown") -> PreparedAudio:
+    """Keep only the speech regions of 16 kHz mono samples."""
+    chunks = speech_chunks(samples)
+    return PreparedAudio(
+        speaker=speaker,
+        samples=(
+            np.concatenate([samples[start:end] for start, end in chunks])
+            if chunks
+            else samples[:0]
+        ),
+        duration_ms=len(samples) * 1000 // SAMPLE_RATE,
+        speech_map=SpeechMap(chunks),
+    )
+
+
+def prepare_audio(audio_path: str | Path) -> list[PreparedAudio]:
+    """Decode a recording once into speaker tracks and, if enabled, trim them to speech."""
+    tracks = []
+    for speaker, samples in decode(audio_path):
+        if settings.whisper_vad_enabled:
+            tracks.append(trim_silence(samples, speaker))
+        else:
+            tracks.append(
+                PreparedAudio(
+                    speaker=speaker,
+                    samples=samples,
+                    duration_ms=len(samples) * 1000 // SAMPLE_RATE,
+                )
+            )
+    return tracks
+
+
+def speech_ratio(tracks: list[PreparedAudio]) -> float:
+    """Share of the recording in which any track has speech."""
+    duration_ms = max((t.duration_ms for t in tracks), default=0)
+    if not duration_ms:
+        return 0.0
+    if any(t.speech_map is None for t in tracks):
+        return 1.0
+    covered = 0
+    current_end = 0
+    for start, end in sorted(c for t in tracks for c in t.speech_map.chunks):
+        start = max(start, current_end)
+        if end > start:
+            covered += end - start
+            current_end = end
+    return round(min(covered * 1000 / SAMPLE_RATE / duration_ms, 1.0), 4)
+
+
+def _quietest(samples: np.ndarray, lo: int, hi: int) -> int:
+    """Middle of the lowest-energy 100 ms frame in samples[lo:hi]."""
+    frame = SAMPLE_RATE // 10
+    lo, hi = max(lo, 0), min(hi, len(samples))
+    n = (hi - lo) // frame
+    if n < 2:
+        return (lo + hi) // 2
+    frames = samples[lo:lo + n * frame].reshape(n, frame)
+    return lo + int(np.argmin(np.mean(frames * frames, axis=1))) * frame + frame // 2
+
+
+def split_track(track: PreparedAudio) -> list[PreparedAudio]:
+    """
+    Cut a long track into roughly WHISPER_CHUNK_SECONDS pieces at silences:
+    preferably where VAD removed non-speech, else at the quietest 100 ms near
+    the target. Chunks overlap by WHISPER_CHUNK_OVERLAP_SECONDS so words at a
+    cut are heard whole; `owned` says which chunk keeps them.
+    """
+    size = int(settings.whisper_chunk_seconds * SAMPLE_RATE)
+    total = len(track.samples)
+    if size <= 0 or total <= size * 3 // 2:
+        return [track]
+    gaps = track.speech_map.boundaries if track.speech_map is not None else []
+    cuts = [0]
+    while total - cuts[-1] > size * 3 // 2:
+        target = cuts[-1] + size
+        lo = bisect_left(gaps, cuts[-1] + size // 2)
+        hi = bisect_right(gaps, cuts[-1] + size * 3 // 2)
+        if lo < hi:
+            cuts.append(min(gaps[lo:hi], key=lambda g: abs(g - target)))
+        else:
+            window = min(5 * SAMPLE_RATE, size // 2)
+            cuts.append(_quietest(track.samples, target - window, target + window))
+    cuts.append(total)
+
+    overlap = int(settings.whisper_chunk_overlap_seconds * SAMPLE_RATE)
+    chunks = []
+    for start, end in zip(cuts, cuts[1:]):
+        lo, hi = max(start - overlap, 0), min(end + overlap, total)
+        chunks.append(
+            track.model_copy(
+                update={"samples": track.samples[lo:hi], "start_sample": lo, "owned": (start, end)}
+            )
+        )
+    return chunks
@@ -17,6 +17,9 @@ class Transcript(BaseModel):
 
     segments: list[TranscriptSegment]
     full_text: str = ""
+    # Set for whole recordings: original length and share of it that is speech
+    duration_ms: int | None = None
+    speech_ratio: float | None = None
 
     def __init__(self, **data):
         super().__init__(**data)
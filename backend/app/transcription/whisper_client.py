@@ -1,46 +1,245 @@
 """Whisper-based transcription service."""
 
 import asyncio
+import logging
+import multiprocessing
+import os
+import threading
+from types import SimpleNamespace
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 
 from app.config import settings
+from app.transcription.preprocess import (
+    SAMPLE_RATE,
+    PreparedAudio,
+    SpeechMap,
+    prepare_audio,
+    speech_ratio,
+    split_track,
+)
 from app.transcription.types import Transcript, TranscriptSegment
 
-# Lazy-load model to avoid startup cost
+logger = logging.getLogger(__name__)
+
+# Lazy-load model to avoid startup cost. In pool mode each worker process
+# holds its own copy, loaded by the pool initializer.
 _whisper_model = None
+_model_lock = threading.Lock()
+
+# Process pool of warm models (None = run in the loop's default thread executor)
+_executor: ProcessPoolExecutor | None = None
+
+
+def _cpu_threads() -> int:
+    """CTranslate2 threads per model; split cores evenly across pool processes."""
+    if settings.whisper_cpu_threads > 0:
+        return settings.whisper_cpu_threads
+    if settings.whisper_processes > 0:
+        return max(1, (os.cpu_count() or 1) // settings.whisper_processes)
+    return 0  # library default
 
 
 def _get_model():
     global _whisper_model
     if _whisper_model is None:
-        from faster_whisper import WhisperModel
-        _whisper_model = WhisperModel(
-            settings.whisper_model_size,
-            device="cpu",
-            compute_type="int8",
-        )
+        with _model_lock:
+            if _whisper_model is None:
+                from faster_whisper import WhisperModel
+                _whisper_model = WhisperModel(
+                    settings.whisper_model_size,
+                    device="cpu",
+                    compute_type="int8",
+                    cpu_threads=_cpu_threads(),
+                    num_workers=settings.whisper_num_workers,
+                )
     return _whisper_model
 
 
-def transcribe_file(audio_path: str | Path) -> Transcript:
-    """Transcribe an audio file synchronously."""
-    model = _get_model()
-    segments_iter, info = model.transcribe(str(audio_path), language=None)
+def _init_worker() -> None:
+    """Pool initializer - load the model once per worker process."""
+    _get_model()
+
+
+def _warm() -> int:
+    return os.getpid()
+
+
+def transcription_options() -> dict:
+    """Options passed to WhisperModel.transcribe (also part of the transcript cache key)."""
+    return {"language": None}
+
+
+def _to_ms(seconds: float | None, offset_ms: int, speech_map: SpeechMap | None, is_end: bool) -> int | None:
+    if seconds is None:
+        return None
+    ms = int(seconds * 1000)
+    if speech_map is not None:
+        ms = speech_map.to_original_ms(ms, is_end=is_end)
+    return ms + offset_ms
+
+
+def _to_transcript(
+    segments_iter,
+    offset_ms: int = 0,
+    speech_map: SpeechMap | None = None,
+    speaker: str = "unknown",
+) -> Transcript:
     segments = []
     for seg in segments_iter:
         segments.append(
             TranscriptSegment(
-                speaker="unknown",
+                speaker=speaker,
                 text=seg.text.strip(),
-                start_time_ms=int(seg.start * 1000) if seg.start else None,
-                end_time_ms=int(seg.end * 1000) if seg.end else None,
+                start_time_ms=_to_ms(seg.start, offset_ms, speech_map, is_end=False),
+                end_time_ms=_to_ms(seg.end, offset_ms, speech_map, is_end=True),
             )
         )
     full_text = " ".join(s.text for s in segments)
     return Transcript(segments=segments, full_text=full_text)
 
 
+def _on_track(segments_iter, chunk: PreparedAudio):
+    """Shift chunk-relative segment times onto the track; keep those the chunk owns."""
+    base = chunk.start_sample / SAMPLE_RATE
+    for seg in segments_iter:
+        start = seg.start + base if seg.start is not None else None
+        end = seg.end + base if seg.end is not None else None
+        if chunk.owned is not None and start is not None and end is not None:
+            middle = (start + end) / 2 * SAMPLE_RATE
+            if not chunk.owned[0] <= middle < chunk.owned[1]:
+                continue
+        yield SimpleNamespace(text=seg.text, start=start, end=end)
+
+
+def transcribe_track(track: PreparedAudio) -> Transcript:
+    """Transcribe a prepared track or chunk; timestamps refer to the original audio."""
+    if not len(track.samples):
+        return Transcript(segments=[])
+    model = _get_model()
+    segments_iter, info = model.transcribe(track.samples, **transcription_options())
+    return _to_transcript(
+        _on_track(segments_iter, track), speech_map=track.speech_map, speaker=track.speaker
+    )
+
+
+def _prepare(audio_path: str | Path) -> tuple[list[PreparedAudio], list[list[PreparedAudio]]]:
+    """Speaker tracks of a recording and the chunks each one is transcribed in."""
+    tracks = prepare_audio(audio_path)
+    return tracks, [split_track(t) for t in tracks]
+
+
+def _same_text(a: TranscriptSegment, b: TranscriptSegment) -> bool:
+    return a.text.strip().lower() == b.text.strip().lower()
+
+
+def _stitch(parts: list[Transcript]) -> list[TranscriptSegment]:
+    """Join a track's chunk transcripts, dropping a line repeated across a cut."""
+    segments: list[TranscriptSegment] = []
+    for part in parts:
+        for i, seg in enumerate(part.segments):
+            prev = segments[-1] if segments else None
+            if (
+                i == 0
+                and prev is not None
+                and prev.end_time_ms is not None
+                and seg.start_time_ms is not None
+                and seg.start_time_ms < prev.end_time_ms
+                and _same_text(prev, seg)
+            ):
+                continue
+            segments.append(seg)
+    return segments
+
+
+def _merge_tracks(tracks: list[PreparedAudio], per_track: list[list[TranscriptSegment]]) -> Transcript:
+    """Interleave per-track segments by start time (stable within a track)."""
+    segments = [s for track_segments in per_track for s in track_segments]
+    if len(per_track) > 1:
+        segments.sort(key=lambda s: s.start_time_ms or 0)
+    transcript = Transcript(segments=segments)
+    transcript.duration_ms = max((t.duration_ms for t in tracks), default=0)
+    transcript.speech_ratio = speech_ratio(tracks)
+    return transcript
+
+
+def transcribe_file(audio_path: str | Path) -> Transcript:
+    """
+    Transcribe an audio file synchronously. The file is decoded once, split
+    into agent/customer tracks when it is dual-channel, trimmed to speech and
+    cut into chunks (see preprocess); timestamps refer to the original recording.
+    """
+    tracks, chunked = _prepare(audio_path)
+    return _merge_tracks(
+        tracks, [_stitch([transcribe_track(c) for c in chunks]) for chunks in chunked]
+    )
+
+
+def transcribe_samples(samples, offset_ms: int = 0) -> Transcript:
+    """
+    Transcribe 16 kHz mono float32 samples (numpy array) synchronously.
+    Segment timestamps are shifted by offset_ms.
+    """
+    model = _get_model()
+    segments_iter, info = model.transcribe(samples, **transcription_options())
+    return _to_transcript(segments_iter, offset_ms)
+
+
+async def start_transcription_pool() -> None:
+    """Spawn WHISPER_PROCESSES workers and wait until each has loaded its model."""
+    global _executor
+    if settings.whisper_processes <= 0 or _executor is not None:
+        return
+    _executor = ProcessPoolExecutor(
+        max_workers=settings.whisper_processes,
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=_init_worker,
+    )
+    # Submitting one task per worker up front forces every process to spawn
+    loop = asyncio.get_running_loop()
+    pids = await asyncio.gather(
+        *(loop.run_in_executor(_executor, _warm) for _ in range(settings.whisper_processes))
+    )
+    logger.info(
+        "Whisper pool ready: %d processes, %d cpu_threads each",
+        len(set(pids)), _cpu_threads(),
+    )
+
+
+def shutdown_transcription_pool() -> None:
+    """Stop pool worker processes."""
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
+
+
 async def transcribe_file_async(audio_path: str | Path) -> Transcript:
-    """Transcribe an audio file asynchronously (runs in executor)."""
-    loop = asyncio.get_event_loop()
-    return await loop.run_in_executor(None, transcribe_file, audio_path)
+    """
+    Transcribe an audio file asynchronously. Decoding, VAD and chunking run in
+    a thread; every chunk of every track (agent and customer of a dual-channel
+    recording, long tracks in several pieces) is then transcribed concurrently
+    (process pool or default executor) and stitched back together.
+    """
+    # Preparing here rather than in a worker ships each chunk to the pool once
+    tracks, chunked = await asyncio.to_thread(_prepare, str(audio_path))
+    loop = asyncio.get_running_loop()
+    parts = await asyncio.gather(
+        *(
+            loop.run_in_executor(_executor, transcribe_track, chunk)
+            for chunks in chunked
+            for chunk in chunks
+        )
+    )
+    per_track = []
+    position = 0
+    for chunks in chunked:
+        per_track.append(_stitch(list(parts[position:position + len(chunks)])))
+        position += len(chunks)
+    return _merge_tracks(tracks, per_track)
+
+
+async def transcribe_samples_async(samples, offset_ms: int = 0) -> Transcript:
+    """Transcribe in-memory samples asynchronously (process pool or default executor)."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_executor, transcribe_samples, samples, offset_ms)
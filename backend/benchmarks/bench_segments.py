@@ -0,0 +1,70 @@
+"""Benchmark transcript segment persistence: per-object ORM adds vs bulk insert.
+
+Usage (from backend/):
+    python -m benchmarks.bench_segments
+    DATABASE_URL=postgresql+asyncpg://... python -m benchmarks.bench_segments --sizes 1000 10000
+
+Runs against DATABASE_URL (defaults to a throwaway SQLite file). Each size
+inserts into a fresh call inside a transaction that is rolled back.
+"""
+
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+
+if "DATABASE_URL" not in os.environ:
+    _tmp = os.path.join(tempfile.mkdtemp(), "bench.db")
+    os.environ["DATABASE_URL"] = f"sqlite+aiosqlite:///{_tmp}"
+
+from app.db.models import TranscriptSegment  # noqa: E402
+from app.db.repository import add_transcript_segments, create_call  # noqa: E402
+from app.db.session import async_session, engine, init_db  # noqa: E402
+
+
+def _segments(n: int) -> list[dict]:
+    return [
+        {
+            "speaker": "agent" if i % 2 else "customer",
+            "text": f"Segment {i}: thanks for calling, how can I help you with your account today?",
+            "start_time_ms": i * 3000,
+            "end_time_ms": i * 3000 + 2800,
+        }
+        for i in range(n)
+    ]
+
+
+async def _orm_per_object(db, call_id, segments: list[dict]) -> None:
+    """The previous implementation, kept here as the baseline."""
+    for seg in segments:
+        db.add(TranscriptSegment(call_id=call_id, **seg))
+    await db.flush()
+
+
+async def _time(fn, segments: list[dict]) -> float:
+    async with async_session() as db:
+        call = await create_call(db, source="upload", external_id="bench")
+        start = time.perf_counter()
+        await fn(db, call.id, segments)
+        elapsed = time.perf_counter() - start
+        await db.rollback()
+    return elapsed
+
+
+async def main(sizes: list[int]) -> None:
+    await init_db()
+    print(f"database: {engine.url.render_as_string(hide_password=True)}")
+    print(f"{'segments':>10} {'orm (s)':>10} {'bulk (s)':>10} {'speedup':>8}")
+    for n in sizes:
+        segments = _segments(n)
+        orm = await _time(_orm_per_object, segments)
+        bulk = await _time(add_transcript_segments, segments)
+        print(f"{n:>10} {orm:>10.3f} {bulk:>10.3f} {orm / bulk:>7.1f}x")
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000, 10_000, 100_000])
+    asyncio.run(main(parser.parse_args().sizes))
@@ -0,0 +1,43 @@
+"""Shared test fixtures."""
+
+import asyncio
+
+import pytest
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from app.db.models import Base
+from app.db.search import ensure_search_index
+
+
+def _runner(tmp_path, search: bool):
+    def run(scenario):
+        async def main():
+            engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'test.db'}")
+            async with engine.begin() as conn:
+                await conn.run_sync(Base.metadata.create_all)
+                if search:
+                    await ensure_search_index(conn)
+            try:
+                async with async_sessionmaker(engine, expire_on_commit=False)() as db:
+                    return await scenario(db)
+            finally:
+                await engine.dispose()
+
+        return asyncio.run(main())
+
+    return run
+
+
+@pytest.fixture
+def run_db(tmp_path):
+    """
+    Run `scenario(db)` against a fresh SQLite database with all tables and
+    return its result. Each call gets its own event loop and engine.
+    """
+    return _runner(tmp_path, search=False)
+
+
+@pytest.fixture
+def run_search_db(tmp_path):
+    """Like run_db, with the full-text search index (see app.db.search)."""
+    return _runner(tmp_path, search=True)
@@ -0,0 +1,113 @@
+"""Batch ingest resume decisions for files whose hash is already stored."""
+
+import asyncio
+import hashlib
+from uuid import uuid4
+
+import pytest
+
+from app.db.models import Call, CallAnalysis
+from app.db.repository import add_transcript_segments, get_call_metadata, get_upload_hashes
+from app.ingest import batch
+from app.ingest.batch import BatchItem, BatchPipeline
+from app.ingest.upload import SavedUpload, upload_metadata
+from app.transcription.types import Transcript, TranscriptSegment
+
+AUDIO = b"RIFF fake audio"
+SHA = hashlib.sha256(AUDIO).hexdigest()
+
+
+def _read(tmp_path, existing):
+    path = tmp_path / "call.wav"
+    path.write_bytes(AUDIO)
+    pipeline = BatchPipeline(transcribe_workers=1, db_workers=1, analysis_workers=1, queue_size=1)
+
+    async def stored(sha256):
+        return existing.get(sha256)
+
+    pipeline._stored = stored
+    item = BatchItem(path=path, external_id="call.wav")
+    return pipeline, item, asyncio.run(pipeline._read(item))
+
+
+def test_new_file_is_transcribed(tmp_path):
+    pipeline, item, stage = _read(tmp_path, {})
+
+    assert stage == "transcribe"
+    assert item.call_id is None
+    # A second copy in the same run is a duplicate
+    assert asyncio.run(pipeline._read(item)) is None
+    assert pipeline.stats.skipped == 1
+
+
+@pytest.mark.parametrize(
+    ("status", "has_segments", "analyzed", "stage", "resumes"),
+    [
+        ("completed", True, True, None, False),
+        ("transcribing", False, False, None, False),
+        ("live", True, False, None, False),
+        ("analyzing", True, False, "analyze", True),
+        ("failed", True, False, "analyze", True),
+        ("failed", False, False, "transcribe", True),
+    ],
+)
+def test_stored_call_resumes_where_it_stopped(tmp_path, status, has_segments, analyzed, stage, resumes):
+    call_id = uuid4()
+    pipeline, item, next_stage = _read(tmp_path, {SHA: (call_id, status, has_segments, analyzed)})
+
+    assert next_stage == stage
+    assert item.call_id == (call_id if resumes else None)
+    assert pipeline.stats.skipped == (0 if resumes else 1)
+
+
+def test_upload_hashes_are_looked_up_by_hash(run_db):
+    async def scenario(db):
+        calls = {}
+        for name, sha, source in [
+            ("bare", "a", "upload"),
+            ("analyzed", "a", "upload"),
+            ("other", "b", "upload"),
+            ("twilio", "c", "twilio"),
+        ]:
+            call = Call(source=source, status="completed", metadata_={"sha256": sha})
+            db.add(call)
+            await db.flush()
+            calls[name] = call.id
+        await add_transcript_segments(db, calls["analyzed"], [{"text": "hello"}])
+        db.add(CallAnalysis(call_id=calls["analyzed"], analysis_type="post_call", payload={}))
+        await db.commit()
+        return calls, await get_upload_hashes(db, ["a", "c", "missing"]), await get_upload_hashes(db, [])
+
+    calls, found, empty = run_db(scenario)
+
+    # The most complete call wins; other sources and other hashes are ignored
+    assert found == {"a": (calls["analyzed"], "completed", True, True)}
+    assert empty == {}
+
+
+def test_resumed_call_keeps_its_upload_metadata(run_db, monkeypatch):
+    async def scenario(db):
+        monkeypatch.setattr(batch, "run_write", lambda fn: fn(db))
+        # What the upload route stored before transcription failed
+        saved = SavedUpload(path="call.wav", size=len(AUDIO), sha256=SHA)
+        call = Call(source="upload", status="failed", external_id="call.wav", metadata_=upload_metadata(saved))
+        db.add(call)
+        await db.flush()
+        pipeline = BatchPipeline(transcribe_workers=1, db_workers=1, analysis_workers=1, queue_size=1)
+        item = BatchItem(
+            path="call.wav",
+            external_id="call.wav",
+            sha256=SHA,
+            size=len(AUDIO),
+            call_id=call.id,
+            transcript=Transcript(segments=[TranscriptSegment(text="hello")], speech_ratio=0.5),
+        )
+        stage = await pipeline._store(item)
+        await db.commit()
+        return stage, await get_call_metadata(db, call.id)
+
+    stage, metadata = run_db(scenario)
+
+    assert stage == "analyze"
+    assert (metadata["sha256"], metadata["size_bytes"]) == (SHA, len(AUDIO))
+    assert (metadata["batch"], metadata["speech_ratio"]) == (True, 0.5)
@@ -0,0 +1,68 @@
+"""Call detail ETags and cache invalidation."""
+
+from collections import OrderedDict
+
+from app.api.routes.calls import _etag, _etag_matches
+from app.db.cache import call_detail_cache
+from app.db.models import Call
+from app.db.repository import add_transcript_segments, create_analysis, get_call_version, update_call
+
+
+def test_etag_matching():
+    etag = _etag("full", ["call", 1])
+
+    assert _etag_matches(etag, etag)
+    assert _etag_matches(f'"other", W/{etag}', etag)
+    assert _etag_matches("*", etag)
+    assert not _etag_matches('"other"', etag)
+    assert not _etag_matches(None, etag)
+    assert _etag("full", ["call", 1]) != _etag("no_segments", ["call", 1])
+
+
+def test_new_segments_and_analyses_change_the_etag(run_db):
+    async def scenario(db):
+        call = Call(source="upload")
+        db.add(call)
+        await db.commit()
+        etags = [_etag("full", await get_call_version(db, call.id))]
+        await add_transcript_segments(db, call.id, [{"text": "hello"}])
+        await db.commit()
+        etags.append(_etag("full", await get_call_version(db, call.id)))
+        await create_analysis(db, call.id, "post_call", {"summary": "Greeting."})
+        await db.commit()
+        etags.append(_etag("full", await get_call_version(db, call.id)))
+        etags.append(_etag("full", await get_call_version(db, call.id)))
+        return etags
+
+    etags = run_db(scenario)
+
+    assert len(set(etags[:3])) == 3
+    assert etags[3] == etags[2]
+
+
+def test_commit_invalidates_and_rollback_does_not(run_db, monkeypatch):
+    monkeypatch.setattr(call_detail_cache, "max_bytes", 1024 * 1024)
+    monkeypatch.setattr(call_detail_cache, "_entries", OrderedDict())
+    monkeypatch.setattr(call_detail_cache, "_size", 0)
+
+    async def scenario(db):
+        call = Call(source="upload")
+        db.add(call)
+        await db.commit()
+        call_id = call.id
+        results = []
+        for finish in (db.rollback, db.commit):
+            call_detail_cache.put(call_id, "full", '"old"', b"{}")
+            await update_call(db, call_id, status="completed")
+            # Dropped at once; a reader may re-cache before the write finishes
+            results.append(call_detail_cache.get(call_id, "full"))
+            call_detail_cache.put(call_id, "full", '"reread"', b"{}")
+            await finish()
+            results.append(call_detail_cache.get(call_id, "full"))
+        return results
+
+    after_write, after_rollback, _, after_commit = run_db(scenario)
+
+    assert after_write is None
+    assert after_rollback == ('"reread"', b"{}")
+    assert after_commit is None
@@ -0,0 +1,65 @@
+"""Dual-channel detection and merging of per-speaker tracks."""
+
+import numpy as np
+
+from app.transcription.preprocess import SAMPLE_RATE, PreparedAudio, SpeechMap, _is_dual_channel
+from app.transcription.types import TranscriptSegment
+from app.transcription.whisper_client import _merge_tracks
+
+S = SAMPLE_RATE  # samples per second
+
+
+def _voice(seconds: float, seed: int) -> np.ndarray:
+    return np.random.default_rng(seed).normal(0, 0.2, int(seconds * S)).astype(np.float32)
+
+
+def test_identical_or_gain_skewed_channels_are_mono():
+    signal = _voice(4, seed=1)
+
+    assert not _is_dual_channel(signal, signal.copy())
+    assert not _is_dual_channel(signal, 0.3 * signal)
+
+
+def test_silent_or_too_short_channels_are_mono():
+    signal = _voice(4, seed=1)
+
+    assert not _is_dual_channel(signal, np.zeros_like(signal))
+    assert not _is_dual_channel(signal[:S // 10], signal[:S // 10])
+
+
+def test_speakers_taking_turns_are_dual_channel():
+    silence = np.zeros(S, dtype=np.float32)
+    left = np.concatenate([_voice(1, 1), silence, _voice(1, 2), silence])
+    right = np.concatenate([silence, _voice(1, 3), silence, _voice(1, 4)])
+
+    assert _is_dual_channel(left, right)
+
+
+def test_uncorrelated_speakers_talking_over_each_other_are_mono():
+    # Two independent signals, but both active all the time: not turn-taking
+    assert not _is_dual_channel(_voice(4, seed=1), _voice(4, seed=2))
+
+
+def test_merge_tracks_interleaves_by_start_time_with_speakers():
+    tracks = [
+        PreparedAudio(speaker="agent", samples=np.zeros(0), duration_ms=9000, speech_map=SpeechMap([(0, 2 * S)])),
+        PreparedAudio(speaker="customer", samples=np.zeros(0), duration_ms=10000, speech_map=SpeechMap([(3 * S, 5 * S)])),
+    ]
+    agent = [
+        TranscriptSegment(speaker="agent", text="Hello, how can I help?", start_time_ms=0, end_time_ms=2000),
+        TranscriptSegment(speaker="agent", text="Done.", start_time_ms=6000, end_time_ms=7000),
+    ]
+    customer = [
+        TranscriptSegment(speaker="customer", text="My router is broken.", start_time_ms=3000, end_time_ms=5000),
+    ]
+
+    transcript = _merge_tracks(tracks, [agent, customer])
+
+    assert [(s.speaker, s.text) for s in transcript.segments] == [
+        ("agent", "Hello, how can I help?"),
+        ("customer", "My router is broken."),
+        ("agent", "Done."),
+    ]
+    assert transcript.full_text == "Hello, how can I help? My router is broken. Done."
+    assert transcript.duration_ms == 10000
+    assert transcript.speech_ratio == 0.4
@@ -0,0 +1,84 @@
+"""Chunked transcription: cut selection, segment ownership and stitching."""
+
+from types import SimpleNamespace
+
+import numpy as np
+
+from app.config import settings
+from app.transcription.preprocess import SAMPLE_RATE, PreparedAudio, SpeechMap, split_track
+from app.transcription.types import Transcript, TranscriptSegment
+from app.transcription.whisper_client import _on_track, _stitch
+
+S = SAMPLE_RATE  # samples per second
+
+
+def _chunking(monkeypatch, seconds=10.0, overlap=1.0):
+    monkeypatch.setattr(settings, "whisper_chunk_seconds", seconds)
+    monkeypatch.setattr(settings, "whisper_chunk_overlap_seconds", overlap)
+
+
+def test_cuts_at_gaps_removed_by_vad(monkeypatch):
+    _chunking(monkeypatch)
+    # 9 s + 8 s + 8 s of speech kept; trimmed audio has gaps at 9 s and 17 s
+    speech_map = SpeechMap([(0, 9 * S), (12 * S, 20 * S), (22 * S, 30 * S)])
+    track = PreparedAudio(samples=np.ones(25 * S, dtype=np.float32), duration_ms=30000, speech_map=speech_map)
+
+    chunks = split_track(track)
+
+    assert [c.owned for c in chunks] == [(0, 9 * S), (9 * S, 17 * S), (17 * S, 25 * S)]
+    assert [c.start_sample for c in chunks] == [0, 8 * S, 16 * S]
+    assert [len(c.samples) for c in chunks] == [10 * S, 10 * S, 9 * S]
+    assert all(c.speech_map is speech_map for c in chunks)
+
+
+def test_falls_back_to_the_quietest_frame(monkeypatch):
+    _chunking(monkeypatch)
+    samples = np.random.default_rng(0).uniform(0.5, 1.0, 20 * S).astype(np.float32)
+    samples[11 * S:11 * S + S // 10] = 0.0  # one silent 100 ms frame at 11 s
+    track = PreparedAudio(samples=samples, duration_ms=20000)
+
+    chunks = split_track(track)
+
+    cut = 11 * S + S // 20  # middle of the silent frame
+    assert [c.owned for c in chunks] == [(0, cut), (cut, 20 * S)]
+    assert chunks[1].start_sample == cut - S
+
+
+def test_short_tracks_are_not_split(monkeypatch):
+    _chunking(monkeypatch)
+    track = PreparedAudio(samples=np.ones(15 * S, dtype=np.float32), duration_ms=15000)
+
+    assert split_track(track) == [track]
+
+
+def test_a_segment_straddling_a_cut_is_kept_once():
+    first = PreparedAudio(samples=np.zeros(11 * S), duration_ms=20000, start_sample=0, owned=(0, 10 * S))
+    second = PreparedAudio(samples=np.zeros(11 * S), duration_ms=20000, start_sample=9 * S, owned=(10 * S, 20 * S))
+    straddling = SimpleNamespace(text="Thanks for calling.", start=9.5, end=10.8)
+
+    kept_by_first = list(_on_track([SimpleNamespace(text="Hi.", start=1.0, end=2.0), straddling], first))
+    kept_by_second = list(_on_track([SimpleNamespace(text="Thanks for calling.", start=0.5, end=1.8)], second))
+
+    assert [s.text for s in kept_by_first] == ["Hi."]
+    assert [(s.text, s.start, s.end) for s in kept_by_second] == [("Thanks for calling.", 9.5, 10.8)]
+
+
+def test_stitch_drops_a_line_repeated_across_a_cut():
+    def segment(text, start, end):
+        return TranscriptSegment(text=text, start_time_ms=start, end_time_ms=end)
+
+    parts = [
+        Transcript(segments=[segment("Hi.", 1000, 2000), segment("Thanks for calling.", 9500, 10800)]),
+        Transcript(segments=[segment("thanks for calling. ", 9600, 10800), segment("Bye.", 12000, 13000)]),
+        # Same text but after the previous line ended: a genuine repeat
+        Transcript(segments=[segment("Bye.", 14000, 15000)]),
+    ]
+
+    stitched = _stitch(parts)
+
+    assert [(s.text, s.start_time_ms) for s in stitched] == [
+        ("Hi.", 1000),
+        ("Thanks for calling.", 9500),
+        ("Bye.", 12000),
+        ("Bye.", 14000),
+    ]
@@ -0,0 +1,135 @@
+"""VectorIndex storage and search against a temporary directory."""
+
+import asyncio
+from uuid import uuid4
+
+import numpy as np
+
+from app.analysis import embeddings
+from app.analysis.embeddings import VectorIndex, call_document, embed_call, embed_text
+
+DIMS = 8
+
+
+def _unit(i: int) -> np.ndarray:
+    v = np.zeros(DIMS, dtype=np.float32)
+    v[i] = 1.0
+    return v
+
+
+def test_add_and_search(tmp_path):
+    index = VectorIndex(tmp_path, DIMS)
+    ids = [uuid4() for _ in range(3)]
+    for i, call_id in enumerate(ids):
+        index.add(call_id, _unit(i))
+
+    assert len(index) == 3
+    assert index.search(_unit(1), k=1) == [(ids[1], 1.0)]
+    assert {c for c, _ in index.search(_unit(1), k=3, exclude=ids[1])} == {ids[0], ids[2]}
+
+
+def test_re_embedding_overwrites_in_place(tmp_path):
+    index = VectorIndex(tmp_path, DIMS)
+    call_id = uuid4()
+    index.add(call_id, _unit(0))
+    index.add(call_id, _unit(5))
+
+    assert (tmp_path / "ids.bin").stat().st_size == 16
+    assert (tmp_path / "vectors.f32").stat().st_size == 4 * DIMS
+    np.testing.assert_array_equal(index.vector(call_id), _unit(5))
+
+
+def test_other_process_writes_are_picked_up(tmp_path):
+    reader = VectorIndex(tmp_path, DIMS)
+    assert len(reader) == 0
+    writer = VectorIndex(tmp_path, DIMS)
+    call_id = uuid4()
+    writer.add(call_id, _unit(2))
+
+    assert reader.search(_unit(2), k=1) == [(call_id, 1.0)]
+
+
+def test_torn_append_is_ignored_and_repaired(tmp_path):
+    index = VectorIndex(tmp_path, DIMS)
+    first = uuid4()
+    index.add(first, _unit(0))
+    # A crash between the vector and the id write leaves an id-less vector
+    with open(tmp_path / "vectors.f32", "ab") as f:
+        f.write(_unit(7).tobytes())
+
+    fresh = VectorIndex(tmp_path, DIMS)
+    assert len(fresh) == 1
+    second = uuid4()
+    fresh.add(second, _unit(3))
+
+    assert (tmp_path / "vectors.f32").stat().st_size == 2 * 4 * DIMS
+    np.testing.assert_array_equal(fresh.vector(second), _unit(3))
+    np.testing.assert_array_equal(fresh.vector(first), _unit(0))
+
+
+def test_search_skips_superseded_rows_from_old_files(tmp_path):
+    index = VectorIndex(tmp_path, DIMS)
+    stale, live = uuid4(), uuid4()
+    # Older versions appended a new row on re-embedding
+    with open(tmp_path / "vectors.f32", "wb") as f:
+        f.write(_unit(0).tobytes() + _unit(0).tobytes() + (_unit(0) * 0.5).tobytes())
+    with open(tmp_path / "ids.bin", "wb") as f:
+        f.write(stale.bytes + live.bytes + stale.bytes)
+
+    assert index.search(_unit(0), k=2) == [(live, 1.0), (stale, 0.5)]
+
+
+def test_rebuild_replaces_index_and_keeps_concurrent_appends(tmp_path):
+    index = VectorIndex(tmp_path, DIMS)
+    old, rebuilt, concurrent = uuid4(), uuid4(), uuid4()
+    index.add(old, _unit(0))
+
+    rebuild = index.start_rebuild()
+    rebuild.add(rebuilt, _unit(1))
+    VectorIndex(tmp_path, DIMS).add(concurrent, _unit(2))
+    rebuild.commit()
+
+    assert index.vector(old) is None
+    np.testing.assert_array_equal(index.vector(rebuilt), _unit(1))
+    np.testing.assert_array_equal(index.vector(concurrent), _unit(2))
+    assert not list(tmp_path.glob("*.rebuild"))
+
+
+def test_re_embedding_during_rebuild_is_carried_over(tmp_path):
+    index = VectorIndex(tmp_path, DIMS)
+    call_id = uuid4()
+    index.add(call_id, _unit(0))
+
+    rebuild = index.start_rebuild()
+    rebuild.add(call_id, _unit(0))
+    index.add(call_id, _unit(4))  # appended, not overwritten, while rebuilding
+    rebuild.commit()
+
+    np.testing.assert_array_equal(index.vector(call_id), _unit(4))
+
+
+def test_embed_text_is_normalized():
+    vector = embed_text("refund for my billing issue", 64)
+    assert abs(float(np.linalg.norm(vector)) - 1.0) < 1e-5
+
+
+def test_call_document_skips_non_string_topics():
+    document = call_document("hello there", {"summary": None, "key_topics": ["billing", 7, None, {"a": 1}, " "]})
+
+    assert "billing" in document
+    assert "7" in document
+    assert "hello there" in document
+
+
+def test_embed_call_never_raises(tmp_path, monkeypatch):
+    index = VectorIndex(tmp_path, DIMS)
+    monkeypatch.setattr(embeddings, "vector_index", index)
+    monkeypatch.setattr(embeddings.settings, "embeddings_enabled", True)
+    stored, failing = uuid4(), uuid4()
+
+    asyncio.run(embed_call(stored, "refund request", {"key_topics": [3, None, "refund"]}))
+    monkeypatch.setattr(index, "add", lambda *_: 1 / 0)
+    asyncio.run(embed_call(failing, "refund request"))
+
+    assert index.vector(stored) is not None
+    assert index.vector(failing) is None
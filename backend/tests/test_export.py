@@ -0,0 +1,90 @@
+"""Parquet export: UTC handling, watermarks, day partitions and --full."""
+
+from datetime import datetime, timedelta, timezone
+
+import pyarrow.parquet as pq
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from app.db import session
+from app.db.export import export_parquet
+from app.db.models import Call, CallAnalysis, TranscriptSegment, as_utc
+
+DAY = datetime(2024, 5, 1, 9, 0)
+
+
+def test_as_utc_normalizes_naive_and_aware_datetimes():
+    naive = datetime(2024, 5, 1, 23, 30)
+    # 01:30 on May 2nd in UTC+2 is still May 1st in UTC
+    aware = datetime(2024, 5, 2, 1, 30, tzinfo=timezone(timedelta(hours=2)))
+
+    assert as_utc(naive) == naive.replace(tzinfo=timezone.utc)
+    assert as_utc(aware).tzinfo is timezone.utc
+    assert as_utc(aware).date() == naive.date()
+    assert as_utc(None) is None
+
+
+def _files(root) -> dict[str, tuple[int, int]]:
+    """partition -> (files, rows)"""
+    partitions = {}
+    for path in root.glob("*/day=*/*.parquet"):
+        files, rows = partitions.get(path.parent.relative_to(root).as_posix(), (0, 0))
+        partitions[path.parent.relative_to(root).as_posix()] = (files + 1, rows + pq.read_table(path).num_rows)
+    return partitions
+
+
+def test_incremental_runs_and_full_replace(run_db, monkeypatch, tmp_path):
+    out = tmp_path / "warehouse"
+
+    async def export(**kwargs):
+        return await export_parquet(out, lag_seconds=0, batch_size=2, **kwargs)
+
+    async def scenario(db):
+        monkeypatch.setattr(session, "engine", db.bind)
+        monkeypatch.setattr(session, "async_session", async_sessionmaker(db.bind, expire_on_commit=False))
+        call = Call(source="upload", started_at=DAY)
+        db.add(call)
+        await db.flush()
+        for i, days in enumerate((0, 0, 1)):
+            db.add(TranscriptSegment(
+                call_id=call.id, speaker="agent", text=f"line {i}", created_at=DAY + timedelta(days=days, minutes=i),
+            ))
+        db.add(CallAnalysis(
+            call_id=call.id, analysis_type="post_call", payload={"key_topics": ["billing"]}, created_at=DAY,
+        ))
+        await db.commit()
+
+        runs = {"first": await export()}
+        runs["files_after_first"] = _files(out)
+        runs["second"] = await export()
+        runs["files_after_second"] = _files(out)
+
+        for run in ("third", "fourth"):
+            late = TranscriptSegment(call_id=call.id, speaker="customer", text=run)
+            db.add(late)
+            await db.commit()
+            runs[run] = await export()
+        runs["late_day"] = late.created_at.date().isoformat()
+        runs["files_after_fourth"] = _files(out)
+
+        runs["full"] = await export(full=True)
+        runs["files_after_full"] = _files(out)
+        return runs
+
+    runs = run_db(scenario)
+
+    assert runs["first"] == {"segments": 3, "analyses": 1}
+    assert runs["files_after_first"] == {
+        "analyses/day=2024-05-01": (1, 1),
+        "segments/day=2024-05-01": (1, 2),
+        "segments/day=2024-05-02": (1, 1),
+    }
+    # Nothing new since the watermark: no rows and no new files
+    assert runs["second"] == {"segments": 0, "analyses": 0}
+    assert runs["files_after_second"] == runs["files_after_first"]
+    # Runs in the same second append their own file to the same partition
+    late = f"segments/day={runs['late_day']}"
+    assert runs["third"] == runs["fourth"] == {"segments": 1, "analyses": 0}
+    assert runs["files_after_fourth"] == {**runs["files_after_first"], late: (2, 2)}
+    # --full replaces the earlier files instead of adding to them
+    assert runs["full"] == {"segments": 5, "analyses": 1}
+    assert runs["files_after_full"] == {**runs["files_after_first"], late: (1, 2)}
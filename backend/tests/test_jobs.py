@@ -0,0 +1,90 @@
+"""Background upload jobs: backpressure, status transitions and history."""
+
+import asyncio
+from datetime import datetime
+from uuid import uuid4
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.api.routes import upload
+from app.config import settings
+from app.ingest import jobs
+from app.ingest.jobs import Job, JobQueue
+from app.ingest.upload import SavedUpload
+
+
+def _saved(path) -> SavedUpload:
+    path.write_bytes(b"audio")
+    return SavedUpload(path=path, size=5, sha256="0" * 64)
+
+
+def test_full_queue_returns_429_with_retry_after(monkeypatch):
+    queue = JobQueue(maxsize=1, workers=0, history_size=10)
+    queue._queue = asyncio.Queue(maxsize=1)
+    queue._queue.put_nowait(None)
+    monkeypatch.setattr(upload, "job_queue", queue)
+    monkeypatch.setattr(settings, "upload_retry_after_seconds", 7)
+    app = FastAPI()
+    app.include_router(upload.router, prefix="/upload")
+
+    response = TestClient(app).post(
+        "/upload", params={"background": True}, files={"file": ("call.wav", b"audio")}
+    )
+
+    assert response.status_code == 429
+    assert response.headers["Retry-After"] == "7"
+
+
+def test_jobs_move_from_queued_to_processing_to_completed_or_failed(monkeypatch, tmp_path):
+    call_ids = {}
+    seen = {}
+
+    async def create_upload_call(filename, metadata):
+        call_ids[filename] = uuid4()
+        return call_ids[filename]
+
+    async def process_audio_file(call_id, path, metadata):
+        seen[path.name] = queue.get(submitted[path.name].id).status
+        if path.name == "bad.wav":
+            raise RuntimeError("Whisper failed")
+
+    monkeypatch.setattr(jobs, "create_upload_call", create_upload_call)
+    monkeypatch.setattr(jobs, "process_audio_file", process_audio_file)
+    queue = JobQueue(maxsize=4, workers=1, history_size=10)
+    submitted = {}
+
+    async def main():
+        await queue.start()
+        try:
+            for name in ("ok.wav", "bad.wav"):
+                submitted[name] = queue.submit(_saved(tmp_path / name), name)
+            statuses = [j.status for j in submitted.values()]
+            await queue._queue.join()
+            return statuses
+        finally:
+            await queue.stop()
+
+    assert asyncio.run(main()) == ["queued", "queued"]
+    ok, bad = submitted["ok.wav"], submitted["bad.wav"]
+    assert seen == {"ok.wav": "processing", "bad.wav": "processing"}
+    assert (ok.status, ok.call_id, ok.error) == ("completed", call_ids["ok.wav"], None)
+    assert (bad.status, bad.call_id, bad.error) == ("failed", call_ids["bad.wav"], "Whisper failed")
+    assert all(j.started_at <= j.finished_at for j in (ok, bad))
+
+
+def test_history_evicts_oldest_finished_jobs_only():
+    queue = JobQueue(maxsize=4, workers=0, history_size=2)
+    jobs_by_name = {}
+    for name, status in [("a", "completed"), ("b", "failed"), ("c", "queued"), ("d", "completed")]:
+        jobs_by_name[name] = Job(id=uuid4(), status=status, created_at=datetime.utcnow())
+        queue._remember(jobs_by_name[name])
+
+    assert [j for j in jobs_by_name if queue.get(jobs_by_name[j].id)] == ["c", "d"]
+
+    # Pending jobs are never dropped, even past the limit
+    for name in ("e", "f"):
+        jobs_by_name[name] = Job(id=uuid4(), created_at=datetime.utcnow())
+        queue._remember(jobs_by_name[name])
+
+    assert [j for j in jobs_by_name if queue.get(jobs_by_name[j].id)] == ["c", "e", "f"]
@@ -0,0 +1,69 @@
+"""VAD segmentation of live streams."""
+
+import numpy as np
+
+from app.ingest.live import StreamSegmenter
+
+MS = 16  # samples per millisecond at 16 kHz
+
+
+def _segmenter() -> StreamSegmenter:
+    # 30 ms frames, 200 ms pre-roll
+    return StreamSegmenter(threshold=0.1, min_silence_ms=300, max_window_s=2.0)
+
+
+def _silence(ms: int) -> np.ndarray:
+    return np.zeros(ms * MS, dtype=np.float32)
+
+
+def _speech(ms: int) -> np.ndarray:
+    return np.full(ms * MS, 0.5, dtype=np.float32)
+
+
+def test_window_is_cut_after_trailing_silence():
+    stream = np.concatenate([_silence(960), _speech(960), _silence(600)])
+    segmenter = _segmenter()
+
+    windows = segmenter.feed(stream)
+
+    assert len(windows) == 1
+    window, offset_ms = windows[0]
+    # Leading silence is dropped except for the pre-roll
+    assert offset_ms == 960 - 200
+    assert len(window) == (200 + 960 + 300) * MS
+    assert segmenter.flush() is None
+
+
+def test_small_packets_cut_the_same_windows():
+    stream = np.concatenate([_silence(960), _speech(960), _silence(600)])
+    segmenter = _segmenter()
+
+    windows = [w for i in range(0, len(stream), 100) for w in segmenter.feed(stream[i:i + 100])]
+
+    assert [(len(w), offset) for w, offset in windows] == [((200 + 960 + 300) * MS, 760)]
+
+
+def test_continuous_speech_is_cut_at_the_max_window():
+    segmenter = _segmenter()
+
+    windows = segmenter.feed(_speech(5000))
+    tail = segmenter.flush()
+
+    # 2 s rounded up to whole 30 ms frames
+    frames = 2000 // 30 + 1
+    assert [(len(w), offset) for w, offset in windows] == [
+        (frames * 30 * MS, 0),
+        (frames * 30 * MS, frames * 30),
+    ]
+    assert tail is not None
+    assert (len(tail[0]), tail[1]) == ((5000 - 2 * frames * 30) * MS, 2 * frames * 30)
+
+
+def test_speech_still_buffered_is_flushed_on_close():
+    segmenter = _segmenter()
+
+    assert segmenter.feed(_speech(500)) == []
+    window, offset_ms = segmenter.flush()
+
+    assert (len(window), offset_ms) == (500 * MS, 0)
+    assert segmenter.flush() is None
@@ -0,0 +1,88 @@
+"""LLM analysis cache: memory LRU and TTL in front of the llm_cache table."""
+
+import asyncio
+from datetime import datetime, timedelta
+
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from app.analysis import llm_client
+from app.analysis.llm_client import AnalysisCache
+
+NOW = datetime(2024, 5, 1, 9, 0)
+
+
+def test_memory_lru_db_fallback_and_expiry(run_db, monkeypatch):
+    clock = {"monotonic": 1000.0, "utcnow": NOW}
+
+    class FrozenDatetime(datetime):
+        @classmethod
+        def utcnow(cls):
+            return clock["utcnow"]
+
+    def advance(seconds: float) -> None:
+        clock["monotonic"] += seconds
+        clock["utcnow"] += timedelta(seconds=seconds)
+
+    monkeypatch.setattr(llm_client.time, "monotonic", lambda: clock["monotonic"])
+    monkeypatch.setattr(llm_client, "datetime", FrozenDatetime)
+
+    async def scenario(db):
+        sessions = async_sessionmaker(db.bind, expire_on_commit=False)
+
+        async def run_write(fn):
+            async with sessions() as write_db:
+                result = await fn(write_db)
+                await write_db.commit()
+            return result
+
+        monkeypatch.setattr(llm_client, "async_session", sessions)
+        monkeypatch.setattr(llm_client, "run_write", run_write)
+
+        cache = AnalysisCache(max_memory_entries=2, ttl_seconds=60)
+        for key in ("a", "b", "c"):
+            await cache.set(key, {"summary": key}, provider="openai", model="test")
+        memory_after_set = list(cache._memory)
+
+        results = {
+            "b": await cache.get("b"),  # memory
+            "a": await cache.get("a"),  # evicted from memory, read back from the table
+        }
+        memory_after_get = list(cache._memory)
+        stats = cache.stats()
+
+        # A new process starts with an empty memory level
+        fresh = AnalysisCache(max_memory_entries=2, ttl_seconds=60)
+        results["fresh_c"] = await fresh.get("c")
+
+        advance(59)
+        results["before_expiry"] = await fresh.get("c")
+        advance(2)
+        results["expired_memory"] = await cache.get("b")
+        results["expired_db"] = await AnalysisCache(max_memory_entries=2, ttl_seconds=60).get("c")
+        return memory_after_set, memory_after_get, stats, fresh.stats(), results
+
+    memory_after_set, memory_after_get, stats, fresh_stats, results = run_db(scenario)
+
+    assert memory_after_set == ["b", "c"]
+    assert memory_after_get == ["b", "a"]
+    assert results["b"] == {"summary": "b"}
+    assert results["a"] == {"summary": "a"}
+    assert (stats["memory_hits"], stats["db_hits"], stats["misses"]) == (1, 1, 0)
+    assert results["fresh_c"] == results["before_expiry"] == {"summary": "c"}
+    assert (fresh_stats["memory_hits"], fresh_stats["db_hits"]) == (1, 1)
+    assert results["expired_memory"] is None
+    assert results["expired_db"] is None
+
+
+def test_cached_payloads_are_copies():
+    cache = AnalysisCache(max_memory_entries=2, ttl_seconds=60)
+    payload = {"key_topics": ["billing"]}
+    cache._remember("k", payload)
+    payload["key_topics"].append("mutated")
+
+    async def main():
+        first = await cache.get("k")
+        first["key_topics"].append("mutated")
+        return await cache.get("k")
+
+    assert asyncio.run(main()) == {"key_topics": ["billing"]}
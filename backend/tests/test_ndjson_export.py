@@ -0,0 +1,49 @@
+"""NDJSON export of calls: batched streaming and resuming from after_id."""
+
+import json
+from datetime import datetime, timedelta
+
+import httpx
+from fastapi import FastAPI
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from app.api.routes import export
+from app.config import settings
+from app.db.models import Call
+from app.db.repository import add_transcript_segments
+
+START = datetime(2024, 5, 1, 9, 0)
+
+
+def test_stream_resumes_after_id_without_gaps_or_duplicates(run_db, monkeypatch):
+    monkeypatch.setattr(settings, "export_batch_size", 2)
+    app = FastAPI()
+    app.include_router(export.router, prefix="/export")
+
+    async def scenario(db):
+        monkeypatch.setattr(export, "read_session", async_sessionmaker(db.bind, expire_on_commit=False))
+        for i in range(7):
+            # Pairs of calls share a created_at, so order falls back to id
+            call = Call(source="upload", created_at=START + timedelta(minutes=i // 2))
+            db.add(call)
+            await db.flush()
+            await add_transcript_segments(db, call.id, [{"text": f"call {i} line {n}"} for n in range(i)])
+        await db.commit()
+
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+            full = await client.get("/export/calls")
+            lines = [json.loads(line) for line in full.text.splitlines()]
+            resumed = await client.get("/export/calls", params={"after_id": lines[2]["id"]})
+            unknown = await client.get("/export/calls", params={"after_id": "00000000-0000-0000-0000-000000000000"})
+        return full, lines, [json.loads(line) for line in resumed.text.splitlines()], unknown
+
+    full, lines, resumed, unknown = run_db(scenario)
+
+    assert full.headers["content-type"] == "application/x-ndjson"
+    assert len(lines) == 7
+    assert [(c["created_at"], c["id"]) for c in lines] == sorted((c["created_at"], c["id"]) for c in lines)
+    assert sorted(len(c["segments"]) for c in lines) == list(range(7))
+    # Segments loaded per batch stay with their own call
+    assert all(len({s["text"].split(" line")[0] for s in c["segments"]}) <= 1 for c in lines)
+    assert [c["id"] for c in lines[:3] + resumed] == [c["id"] for c in lines]
+    assert unknown.status_code == 400
@@ -0,0 +1,50 @@
+"""Opaque keyset cursors."""
+
+import base64
+from datetime import datetime, timezone
+from uuid import uuid4
+
+import pytest
+from fastapi import HTTPException
+
+from app.api.pagination import (
+    decode_cursor,
+    decode_position_cursor,
+    encode_cursor,
+    encode_position_cursor,
+)
+
+
+def test_cursor_round_trip():
+    row_id = uuid4()
+    when = datetime(2024, 5, 1, 9, 30, tzinfo=timezone.utc)
+
+    assert decode_cursor(encode_cursor(when, row_id)) == (when, row_id)
+    assert decode_cursor(encode_cursor(None, row_id)) == (None, row_id)
+    assert decode_position_cursor(encode_position_cursor(42, row_id)) == (42, row_id)
+    assert "=" not in encode_cursor(when, row_id)
+
+
+@pytest.mark.parametrize(
+    "cursor",
+    [
+        "",
+        "not base64!",
+        "WzEsMl0",  # [1, 2]: row id is not a string
+        "WyIyMDI0LTA1LTAxIiwgIm5vdC1hLXV1aWQiXQ",  # ["2024-05-01", "not-a-uuid"]
+        "WzEsICIwMDAwMDAwMC0wMDAwLTAwMDAtMDAwMC0wMDAwMDAwMDAwMDAiXQ",  # sort value is a number
+        "eyJhIjogMX0",  # {"a": 1}
+    ],
+)
+def test_malformed_cursor_is_a_400(cursor):
+    with pytest.raises(HTTPException) as exc:
+        decode_cursor(cursor)
+    assert exc.value.status_code == 400
+
+
+@pytest.mark.parametrize("position", ['"3"', "true", "1.5"])
+def test_malformed_position_cursor_is_a_400(position):
+    raw = f'[{position}, "{uuid4()}"]'.encode()
+    with pytest.raises(HTTPException) as exc:
+        decode_position_cursor(base64.urlsafe_b64encode(raw).decode())
+    assert exc.value.status_code == 400
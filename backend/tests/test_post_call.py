@@ -0,0 +1,53 @@
+"""Local merge of per-chunk post-call analyses."""
+
+from app.analysis.post_call import _normalize, merge_partial_analyses
+
+
+def test_merge_averages_scores_and_ranks_topics():
+    merged = merge_partial_analyses(
+        [
+            _normalize({"customer_satisfaction_score": 2, "key_topics": ["billing"], "resolution_status": "unresolved"}),
+            _normalize({"customer_satisfaction_score": 4.5, "key_topics": ["billing", "refund"], "resolution_status": "resolved"}),
+        ]
+    )
+
+    assert merged["customer_satisfaction_score"] == 3
+    assert merged["key_topics"] == ["billing", "refund"]
+    assert merged["resolution_status"] == "resolved"
+
+
+def test_merge_ignores_malformed_scores_and_topics():
+    merged = merge_partial_analyses(
+        [
+            _normalize({"customer_satisfaction_score": True, "key_topics": [{"name": "billing"}, ["x"], 7]}),
+            _normalize({"customer_satisfaction_score": 9, "key_topics": ["refund"]}),
+            _normalize({"customer_satisfaction_score": "4"}),
+        ]
+    )
+
+    assert merged["customer_satisfaction_score"] is None
+    assert merged["key_topics"] == ["refund"]
+
+
+def test_merge_tolerates_malformed_text_and_question_fields():
+    raw = [
+        {"unanswered_questions": [{"q": "why"}, ["x"], "When is the refund?"], "agent_performance_notes": ["polite", 3], "summary": 42},
+        {"unanswered_questions": "When is the refund?", "agent_performance_notes": "Clear.", "summary": "Refund asked."},
+    ]
+    # Unnormalized parts too: this is the fallback for malformed chunk output
+    unnormalized = merge_partial_analyses([{**_normalize({}), **p} for p in raw])
+    merged = merge_partial_analyses([_normalize(p) for p in raw])
+
+    assert unnormalized["unanswered_questions"] == ["When is the refund?"]
+    assert unnormalized["agent_performance_notes"] == "polite Clear."
+    assert unnormalized["summary"] == "Refund asked."
+    assert merged["unanswered_questions"] == ["When is the refund?"]
+    assert merged["agent_performance_notes"] == "polite Clear."
+    assert merged["summary"] == "Refund asked."
+
+
+def test_normalize_keeps_only_strings_in_list_fields():
+    payload = _normalize({"key_topics": ["billing", 7, None, {"a": 1}, " "], "unanswered_questions": None})
+
+    assert payload["key_topics"] == ["billing"]
+    assert payload["unanswered_questions"] == []
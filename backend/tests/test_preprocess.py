@@ -0,0 +1,50 @@
+"""Silence trimming: mapping trimmed times back to the recording, speech ratio."""
+
+import numpy as np
+
+from app.transcription.preprocess import SAMPLE_RATE, PreparedAudio, SpeechMap, speech_ratio
+
+S = SAMPLE_RATE  # samples per second
+
+
+def _track(chunks, duration_ms=10000) -> PreparedAudio:
+    return PreparedAudio(samples=np.zeros(0), duration_ms=duration_ms, speech_map=SpeechMap(chunks))
+
+
+def test_times_inside_speech_map_into_their_span():
+    speech_map = SpeechMap([(1 * S, 3 * S), (5 * S, 6 * S)])
+
+    assert speech_map.to_original_ms(0) == 1000
+    assert speech_map.to_original_ms(500) == 1500
+    assert speech_map.to_original_ms(2500) == 5500
+    assert speech_map.boundaries == [2 * S]
+
+
+def test_a_time_between_spans_depends_on_whether_it_starts_or_ends_a_segment():
+    speech_map = SpeechMap([(1 * S, 3 * S), (5 * S, 6 * S)])
+
+    assert speech_map.to_original_ms(2000) == 5000
+    assert speech_map.to_original_ms(2000, is_end=True) == 3000
+
+
+def test_times_past_the_last_span_are_clamped_to_its_end():
+    speech_map = SpeechMap([(1 * S, 3 * S), (5 * S, 6 * S)])
+
+    assert speech_map.to_original_ms(3000) == 6000
+    assert speech_map.to_original_ms(9000, is_end=True) == 6000
+
+
+def test_no_speech():
+    assert SpeechMap([]).to_original_ms(1234) == 1234
+    assert speech_ratio([_track([])]) == 0.0
+    assert speech_ratio([]) == 0.0
+
+
+def test_speech_ratio_counts_overlapping_tracks_once():
+    agent = _track([(0, 2 * S), (4 * S, 6 * S)])
+    customer = _track([(1 * S, 5 * S)])
+    untrimmed = PreparedAudio(samples=np.zeros(0), duration_ms=10000)
+
+    assert speech_ratio([agent]) == 0.4
+    assert speech_ratio([agent, customer]) == 0.6
+    assert speech_ratio([agent, untrimmed]) == 1.0
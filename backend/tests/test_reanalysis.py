@@ -0,0 +1,110 @@
+"""Selection of calls for bulk re-analysis."""
+
+import asyncio
+from datetime import date, datetime, timedelta
+
+from app.analysis.reanalyze import _RateLimiter
+from app.db.models import Call, CallAnalysis
+from app.db.repository import (
+    add_transcript_segments,
+    count_calls_for_reanalysis,
+    list_calls_for_reanalysis,
+)
+
+MODEL, VERSION = "openai:test", "v2"
+START = datetime(2024, 5, 1, 9, 0)
+
+
+async def _calls(db) -> dict[str, Call]:
+    """One call per case, created a minute apart."""
+    specs = {
+        "current": ("completed", "upload", (MODEL, VERSION)),
+        "stale": ("completed", "upload", (MODEL, "v1")),
+        "missing": ("failed", "twilio", None),
+        "no_transcript": ("completed", "upload", None),
+        "live": ("live", "twilio", None),
+        "transcribing": ("transcribing", "upload", None),
+        "analyzing": ("analyzing", "upload", None),
+    }
+    calls = {}
+    for i, (name, (status, source, analysis)) in enumerate(specs.items()):
+        call = Call(
+            source=source,
+            status=status,
+            started_at=START + timedelta(days=i),
+            created_at=START + timedelta(minutes=i),
+        )
+        db.add(call)
+        await db.flush()
+        if name != "no_transcript":
+            await add_transcript_segments(db, call.id, [{"text": "hello"}])
+        if analysis:
+            model, prompt_version = analysis
+            db.add(
+                CallAnalysis(call_id=call.id, analysis_type="post_call", model=model, prompt_version=prompt_version)
+            )
+        calls[name] = call
+    await db.commit()
+    return calls
+
+
+def test_selects_only_settled_calls_not_at_the_current_version(run_db):
+    async def scenario(db):
+        calls = await _calls(db)
+        ids = {c.id: name for name, c in calls.items()}
+
+        async def names(**filters):
+            page = await list_calls_for_reanalysis(db, MODEL, VERSION, **filters)
+            assert await count_calls_for_reanalysis(db, MODEL, VERSION, **filters) == len(page)
+            return [ids[call_id] for call_id, _ in page]
+
+        return (
+            await names(),
+            await names(missing_only=True),
+            await names(source="upload"),
+            await names(date_from=date(2024, 5, 2), date_to=date(2024, 5, 2)),
+        )
+
+    every, missing, uploads, one_day = run_db(scenario)
+
+    assert every == ["stale", "missing"]
+    assert missing == ["missing"]
+    assert uploads == ["stale"]
+    assert one_day == ["stale"]
+
+
+def test_pages_by_created_at_and_id(run_db):
+    async def scenario(db):
+        await _calls(db)
+        first = await list_calls_for_reanalysis(db, MODEL, VERSION, limit=1)
+        second = await list_calls_for_reanalysis(db, MODEL, VERSION, after=(first[0][1], first[0][0]), limit=1)
+        third = await list_calls_for_reanalysis(db, MODEL, VERSION, after=(second[0][1], second[0][0]), limit=1)
+        return first, second, third
+
+    first, second, third = run_db(scenario)
+
+    assert len(first) == len(second) == 1
+    assert first[0][0] != second[0][0]
+    assert third == []
+
+
+def test_rate_limiter_spaces_out_starts(monkeypatch):
+    now = [100.0]
+    sleeps = []
+
+    async def fake_sleep(seconds):
+        sleeps.append(round(seconds, 6))
+        now[0] += seconds
+
+    monkeypatch.setattr("app.analysis.reanalyze.time.monotonic", lambda: now[0])
+    monkeypatch.setattr("app.analysis.reanalyze.asyncio.sleep", fake_sleep)
+
+    async def main():
+        limiter = _RateLimiter(per_minute=120)
+        for _ in range(3):
+            await limiter.wait()
+        await _RateLimiter(per_minute=0).wait()
+
+    asyncio.run(main())
+
+    assert sleeps == [0.5, 0.5]
@@ -0,0 +1,108 @@
+"""Analytics rollups: incremental upsert/subtract and full rebuild."""
+
+import asyncio
+from datetime import date, datetime, timedelta, timezone
+from types import SimpleNamespace
+
+from sqlalchemy import select
+
+from app.db.models import AnalyticsRollup, Call, CallAnalysis
+from app.db.repository import create_analysis
+from app.db.rollups import _call_day, query_summary, rebuild_rollups
+
+DAY = datetime(2024, 5, 1, 9, 30)
+
+
+async def _call(db) -> Call:
+    call = Call(source="upload", started_at=DAY)
+    db.add(call)
+    await db.flush()
+    return call
+
+
+async def _rows(db) -> dict:
+    result = await db.execute(select(AnalyticsRollup))
+    return {
+        (r.dimension, r.value): (r.call_count, r.score_sum, r.resolved_count, r.unresolved_count)
+        for r in result.scalars()
+    }
+
+
+def test_reanalysis_replaces_previous_metrics(run_db):
+    async def scenario(db):
+        call = await _call(db)
+        await create_analysis(
+            db, call.id, "post_call",
+            {"customer_satisfaction_score": 2, "resolution_status": "unresolved", "key_topics": ["Billing"]},
+        )
+        await create_analysis(
+            db, call.id, "post_call",
+            {"customer_satisfaction_score": 5, "resolution_status": "resolved", "key_topics": ["refund"]},
+        )
+        await db.commit()
+        return await _rows(db), await query_summary(db, "topic")
+
+    rows, topics = run_db(scenario)
+
+    assert rows[("all", "")] == (1, 5, 1, 0)
+    assert rows[("topic", "billing")] == (0, 0, 0, 0)
+    assert rows[("resolution_status", "unresolved")] == (0, 0, 0, 0)
+    assert rows[("resolution_status", "resolved")] == (1, 5, 1, 0)
+    # Subtracted-to-zero rows are hidden from summaries
+    assert [t["key"] for t in topics] == ["refund"]
+
+
+def test_rebuild_matches_incremental_rollups(run_db):
+    async def scenario(db):
+        for score in (1, 4):
+            call = await _call(db)
+            await create_analysis(db, call.id, "post_call", {"customer_satisfaction_score": 3})
+            await create_analysis(
+                db, call.id, "post_call",
+                {"customer_satisfaction_score": score, "resolution_status": "resolved"},
+            )
+        await db.commit()
+        incremental = await _rows(db)
+        count = await rebuild_rollups(db)
+        await db.commit()
+        return incremental, count, await _rows(db)
+
+    incremental, count, rebuilt = run_db(scenario)
+
+    assert count == 2
+    assert rebuilt[("all", "")] == incremental[("all", "")] == (2, 5, 2, 0)
+    assert rebuilt[("resolution_status", "resolved")] == (2, 5, 2, 0)
+
+
+def test_rebuild_counts_a_call_once_when_analyses_share_a_timestamp(run_db):
+    async def scenario(db):
+        call = await _call(db)
+        for score in (2, 4):
+            db.add(
+                CallAnalysis(
+                    call_id=call.id,
+                    analysis_type="post_call",
+                    payload={"customer_satisfaction_score": score},
+                    created_at=DAY,
+                )
+            )
+        await db.commit()
+        count = await rebuild_rollups(db)
+        await db.commit()
+        return count, await _rows(db)
+
+    count, rows = run_db(scenario)
+
+    assert count == 1
+    assert rows[("all", "")][0] == 1
+
+
+def test_day_is_the_utc_date_of_aware_timestamps():
+    # PostgreSQL returns timestamptz in the session time zone
+    started_at = datetime(2024, 5, 2, 1, 30, tzinfo=timezone(timedelta(hours=2)))
+
+    class Session:
+        async def execute(self, _):
+            return SimpleNamespace(one=lambda: (started_at, None))
+
+    assert asyncio.run(_call_day(Session(), None)) == date(2024, 5, 1)
@@ -0,0 +1,55 @@
+"""Development databases created by an older init_db."""
+
+import asyncio
+
+from sqlalchemy import inspect, select
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from app.db.models import Base, Call, CallAnalysis
+from app.db.session import _add_missing_columns
+
+# calls and call_analyses as the first init_db created them
+_OLD_SCHEMA = [
+    """CREATE TABLE calls (
+        id CHAR(36) NOT NULL, source VARCHAR(20) NOT NULL, external_id VARCHAR(255),
+        started_at DATETIME, ended_at DATETIME, metadata JSON, created_at DATETIME,
+        PRIMARY KEY (id)
+    )""",
+    """CREATE TABLE call_analyses (
+        id CHAR(36) NOT NULL, call_id CHAR(36) NOT NULL, analysis_type VARCHAR(20) NOT NULL,
+        payload JSON NOT NULL, created_at DATETIME, PRIMARY KEY (id),
+        FOREIGN KEY(call_id) REFERENCES calls (id) ON DELETE CASCADE
+    )""",
+    "INSERT INTO calls (id, source) VALUES ('00000000-0000-0000-0000-000000000001', 'upload')",
+    """INSERT INTO call_analyses (id, call_id, analysis_type, payload)
+       VALUES ('00000000-0000-0000-0000-000000000002', '00000000-0000-0000-0000-000000000001', 'post_call', '{}')""",
+]
+
+
+def test_missing_columns_are_added_to_an_old_database(tmp_path):
+    async def main():
+        engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'old.db'}")
+        try:
+            async with engine.begin() as conn:
+                for ddl in _OLD_SCHEMA:
+                    await conn.exec_driver_sql(ddl)
+            for _ in range(2):  # idempotent across restarts
+                async with engine.begin() as conn:
+                    await conn.run_sync(Base.metadata.create_all)
+                    await conn.run_sync(_add_missing_columns)
+            async with engine.connect() as conn:
+                columns = await conn.run_sync(
+                    lambda c: {t: {col["name"] for col in inspect(c).get_columns(t)} for t in ("calls", "call_analyses")}
+                )
+                status = (await conn.execute(select(Call.status, Call.error))).one()
+                version = (await conn.execute(select(CallAnalysis.model, CallAnalysis.prompt_version))).one()
+            return columns, status, version
+        finally:
+            await engine.dispose()
+
+    columns, status, version = asyncio.run(main())
+
+    assert {"status", "error"} <= columns["calls"]
+    assert tuple(status) == ("completed", None)
+    assert {"model", "prompt_version"} <= columns["call_analyses"]
+    assert tuple(version) == (None, None)
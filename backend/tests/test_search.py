@@ -0,0 +1,67 @@
+"""Full-text search: FTS5 query building and the SQLite index."""
+
+from sqlalchemy import delete, update
+
+from app.db.models import Call, TranscriptSegment
+from app.db.search import _fts5_query, search_segments
+
+
+def test_fts5_query_quotes_terms_and_keeps_prefixes():
+    assert _fts5_query("refund  policy") == '"refund" "policy"'
+    assert _fts5_query("bill*") == '"bill"*'
+    assert _fts5_query('"OR" NEAR(a) -x') == '"OR" "NEAR(a)" "-x"'
+    assert _fts5_query('re"fu*nd*') == '"refund"*'
+
+
+def test_fts5_query_of_nothing_searchable_is_empty():
+    assert _fts5_query("") == ""
+    assert _fts5_query('  " * ""  ') == ""
+
+
+def test_search_survives_deletes_edits_and_vacuum(run_search_db):
+    texts = ["refund for the broken router", "billing question", "router reset steps", "goodbye"]
+
+    async def scenario(db):
+        call = Call(source="upload")
+        db.add(call)
+        await db.flush()
+        segments = [TranscriptSegment(call_id=call.id, speaker="agent", text=t) for t in texts]
+        db.add_all(segments)
+        await db.commit()
+        await db.execute(delete(TranscriptSegment).where(TranscriptSegment.id == segments[0].id))
+        await db.execute(
+            update(TranscriptSegment)
+            .where(TranscriptSegment.id == segments[3].id)
+            .values(text="thanks, the router works")
+        )
+        await db.commit()
+
+        # VACUUM may renumber the implicit rowids of the segments table
+        conn = await db.connection()
+        await conn.exec_driver_sql("VACUUM")
+
+        hits = await search_segments(db, "router")
+        prefix = await search_segments(db, "bill*", call_id=call.id)
+        none = await search_segments(db, '"*"')
+        return segments, hits, prefix, none
+
+    segments, hits, prefix, none = run_search_db(scenario)
+
+    assert {str(h["id"]) for h in hits} == {str(segments[2].id), str(segments[3].id)}
+    assert all("<mark>router</mark>" in h["snippet"] for h in hits)
+    assert [str(h["id"]) for h in prefix] == [str(segments[1].id)]
+    assert none == []
+
+
+def test_snippets_escape_segment_text(run_search_db):
+    async def scenario(db):
+        call = Call(source="upload")
+        db.add(call)
+        await db.flush()
+        db.add(TranscriptSegment(call_id=call.id, speaker="agent", text="<script>x</script> router & co"))
+        await db.commit()
+        return await search_segments(db, "router")
+
+    [hit] = run_search_db(scenario)
+
+    assert hit["snippet"] == "&lt;script&gt;x&lt;/script&gt; <mark>router</mark> &amp; co"
@@ -0,0 +1,68 @@
+"""Bulk insert of transcript segments."""
+
+from sqlalchemy import event
+
+from app.db.models import Call
+from app.db.repository import COPY_THRESHOLD, add_transcript_segments, get_transcript_segments
+
+
+def test_add_transcript_segments_inserts_rows_and_returns_their_ids(run_db):
+    async def scenario(db):
+        call = Call(source="upload")
+        db.add(call)
+        await db.flush()
+        ids = await add_transcript_segments(
+            db,
+            call.id,
+            [{"speaker": "agent", "text": f"line {i}", "start_time_ms": i * 1000, "end_time_ms": i * 1000 + 900}
+             for i in range(1000)]
+            + [{"text": "no speaker or times"}],
+        )
+        empty = await add_transcript_segments(db, call.id, [])
+        await db.commit()
+        return ids, empty, await get_transcript_segments(db, call.id)
+
+    ids, empty, stored = run_db(scenario)
+
+    assert empty == []
+    assert len(set(ids)) == 1001
+    # Untimed segments sort first
+    assert [s.id for s in stored] == ids[-1:] + ids[:-1]
+    assert (stored[0].speaker, stored[0].text, stored[0].start_time_ms) == ("unknown", "no speaker or times", None)
+    assert (stored[-1].speaker, stored[-1].text, stored[-1].end_time_ms) == ("agent", "line 999", 999900)
+
+
+def test_copy_runs_inside_the_units_transaction(run_db):
+    statements = []
+
+    async def scenario(db):
+        call = Call(source="upload")
+        db.add(call)
+        await db.commit()
+        call_id = call.id
+
+        conn = await db.connection()
+        event.listen(conn.sync_engine, "before_cursor_execute", lambda *args: statements.append(args[2]))
+        raw = await conn.get_raw_connection()
+        driver = raw.driver_connection
+
+        async def copy_records_to_table(table, records, columns):
+            statements.append("COPY")
+            await driver.executemany(
+                f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))})",
+                [tuple(v if isinstance(v, (int, type(None))) else str(v) for v in r) for r in records],
+            )
+
+        # Stand in for asyncpg: take the PostgreSQL COPY branch on SQLite
+        driver.copy_records_to_table = copy_records_to_table
+        conn.dialect.name = "postgresql"
+        try:
+            await add_transcript_segments(db, call_id, [{"text": f"line {i}"} for i in range(COPY_THRESHOLD)])
+        finally:
+            del conn.dialect.name
+        # A later statement of the unit fails, so the whole unit rolls back
+        await db.rollback()
+        return await get_transcript_segments(db, call_id)
+
+    assert run_db(scenario) == []
+    assert statements.index("SELECT 1") < statements.index("COPY")
@@ -0,0 +1,40 @@
+"""Transcript cache size accounting."""
+
+from app.transcription.cache import TranscriptCache
+from app.transcription.types import Transcript, TranscriptSegment
+
+
+def _transcript(text: str) -> Transcript:
+    return Transcript(segments=[TranscriptSegment(text=text, start_time_ms=0, end_time_ms=1000)])
+
+
+def _on_disk(tmp_path) -> int:
+    return sum(p.stat().st_size for p in tmp_path.glob("*.json"))
+
+
+def test_first_put_is_counted_once(tmp_path):
+    cache = TranscriptCache(tmp_path, max_bytes=1024 * 1024)
+    cache.put(cache.key("a" * 64, {}), _transcript("hello"))
+
+    assert cache.stats()["size_bytes"] == _on_disk(tmp_path)
+
+
+def test_overwrite_and_existing_entries(tmp_path):
+    TranscriptCache(tmp_path, max_bytes=1024 * 1024).put("existing", _transcript("earlier run"))
+    cache = TranscriptCache(tmp_path, max_bytes=1024 * 1024)
+    cache.put("k", _transcript("first"))
+    cache.put("k", _transcript("second, longer text"))
+
+    assert cache.stats()["size_bytes"] == _on_disk(tmp_path)
+    assert cache.get("k").full_text == "second, longer text"
+
+
+def test_eviction_keeps_size_under_limit(tmp_path):
+    size = len(_transcript("x" * 100).model_dump_json())
+    cache = TranscriptCache(tmp_path, max_bytes=size * 3)
+    for i in range(10):
+        cache.put(f"k{i}", _transcript("x" * 100))
+
+    assert cache.stats()["size_bytes"] == _on_disk(tmp_path) <= size * 3
+    assert cache.get("k9") is not None
+    assert cache.stats()["evictions"] > 0
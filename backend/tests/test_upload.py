@@ -0,0 +1,39 @@
+"""Streaming uploads to disk."""
+
+import asyncio
+import hashlib
+import io
+
+import pytest
+from fastapi import UploadFile
+
+from app.config import settings
+from app.ingest.upload import UploadTooLargeError, save_upload
+
+DATA = bytes(range(256)) * 40
+
+
+def _upload(filename: str) -> UploadFile:
+    return UploadFile(io.BytesIO(DATA), filename=filename)
+
+
+def test_save_upload_streams_and_hashes(monkeypatch):
+    monkeypatch.setattr(settings, "upload_chunk_bytes", 1000)
+    saved = asyncio.run(save_upload(_upload("call.WAV")))
+    try:
+        assert saved.path.suffix == ".wav"
+        assert saved.size == len(DATA)
+        assert saved.sha256 == hashlib.sha256(DATA).hexdigest()
+        assert saved.path.read_bytes() == DATA
+    finally:
+        saved.path.unlink()
+
+
+def test_save_upload_rejects_oversized_files_and_cleans_up(monkeypatch, tmp_path):
+    monkeypatch.setattr(settings, "upload_chunk_bytes", 1000)
+    monkeypatch.setattr(settings, "upload_max_bytes", len(DATA) - 1)
+    monkeypatch.setattr("tempfile.tempdir", str(tmp_path))
+
+    with pytest.raises(UploadTooLargeError):
+        asyncio.run(save_upload(_upload("call.exe")))
+    assert list(tmp_path.iterdir()) == []
@@ -0,0 +1,81 @@
+"""Group commit in the SQLite write queue."""
+
+import asyncio
+import uuid
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from app.config import settings
+from app.db.models import Base, Call
+from app.db.session import WriteQueue
+
+
+def _run(monkeypatch, tmp_path, scenario):
+    monkeypatch.setattr(settings, "database_url", f"sqlite+aiosqlite:///{tmp_path / 'writes.db'}")
+
+    async def main():
+        engine = create_async_engine(settings.database_url)
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        queue = WriteQueue(serialize=True, max_batch=8)
+        try:
+            result = await scenario(queue)
+            async with engine.connect() as conn:
+                rows = (await conn.execute(select(Call.external_id))).scalars().all()
+            return result, sorted(rows), queue.stats()
+        finally:
+            await queue.stop()
+            await engine.dispose()
+
+    return asyncio.run(main())
+
+
+def _insert(name: str, runs: list, fail: bool = False):
+    call_id = uuid.uuid4()
+
+    async def unit(db):
+        runs.append(name)
+        db.add(Call(id=call_id, source="upload", external_id=name))
+        await db.flush()
+        if fail:
+            raise ValueError(name)
+        return name
+
+    return unit
+
+
+def test_units_queued_together_share_one_commit(monkeypatch, tmp_path):
+    runs = []
+
+    async def scenario(queue):
+        return await asyncio.gather(*(queue.run(_insert(n, runs)) for n in "abc"))
+
+    results, rows, stats = _run(monkeypatch, tmp_path, scenario)
+
+    assert results == ["a", "b", "c"]
+    assert rows == ["a", "b", "c"]
+    assert runs == ["a", "b", "c"]
+    assert (stats["commits"], stats["units"]) == (1, 3)
+
+
+def test_a_failing_unit_does_not_lose_or_duplicate_the_others(monkeypatch, tmp_path):
+    runs = []
+
+    async def scenario(queue):
+        return await asyncio.gather(
+            queue.run(_insert("a", runs)),
+            queue.run(_insert("b", runs, fail=True)),
+            queue.run(_insert("c", runs)),
+            return_exceptions=True,
+        )
+
+    (a, b, c), rows, stats = _run(monkeypatch, tmp_path, scenario)
+
+    assert (a, c) == ("a", "c")
+    assert isinstance(b, ValueError)
+    # The batch is rolled back, then every unit is retried in its own transaction
+    assert runs == ["a", "b", "a", "b", "c"]
+    assert rows == ["a", "c"]
+    assert (stats["commits"], stats["units"]) == (2, 2)
+